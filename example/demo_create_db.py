@@ -1,13 +1,15 @@
 import sys
+import logging
 sys.path.append("..")
-from pubmedkit.db_utils import create_pubmed_table, create_journal_table, insert_pubmed_data, insert_journal_data
+from pubmedkit.db_utils import create_pubmed_table, create_journal_table, insert_journal_data
+from pubmedkit.jobs import run_ingestion_job
 from sqlalchemy import create_engine
-from pubmedkit.baseline import load_baseline
 from glob import glob
-from tqdm import tqdm
 
 
 def main():
+    # 库代码不再配置logging，由脚本决定日志的格式和级别
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     engine = create_engine('sqlite:///../testdata/crm.db')
 
 
@@ -26,14 +28,12 @@ def main():
         "operator",
     ]
 
-    for xmlfile in tqdm(files):
-        try:
-            data = load_baseline(xmlfile, keywords=keywords, impact_factor=6, log=True)
-
-            insert_pubmed_data(engine=engine, data=data)
-        except Exception as e:
-            print(f"Error in file:{xmlfile}")
-            print(e)
+    # 按pmid upsert并执行删除，每个文件单独提交；中断后重新运行会跳过已完成的文件，失败的文件最多重试3次
+    results = run_ingestion_job(engine, files, keywords=keywords, impact_factor=6, max_attempts=3)
+    for result in results:
+        if result['status'] == 'failed':
+            print(f"Error in file:{result['filename']}")
+            print(result['error'])
     # ifdf = pd.read_excel('../testdata/2023if.xlsx')
 
     # print(ifdf.describe())
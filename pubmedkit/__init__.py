@@ -1,2 +1,56 @@
-from .baseline import *
-from .db_utils import *
+"""
+pubmedkit：解析PubMed基线/更新文件，过滤后写入列表、字典、DataFrame、Parquet或数据库。
+
+子模块在第一次访问其中的名称时才导入，import pubmedkit本身不会导入pandas、SQLAlchemy、pubmed_parser等依赖，
+短时间运行的脚本和工作进程只为实际用到的功能付出导入时间。
+"""
+import importlib
+
+# 子模块及其导出的名称，与各子模块的__all__一致
+_SUBMODULE_EXPORTS = {
+    'baseline': ['iter_baseline', 'filter_articles', 'article_filter', 'iter_medline_articles', 'parse_article',
+                 'ARTICLE_FIELDS', 'load_baseline', 'records_to_pd', 'baseline_to_dict', 'baseline_to_list',
+                 'baseline_to_list_keywords_filter', 'baseline_to_list_filter', 'KeywordMatcher', 'keywords_filter',
+                 'baseline_to_pd', 'load_dict_from_pickle'],
+    'record': ['PubmedRecord', 'RECORD_FIELDS'],
+    'db_utils': ['PUBMED_COLUMNS', 'create_db_engine', 'get_table', 'create_pubmed_table', 'create_journal_table',
+                 'insert_pubmed_data', 'bulk_insert_pubmed_data', 'insert_pubmed_frame', 'create_pmid_unique_index',
+                 'deduplicate_pubmed_table', 'create_update_file_table', 'upsert_pubmed_data', 'apply_pubmed_file',
+                 'record_update_file', 'apply_update_file', 'apply_update_files', 'search_pubmed_table_simple', 'search_pubmed_table', 'insert_journal_data',
+                 'insert_journal_metrics', 'update_pubmed_journal_ids', 'join_pubmed_and_journal'],
+    'sink': ['DatabaseSink'],
+    'corpus': ['iter_baseline_corpus', 'load_baseline_corpus', 'format_error'],
+    'merge': ['file_sequence', 'iter_merged_corpus', 'merge_corpus'],
+    'frame': ['records_to_frame', 'keyword_mask', 'journal_impact_factors', 'filter_frame', 'PUBMED_FRAME_DTYPES'],
+    'columnar': ['ArrowRecordBuilder', 'records_to_arrow', 'arrow_to_records', 'baseline_to_arrow', 'write_parquet_dataset',
+                 'baseline_to_parquet', 'load_parquet', 'PUBMED_ARROW_SCHEMA'],
+    'cache': ['ParseCache'],
+    'fulltext': ['create_fulltext_index', 'parse_fulltext_query', 'fulltext_search', 'FULLTEXT_FIELDS'],
+    'index': ['InvertedIndex', 'tokenize'],
+    'scoring': ['RelevanceScorer', 'rank_records'],
+    'store': ['RecordStore', 'build_record_store'],
+    'journal': ['JournalTable', 'normalize_journal_name', 'get_journal_table', 'load_nlm_journal_aliases',
+                'DEFAULT_IF_FILE', 'DEFAULT_IF5_FILE'],
+    'eutils': ['EutilsClient', 'TokenBucket', 'fetch_pubmed_records', 'EUTILS_BASE_URL'],
+    'metrics': ['Metrics', 'StatsdExporter', 'start_prometheus_server'],
+    'jobs': ['run_ingestion_job', 'create_ingest_manifest_table', 'get_ingest_manifest', 'file_checksum'],
+    'fileio': ['open_medline', 'open_medline_text', 'ReadAheadReader', 'FAST_GZIP'],
+}
+
+_EXPORTS = {name: module for module, names in _SUBMODULE_EXPORTS.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    # 缓存到包的命名空间，之后的访问不再经过__getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,234 +1,435 @@
-import pubmed_parser as pp
-import pandas as pd
+from lxml import etree
 from os.path import basename, isfile
 import pickle
 import logging
+import re
+import time
+from collections import Counter
+from .fileio import open_medline
+from .journal import get_journal_table
+from .record import PubmedRecord
 
-def load_baseline(xmlfile: str, *args, **kwargs):
+logger = logging.getLogger(__name__)
+
+__all__ = ['iter_baseline', 'filter_articles', 'article_filter', 'iter_medline_articles', 'parse_article',
+           'ARTICLE_FIELDS', 'load_baseline', 'records_to_pd', 'baseline_to_dict', 'baseline_to_list',
+           'baseline_to_list_keywords_filter', 'baseline_to_list_filter', 'KeywordMatcher', 'keywords_filter',
+           'baseline_to_pd', 'load_dict_from_pickle']
+
+# pubmed_parser导入时会连带导入pandas等大量依赖，第一次解析文章时才导入
+parse_pmid = parse_doi = parse_author_affiliation = parse_publication_types = date_extractor = None
+stringify_children = None
+
+
+def _import_pubmed_parser():
+    global parse_pmid, parse_doi, parse_author_affiliation, parse_publication_types, date_extractor
+    global stringify_children
+    from pubmed_parser.medline_parser import (parse_pmid, parse_doi, parse_author_affiliation,
+                                              parse_publication_types, date_extractor)
+    from pubmed_parser.utils import stringify_children
+
+def iter_baseline(xmlfile: str, *args, **kwargs):
     """
-    从给定的XML文件中加载基线数据，并根据output_type参数返回不同格式的数据。
+    以流式方式逐条解析基线XML文件，按关键词和影响因子过滤后逐条产出记录。
+
+    解析使用iterparse，每处理完一篇文章即清理对应的XML元素，
+    内存占用与文件大小无关。
 
     参数:
-    xmlfile (str): XML文件路径。
+    xmlfile (str): XML文件路径（.xml或.xml.gz）。
     *args: 未使用的额外位置参数。
-    **kwargs: 未使用的额外关键字参数，目前支持output_type和log。
+    **kwargs: 支持keywords、kw_filter、impact_factor、journal_table、cache、include_deleted、fields、compact、metrics和log。
+              keywords可以是关键词列表，也可以是预先构建好的KeywordMatcher。
+              fields为需要的字段（如['title', 'abstract', 'journal']），pmid和version总会保留；
+              直接解析XML时只提取这些字段以及过滤所需的字段，被过滤掉的文章不会提取其余字段。
+              compact为True时产出紧凑的PubmedRecord而不是字典，见record.PubmedRecord。
+              metrics为Metrics时记录该文件的解析时间和各项计数，见metrics.Metrics。
+              log为True时通过本模块的logger输出INFO日志，日志的格式和输出位置由应用配置。
+              read_ahead、block_size和mmap控制文件的读取方式，见fileio.open_medline。
+              journal_table为JournalTable，默认使用get_journal_table()。
+              cache为ParseCache时，优先从解析缓存读取文章，避免重复解析XML。
+              include_deleted为True时，更新文件中的DeleteCitation会作为
+              {'pmid': pmid, 'version': version, 'delete': True}产出，且不参与过滤。
 
     返回:
-    DataFrame, dict或list: 根据output_type参数的值，返回相应格式的基线数据。
+    generator: 逐条产出包含pmid、title、abstract等字段的字典。
     """
-    # 日志配置
     log = kwargs.get('log', False)
-    if log:
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
     if not isfile(xmlfile):
         raise FileNotFoundError(f"The specified file {xmlfile} does not exist.")
 
-    # 获取输出类型，默认为'list'
-    output_type = kwargs.get('output_type', 'list')
+    # 获取XML文件名（不带路径），分割文件名，获取基线版本信息
+    baselineversion = basename(xmlfile).split('.')[0]
+
+    if log:
+        logger.info(f"parse xml file {xmlfile}")
+
+    metrics = kwargs.get('metrics', None)
+    counts = Counter() if metrics is not None else None
+    fields = _check_fields(kwargs.get('fields', None))
+    accept = article_filter(counts=counts, **kwargs)
+    cache = kwargs.get('cache', None)
+    include_deleted = kwargs.get('include_deleted', False)
+    if cache is not None:
+        entries = _accepted(cache.iter_articles(xmlfile, include_deleted=include_deleted), accept)
+    else:
+        # 直接解析XML时，过滤条件在解析过程中提前判断，被拒绝的文章不再提取其余字段
+        read_options = {key: kwargs[key] for key in ['read_ahead', 'block_size', 'mmap'] if key in kwargs}
+        entries = iter_medline_articles(xmlfile, include_deleted=include_deleted, fields=fields, accept=accept,
+                                        **read_options)
+        fields = None
+    records = _finish_entries(entries, baselineversion, fields, kwargs.get('compact', False), counts)
+    yield from _instrument(records, metrics, counts, 'parse', baselineversion)
+
+
+def filter_articles(entries, version: str, *args, **kwargs):
+    """
+    按关键词和影响因子过滤文章字典，并为保留的记录加上version字段。
+
+    iter_baseline以及其他数据来源（E-utilities、MEDLINE文本文件等）共用这一过滤逻辑。
+
+    参数:
+    entries: 未经过滤的文章字典的可迭代对象。
+    version (str): 写入记录的version字段。
+    **kwargs: 支持keywords、kw_filter、impact_factor、journal_table、fields、compact、metrics和log，含义同iter_baseline。
+              metrics中的耗时记为filter_seconds。
+
+    返回:
+    generator: 逐条产出保留的记录。
+    """
+    metrics = kwargs.get('metrics', None)
+    counts = Counter() if metrics is not None else None
+    fields = _check_fields(kwargs.get('fields', None))
+    accept = article_filter(counts=counts, **kwargs)
+    records = _finish_entries(_accepted(entries, accept), version, fields, kwargs.get('compact', False), counts)
+    yield from _instrument(records, metrics, counts, 'filter', version)
+
+
+def _accepted(entries, accept):
+    if accept is None:
+        return entries
+    return (entry for entry in entries if entry.get('delete', False) or accept(entry))
+
+
+def _instrument(records, metrics, counts, stage: str, version: str):
+    # 只统计产出记录之前花费的时间，不包括消费者处理记录的时间
+    if metrics is None:
+        yield from records
+        return
+    elapsed = 0.0
+    iterator = iter(records)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            yield record
+    finally:
+        metrics.observe(f'{stage}_seconds', elapsed, file=version)
+        dropped_keyword = counts['dropped_keyword']
+        dropped_impact_factor = counts['dropped_impact_factor']
+        metrics.incr('records_seen', counts['kept'] + dropped_keyword + dropped_impact_factor, file=version)
+        metrics.incr('records_kept', counts['kept'], file=version)
+        metrics.incr('records_dropped', dropped_keyword, file=version, reason='keyword')
+        metrics.incr('records_dropped', dropped_impact_factor, file=version, reason='impact_factor')
+        metrics.incr('unknown_journals', counts['unknown_journal'], file=version)
+        metrics.incr('records_deleted', counts['deleted'], file=version)
+
+
+def article_filter(*args, **kwargs):
+    """
+    根据keywords、kw_filter、impact_factor、journal_table构建文章过滤函数。
+
+    返回的函数接受文章字典，保留时返回True；不需要任何过滤时返回None。
+    先判断代价低的影响因子，再做关键词匹配，只访问判断所需的字段，
+    因此可以作用于按需提取字段的文章（见parse_article的accept参数）。
+    counts为collections.Counter时，记录dropped_impact_factor、unknown_journal和dropped_keyword的数量。
+    """
+    log = kwargs.get('log', False)
+    counts = kwargs.get('counts', None)
 
-    # 验证输出类型的有效性
-    if output_type not in ['list', 'dict', 'pd']:
-        raise ValueError('output_type must be "pd", "list" or "dict"')
-    
     # 从kwargs获取关键词过滤相关参数
     keywords = kwargs.get('keywords', [])
     kw_filter = kwargs.get('kw_filter', 'abstract')
+    # 关键词只编译一次，整个文件复用同一个匹配器
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
 
     # 从kwargs获取影响因子过滤相关参数
     impact_factor = kwargs.get('impact_factor', 0)
 
     # 打印关键词和过滤类型
     if log:
-        logging.info(f"keywords: {keywords}")
-        logging.info(f"kw_filter: {kw_filter}")
-
-    # 初始化过滤标志和变量
-    keywords_keep = False
-    perform_keyword_filtering = True
-    impact_factor_keep = False
-    perform_impact_factor_filtering = True
+        logger.info(f"keywords: {keywords}")
+        logger.info(f"kw_filter: {kw_filter}")
 
     # 根据关键词列表决定是否进行关键词过滤
-    if keywords:
-        if kw_filter:
-            if log:
-                logging.info("perform keyword filter")
-    else:
+    perform_keyword_filtering = bool(matcher.keywords)
+    if perform_keyword_filtering:
+        if kw_filter not in ['abstract', 'title', 'both']:
+            raise ValueError('kw_filter must be "abstract", "title", or "both"')
         if log:
-            logging.info("do not perform keyword filter")
-        perform_keyword_filtering = False
-        keywords_keep = True
+            logger.info("perform keyword filter")
+    elif log:
+        logger.info("do not perform keyword filter")
 
     # 根据影响因子决定是否进行影响因子过滤
-    if impact_factor <= 0:
-        if log:
-            logging.info("do not perform impact_factor filter")
-        perform_impact_factor_filtering = False
-        impact_factor_keep = True
-    else:
-        if log:
-            logging.info(f"keep impact_factor > {impact_factor}")
-    
-    # 加载影响因子字典（如果需要进行影响因子过滤）
-    impact_factor_dict = {}
-    if perform_impact_factor_filtering:
-        impact_factor_dict = load_dict_from_pickle('../data/if2024.pickle')
+    perform_impact_factor_filtering = impact_factor > 0
+    if log:
+        if perform_impact_factor_filtering:
+            logger.info(f"keep impact_factor > {impact_factor}")
+        else:
+            logger.info("do not perform impact_factor filter")
 
-    # 初始化数据字典
-    data_dict = dict()
+    if not perform_keyword_filtering and not perform_impact_factor_filtering:
+        return None
 
-    # 解析Medline XML文件
-    try:
-        if log:
-            logging.info(f"parse xml file {xmlfile}")
-        path_xml = pp.parse_medline_xml(xmlfile)
-    except Exception as e:
-        raise RuntimeError("Error parsing XML file") from e
-
-    # 获取XML文件名（不带路径）
-    filename = basename(xmlfile)
-    # 分割文件名，获取基线版本信息
-    fileinfor = filename.split('.')
-    baselineversion = fileinfor[0]
+    # 获取期刊影响因子查找表（如果需要进行影响因子过滤），每个进程只构建一次
+    journal_table = None
+    if perform_impact_factor_filtering:
+        journal_table = kwargs.get('journal_table', None) or get_journal_table()
 
-    # 遍历XML条目，构建数据字典
-    for entry in path_xml:
+    def accept(entry) -> bool:
+        # 根据条件进行影响因子过滤，找不到影响因子的期刊直接丢弃
+        if perform_impact_factor_filtering:
+            entry_impact_factor = journal_table.impact_factor(entry['journal'])
+            if entry_impact_factor is None or entry_impact_factor < impact_factor:
+                if counts is not None:
+                    counts['dropped_impact_factor'] += 1
+                    if entry_impact_factor is None:
+                        counts['unknown_journal'] += 1
+                return False
 
         # 根据条件进行关键词过滤
         if perform_keyword_filtering:
             if kw_filter == 'both':
-                keywords_keep = (keywords_filter(entry['abstract'], keywords) or keywords_filter(entry['title'], keywords))
+                keep = matcher.search(entry['abstract']) or matcher.search(entry['title'])
             elif kw_filter == 'abstract':
-                keywords_keep = keywords_filter(entry['abstract'], keywords)
-            elif kw_filter == 'title':
-                keywords_keep = keywords_filter(entry['title'], keywords)
+                keep = matcher.search(entry['abstract'])
             else:
-                raise ValueError("Invalid kw_filter value")
+                keep = matcher.search(entry['title'])
+            if not keep:
+                if counts is not None:
+                    counts['dropped_keyword'] += 1
+                return False
+        return True
+
+    return accept
+
+
+def _check_fields(fields):
+    if fields is None:
+        return None
+    fields = tuple(fields)
+    unknown = [field for field in fields if field not in ARTICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, must be in {ARTICLE_FIELDS}")
+    # 保持与完整记录相同的字段顺序
+    return tuple(field for field in ARTICLE_FIELDS if field in fields)
+
+
+def _finish_entries(entries, version: str, fields, compact: bool, counts=None):
+    for entry in entries:
+        if entry.get('delete', False):
+            # 删除记录只有pmid，原样产出
+            entry['version'] = version
+            if counts is not None:
+                counts['deleted'] += 1
+            yield entry
+            continue
+        if counts is not None:
+            counts['kept'] += 1
+        if fields is not None:
+            entry = _project(entry, fields)
+        entry['version'] = version
+        yield PubmedRecord.from_dict(entry) if compact else entry
+
+
+def _project(entry, fields) -> dict:
+    projected = {'pmid': entry['pmid']}
+    for field in fields:
+        projected[field] = entry[field]
+    return projected
+
+
+def iter_medline_articles(xmlfile: str, include_deleted: bool = False, fields=None, accept=None, **kwargs):
+    """
+    使用iterparse逐篇解析MEDLINE XML文件，产出未经过滤的文章字典。
 
-        # 根据条件进行影响因子过滤
-        if perform_impact_factor_filtering:
-            journal_name = entry['journal'].rstrip().lower()
-            if journal_name in impact_factor_dict:
-                if impact_factor_dict[journal_name] >= impact_factor:
-                    impact_factor_keep = True
-                    # if log:
-                    #     logging.info(f"journal name: {journal_name}, impact factor: {impact_factor_dict[journal_name]}, keep!!")
+    每篇文章解析完毕后清理该元素及其之前的兄弟节点，避免整棵树驻留内存。
+    include_deleted为True时，DeleteCitation中的每个PMID产出{'pmid': pmid, 'delete': True}。
+    fields和accept传给parse_article，被accept拒绝的文章不会产出。
+    kwargs（read_ahead、block_size、mmap）传给open_medline：.gz文件默认在后台线程中解压预读。
+    """
+    tags = ('PubmedArticle', 'DeleteCitation') if include_deleted else ('PubmedArticle',)
+    try:
+        with open_medline(xmlfile, **kwargs) as handle:
+            context = etree.iterparse(handle, events=('end',), tag=tags)
+            for _, element in context:
+                if element.tag == 'DeleteCitation':
+                    entries = [{'pmid': int(pmid.text), 'delete': True} for pmid in element.iterfind('PMID')]
                 else:
-                    impact_factor_keep = False
-                    # if log:
-                    #     logging.info(f"journal name: {journal_name}, impact factor: {impact_factor_dict[journal_name]}, drop!!")
-            else:
-                impact_factor_keep = False
-                # if log:
-                #     logging.info(f"journal name: {journal_name}, not found in impact factor dict, drop!!")
-                
-        # 如果通过关键词和影响因子过滤，则将条目添加到数据字典中
-        if keywords_keep and impact_factor_keep:
-            data_dict[int(entry['pmid'])] = {
-                'pmid': int(entry['pmid']),
-                'title': entry['title'],
-                'abstract': entry['abstract'],
-                'journal': entry['journal'],
-                'pubdate': entry['pubdate'],
-                'publication_types': entry['publication_types'],
-                'authors': entry['authors'],
-                'doi': entry['doi'],
-                'version': baselineversion
-            }
+                    entry = parse_article(element, fields=fields, accept=accept)
+                    entries = [entry] if entry is not None else []
+                # 释放已处理的元素
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                yield from entries
+    except (etree.XMLSyntaxError, OSError, EOFError) as e:
+        raise RuntimeError(f"Error parsing XML file {xmlfile}") from e
+
+
+def _parse_title(pubmed_article, medline, article) -> str:
+    title_node = article.find('ArticleTitle')
+    return stringify_children(title_node).strip() if title_node is not None else ''
+
+
+def _parse_abstract(pubmed_article, medline, article) -> str:
+    abstract_nodes = article.findall('Abstract/AbstractText')
+    if len(abstract_nodes) > 1:
+        # 结构化摘要，按Label拼接各段
+        abstract_list = []
+        for node in abstract_nodes:
+            section = node.attrib.get('Label', '')
+            if section != 'UNASSIGNED':
+                abstract_list.append('\n')
+                abstract_list.append(section)
+            abstract_list.append(stringify_children(node).strip())
+        return '\n'.join(abstract_list).strip()
+    elif abstract_nodes:
+        return stringify_children(abstract_nodes[0]).strip()
+    elif article.find('Abstract') is not None:
+        return stringify_children(article.find('Abstract')).strip()
+    return ''
+
+
+def _parse_authors(pubmed_article, medline, article) -> str:
+    return ';'.join(
+        author['lastname'] + '|' + author['forename'] + '|' + author['initials'] + '|' + author['identifier']
+        for author in parse_author_affiliation(medline)
+    )
 
-    if log:
-        logging.info(f"output_type: {output_type}")
-        logging.info(f"{len(data_dict)} entries loaded")
-        
+
+# 各字段的提取函数，按完整记录中的字段顺序排列
+_FIELD_PARSERS = {
+    'title': _parse_title,
+    'abstract': _parse_abstract,
+    'journal': lambda pubmed_article, medline, article: ' '.join(article.xpath('Journal/Title/text()')),
+    'pubdate': lambda pubmed_article, medline, article: date_extractor(article.find('Journal'), True),
+    'publication_types': lambda pubmed_article, medline, article: parse_publication_types(medline),
+    'authors': _parse_authors,
+    'doi': lambda pubmed_article, medline, article: parse_doi(pubmed_article),
+}
+
+ARTICLE_FIELDS = tuple(_FIELD_PARSERS)
+
+
+class _LazyArticle(dict):
+    # 第一次访问某个字段时才从XML元素中提取，供过滤函数提前判断
+    __slots__ = ('pubmed_article', 'medline', 'article')
+
+    def __missing__(self, field):
+        value = self[field] = _FIELD_PARSERS[field](self.pubmed_article, self.medline, self.article)
+        return value
+
+
+def parse_article(pubmed_article, fields=None, accept=None) -> dict:
+    """
+    从PubmedArticle元素中提取pubmedkit使用的字段，格式与pp.parse_medline_xml一致。
+
+    参数:
+    pubmed_article: PubmedArticle元素。
+    fields: 需要提取的字段（pmid总会提取），默认为ARTICLE_FIELDS中的全部字段。
+    accept: 过滤函数（见article_filter），只提取其判断所需的字段；返回False时不再提取其余字段，返回None。
+
+    返回:
+    dict或None: 文章字典。
+    """
+    if parse_pmid is None:
+        _import_pubmed_parser()
+    entry = _LazyArticle()
+    entry.pubmed_article = pubmed_article
+    entry.medline = pubmed_article.find('MedlineCitation')
+    entry.article = entry.medline.find('Article')
+    pmid = int(parse_pmid(pubmed_article))
+
+    if accept is not None and not accept(entry):
+        return None
+
+    record = {'pmid': pmid}
+    for field in ARTICLE_FIELDS if fields is None else fields:
+        record[field] = entry[field]
+    return record
+
+
+def load_baseline(xmlfile: str, *args, **kwargs):
+    """
+    从给定的XML文件中加载基线数据，并根据output_type参数返回不同格式的数据。
+
+    参数:
+    xmlfile (str): XML文件路径。
+    *args: 未使用的额外位置参数。
+    **kwargs: 支持output_type和sink，其余参数（keywords、kw_filter、impact_factor、cache、compact、log）传给iter_baseline。
+              compact为True时list和dict输出中的记录为PubmedRecord，内存占用更小。
+              sink为DatabaseSink时，记录边解析边分批交给sink异步写入数据库，不在内存中保留，也不按pmid去重，
+              此时忽略output_type，返回交给sink的记录数。
+
+    返回:
+    DataFrame, dict或list: 根据output_type参数的值，返回相应格式的基线数据。
+    """
+    # 获取输出类型，默认为'list'
+    output_type = kwargs.pop('output_type', 'list')
+    sink = kwargs.pop('sink', None)
+    if sink is not None:
+        return sink.consume(iter_baseline(xmlfile, **kwargs))
+
+    # 验证输出类型的有效性
+    if output_type not in ['list', 'dict', 'pd']:
+        raise ValueError('output_type must be "pd", "list" or "dict"')
+
+    # 同一文件内按pmid去重，后出现的记录覆盖先出现的记录
+    data_dict = {entry['pmid']: entry for entry in iter_baseline(xmlfile, **kwargs)}
+
+    if kwargs.get('log', False):
+        logger.info(f"output_type: {output_type}")
+        logger.info(f"{len(data_dict)} entries loaded")
 
     # 根据输出类型返回数据
     if output_type == 'pd':
         # 如果是'pd'，则返回DataFrame格式的数据
-        return pd.DataFrame.from_dict(data_dict).T
+        return records_to_pd(data_dict)
     elif output_type == 'dict':
         # 如果是'dict'，则返回字典格式的数据
         return data_dict
-    elif output_type == 'list':
+    else:
         # 如果是'list'，则返回列表格式的数据
         return list(data_dict.values())
-    else:
-        # output_type无效，抛出异常
-        raise ValueError('Invalid output_type')
+
+
+def records_to_pd(data_dict: dict) -> 'pd.DataFrame':
+    """
+    将pmid到记录的字典转换为DataFrame，记录可以是字典或PubmedRecord。
+    行索引为pmid，列类型见frame.records_to_frame。
+    """
+    from .frame import records_to_frame
+    return records_to_frame(data_dict)
 
 def baseline_to_dict(xmlfile: str) -> dict:
-    data = dict()
-    path_xml = pp.parse_medline_xml(xmlfile)
-    filename = basename(xmlfile)
-    fileinfor = filename.split('.')
-    baselineversion = fileinfor[0]
-
-    for entry in path_xml:
-        data[int(entry['pmid'])] = {
-            'pmid': int(entry['pmid']),
-            'title': entry['title'],
-            'abstract': entry['abstract'],
-            'journal': entry['journal'],
-            'pubdate': entry['pubdate'],
-            'publication_types': entry['publication_types'],
-            'authors': entry['authors'],
-            'doi': entry['doi'],
-            'version': baselineversion
-        }
-    return data
+    return {entry['pmid']: entry for entry in iter_baseline(xmlfile)}
 
 def baseline_to_list(xmlfile: str) -> list:
-    data = []
-    path_xml = pp.parse_medline_xml(xmlfile)
-    filename = basename(xmlfile)
-    fileinfor = filename.split('.')
-    baselineversion = fileinfor[0]
-
-    for entry in path_xml:
-        data.append( {
-            'pmid': int(entry['pmid']),
-            'title': entry['title'],
-            'abstract': entry['abstract'],
-            'journal': entry['journal'],
-            'pubdate': entry['pubdate'],
-            'publication_types': entry['publication_types'],
-            'authors': entry['authors'],
-            'doi': entry['doi'],
-            'version': baselineversion
-        })
-    return data
-
-def baseline_to_list_keywords_filter(xmlfile: str, keywords: list, kw_filter: str='abstract') -> list:
-    data = []
-    path_xml = pp.parse_medline_xml(xmlfile)
-    filename = basename(xmlfile)
-    fileinfor = filename.split('.')
-    baselineversion = fileinfor[0]
-
-    if filter not in ['abstract', 'title', 'both']:
+    return list(iter_baseline(xmlfile))
+
+def baseline_to_list_keywords_filter(xmlfile: str, keywords, kw_filter: str='abstract') -> list:
+    if kw_filter not in ['abstract', 'title', 'both']:
         raise ValueError('filter must be abstract or title')
 
-    for entry in path_xml:
-        keep = False
-        if kw_filter == 'both':
-            keep = keywords_filter(entry['abstract'], keywords) or keywords_filter(entry['title'], keywords)
-        elif kw_filter == 'abstract':
-            keep = keywords_filter(entry['abstract'], keywords)
-        elif kw_filter == 'title':
-            keep = keywords_filter(entry['title'], keywords)
-        if keep:
-            data.append( {
-                'pmid': int(entry['pmid']),
-                'title': entry['title'],
-                'abstract': entry['abstract'],
-                'journal': entry['journal'],
-                'pubdate': entry['pubdate'],
-                'publication_types': entry['publication_types'],
-                'authors': entry['authors'],
-                'doi': entry['doi'],
-                'version': baselineversion
-            })
-    return data
+    return list(iter_baseline(xmlfile, keywords=keywords, kw_filter=kw_filter))
 
 def baseline_to_list_filter(xmlfile: str, *args, **kwargs) -> list:
     """
@@ -236,7 +437,7 @@ def baseline_to_list_filter(xmlfile: str, *args, **kwargs) -> list:
     
     参数:
     - xmlfile: XML文件路径
-    - keywords: 关键词列表
+    - keywords: 关键词列表或KeywordMatcher
     - kw_filter: 过滤字段 ('abstract', 'title', 'both')
     """
     keywords = kwargs.get('keywords', [])
@@ -245,39 +446,52 @@ def baseline_to_list_filter(xmlfile: str, *args, **kwargs) -> list:
     if kw_filter not in ['abstract', 'title', 'both']:
         raise ValueError('kw_filter must be "abstract", "title", or "both"')
 
-    data = []
-    path_xml = pp.parse_medline_xml(xmlfile)
-    filename = basename(xmlfile)
-    fileinfo = filename.split('.')
-    baselineversion = fileinfo[0]
-
-    for entry in path_xml:
-        keep = False
-        if kw_filter == 'both':
-            keep = keywords_filter(entry['abstract'], keywords) or keywords_filter(entry['title'], keywords)
-        elif kw_filter == 'abstract':
-            keep = keywords_filter(entry['abstract'], keywords)
-        elif kw_filter == 'title':
-            keep = keywords_filter(entry['title'], keywords)
-        
-        if keep:
-            data.append({
-                'pmid': int(entry['pmid']),
-                'title': entry['title'],
-                'abstract': entry['abstract'],
-                'journal': entry['journal'],
-                'pubdate': entry['pubdate'],
-                'publication_types': entry['publication_types'],
-                'authors': entry['authors'],
-                'doi': entry['doi'],
-                'version': baselineversion
-            })
-
-    return data
-
-
-def keywords_filter(sentence:str, keywords:list):
-    # List of keywords to look for in the sentence
+    return list(iter_baseline(xmlfile, keywords=keywords, kw_filter=kw_filter))
+
+
+class KeywordMatcher:
+    """
+    预编译的多关键词匹配器。
+
+    所有关键词只小写、编译一次，合并为一个正则表达式，匹配到第一个关键词即返回。
+    语义与逐词扫描相同：句子按空白切分后，只要某个词包含任一关键词即为命中，
+    因此包含空白的关键词永远不会命中。匹配器可以被pickle，便于传给工作进程。
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        patterns = set()
+        for keyword in self.keywords:
+            keyword = keyword.lower()
+            if keyword == '':
+                # 空关键词可以匹配任意一个词
+                patterns.add(r'\S')
+            elif keyword.split() == [keyword]:
+                patterns.add(re.escape(keyword))
+        # 长的关键词放在前面，保证编译结果稳定
+        alternation = '|'.join(sorted(patterns, key=lambda p: (-len(p), p)))
+        self._regex = re.compile(alternation) if alternation else None
+
+    def search(self, sentence: str) -> bool:
+        if self._regex is None or not sentence:
+            return False
+        return self._regex.search(sentence.lower()) is not None
+
+    __call__ = search
+
+    @property
+    def pattern(self):
+        """
+        合并后的正则表达式字符串，用于对小写文本做匹配（例如pandas的str.contains）；没有有效关键词时为None。
+        """
+        return None if self._regex is None else self._regex.pattern
+
+    def __repr__(self):
+        return f"KeywordMatcher({list(self.keywords)!r})"
+
+
+def keywords_filter(sentence:str, keywords):
+    # keywords可以是关键词列表，也可以是预先构建好的KeywordMatcher
     # keywords = [
     #     "promoter",
     #     "cis-regulatory",
@@ -286,23 +500,12 @@ def keywords_filter(sentence:str, keywords:list):
     #     "silencer",
     #     "operator",
     # ]
-    sentence = sentence.lower()
-    keep = False
-    # Use a regular expression to remove any words that don't contain any of the keywords
-    filtered_sentence = " ".join(
-        word
-        for word in sentence.split()
-        if any(keyword.lower() in word for keyword in keywords)
-    )
-
-    if filtered_sentence:
-        keep = True
-
-    return keep
+    if not isinstance(keywords, KeywordMatcher):
+        keywords = KeywordMatcher(keywords)
+    return keywords.search(sentence)
 
-def baseline_to_pd(xmlfile: str) -> pd.DataFrame:
-    data = baseline_to_dict(xmlfile)
-    return pd.DataFrame.from_dict(data).T
+def baseline_to_pd(xmlfile: str) -> 'pd.DataFrame':
+    return load_baseline(xmlfile, output_type='pd')
 
 
 def load_dict_from_pickle(filename):
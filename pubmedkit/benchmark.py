@@ -0,0 +1,546 @@
+"""
+解析、过滤、转换和写库各阶段的基准测试。
+
+生成指定规模的合成MEDLINE XML和MEDLINE文本文件，分别计时每个阶段，
+输出每秒记录数、MB/s和峰值内存（RSS），结果保存为JSON，可以与之前的结果比较以发现性能回退。
+startup阶段在新的解释器中计时导入pubmedkit的时间，import pubmedkit导入了pandas等重量级依赖时退出码为1。
+
+用法:
+python -m pubmedkit.benchmark --articles 20000 --output results.json
+python -m pubmedkit.benchmark --articles 20000 --compare results.json --threshold 0.15
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os.path import abspath, dirname, getsize, join
+
+__all__ = ['generate_medline_xml', 'generate_medline_text', 'run_benchmarks', 'compare_results', 'STAGES']
+
+BENCHMARK_FORMAT_VERSION = 1
+
+STAGES = ('startup', 'parse', 'parse_pp', 'filter', 'load', 'convert', 'text', 'insert')
+
+# 启动阶段计时的导入语句，以及不应在import pubmedkit时被导入的重量级依赖
+_STARTUP_STATEMENTS = ['import pubmedkit', 'from pubmedkit import iter_baseline',
+                       'from pubmedkit import iter_baseline_corpus', 'from pubmedkit import bulk_insert_pubmed_data']
+_HEAVY_MODULES = ('pandas', 'sqlalchemy', 'pubmed_parser', 'numpy', 'pyarrow', 'lxml')
+
+_LABELS = ['BACKGROUND', 'METHODS', 'RESULTS', 'CONCLUSIONS']
+_PUBLICATION_TYPES = [('D016428', 'Journal Article'), ('D013485', "Research Support, Non-U.S. Gov't"),
+                      ('D016454', 'Review'), ('D023362', 'Evaluation Study')]
+_MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def _vocabulary(seed: int, size: int = 5000) -> list:
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 12))))
+    return sorted(words)
+
+
+def _journals(seed: int, size: int = 300) -> list:
+    # 大部分期刊取自影响因子表，其余为查不到影响因子的期刊
+    from .journal import get_journal_table
+    names = get_journal_table().names[1:]
+    rng = random.Random(seed)
+    journals = rng.sample(names, min(size, len(names)))
+    journals += [f'Journal of Unindexed Studies {i}' for i in range(max(1, size // 10))]
+    return journals
+
+
+class _ArticleGenerator:
+    # 词频近似Zipf分布，少数常见词出现在大多数摘要中，关键词的选择性接近真实语料
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.vocabulary = _vocabulary(seed)
+        self.cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(self.vocabulary))))
+        self.journals = _journals(seed)
+
+    def words(self, n: int) -> str:
+        return ' '.join(self.rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=n))
+
+    def article(self, pmid: int) -> dict:
+        rng = self.rng
+        sections = rng.choice([1, 1, 4])
+        return {
+            'pmid': pmid,
+            'title': self.words(rng.randint(6, 20)).capitalize() + '.',
+            'abstract': [(_LABELS[i] if sections > 1 else None, self.words(rng.randint(40, 80)))
+                         for i in range(sections)],
+            'journal': rng.choice(self.journals),
+            'year': rng.randint(1980, 2024),
+            'month': rng.choice(_MONTHS),
+            'publication_types': rng.sample(_PUBLICATION_TYPES, rng.randint(1, 2)),
+            'authors': [(self.words(1).capitalize(), self.words(1).capitalize()) for _ in range(rng.randint(1, 12))],
+            'mesh': [self.words(2) for _ in range(rng.randint(0, 15))],
+            'doi': f'10.{rng.randint(1000, 9999)}/{pmid}',
+        }
+
+
+def _escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _article_xml(article: dict) -> str:
+    abstract = ''.join(
+        f'<AbstractText Label="{label}">{text}</AbstractText>' if label else f'<AbstractText>{text}</AbstractText>'
+        for label, text in article['abstract']
+    )
+    authors = ''.join(
+        f'<Author ValidYN="Y"><LastName>{last}</LastName><ForeName>{fore}</ForeName><Initials>{fore[0]}</Initials>'
+        f'<AffiliationInfo><Affiliation>Department of {last}, University of {fore}.</Affiliation></AffiliationInfo></Author>'
+        for last, fore in article['authors']
+    )
+    publication_types = ''.join(f'<PublicationType UI="{ui}">{name}</PublicationType>'
+                                for ui, name in article['publication_types'])
+    mesh = ''.join(f'<MeshHeading><DescriptorName UI="D000001" MajorTopicYN="N">{term}</DescriptorName></MeshHeading>'
+                   for term in article['mesh'])
+    journal = _escape(article['journal'])
+    pmid = article['pmid']
+    return (
+        f'<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM"><PMID Version="1">{pmid}</PMID>'
+        f'<Article PubModel="Print"><Journal><JournalIssue CitedMedium="Internet"><Volume>1</Volume>'
+        f'<PubDate><Year>{article["year"]}</Year><Month>{article["month"]}</Month></PubDate></JournalIssue>'
+        f'<Title>{journal}</Title></Journal><ArticleTitle>{article["title"]}</ArticleTitle>'
+        f'<Abstract>{abstract}</Abstract><AuthorList CompleteYN="Y">{authors}</AuthorList>'
+        f'<PublicationTypeList>{publication_types}</PublicationTypeList></Article>'
+        f'<MedlineJournalInfo><MedlineTA>{journal}</MedlineTA></MedlineJournalInfo>'
+        f'<MeshHeadingList>{mesh}</MeshHeadingList></MedlineCitation>'
+        f'<PubmedData><ArticleIdList><ArticleId IdType="pubmed">{pmid}</ArticleId>'
+        f'<ArticleId IdType="doi">{article["doi"]}</ArticleId></ArticleIdList></PubmedData></PubmedArticle>\n'
+    )
+
+
+def _article_text(article: dict) -> str:
+    def field(tag, value):
+        # MEDLINE文本格式每行最多约80个字符，超出部分以6个空格开头续行
+        lines, line = [], ''
+        for word in value.split(' '):
+            if line and len(line) + len(word) > 70:
+                lines.append(line)
+                line = word
+            else:
+                line = f'{line} {word}' if line else word
+        lines.append(line)
+        return f'{tag:<4}- ' + '\n      '.join(lines) + '\n'
+
+    text = field('PMID', str(article['pmid']))
+    text += field('DP', f'{article["year"]} {article["month"]}')
+    text += field('TI', article['title'])
+    text += field('AB', ' '.join(f'{label}: {body}' if label else body for label, body in article['abstract']))
+    for last, fore in article['authors']:
+        text += field('FAU', f'{last}, {fore}')
+        text += field('AU', f'{last} {fore[0]}')
+    for _, name in article['publication_types']:
+        text += field('PT', name)
+    for term in article['mesh']:
+        text += field('MH', term)
+    text += field('JT', article['journal'])
+    text += field('LID', f'{article["doi"]} [doi]')
+    return text + '\n'
+
+
+def generate_medline_xml(filename: str, n_articles: int, *args, **kwargs) -> int:
+    """
+    生成合成的MEDLINE XML文件（以.gz结尾时压缩），结构与PubMed基线文件相同。
+
+    参数:
+    filename (str): 输出文件路径。
+    n_articles (int): 文章数。
+    **kwargs: 支持start_pmid（默认1）、seed（默认0）和deleted（文件末尾DeleteCitation中的PMID数，默认0）。
+
+    返回:
+    int: 未压缩的XML字节数。
+    """
+    start_pmid = kwargs.get('start_pmid', 1)
+    deleted = kwargs.get('deleted', 0)
+    generator = _ArticleGenerator(kwargs.get('seed', 0))
+    opener = gzip.open if filename.endswith('.gz') else open
+    size = 0
+    with opener(filename, 'wt', encoding='utf-8') as f:
+        for chunk in _iter_xml(generator, start_pmid, n_articles, deleted):
+            f.write(chunk)
+            size += len(chunk.encode('utf-8'))
+    return size
+
+
+def _iter_xml(generator, start_pmid, n_articles, deleted):
+    yield '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE PubmedArticleSet>\n<PubmedArticleSet>\n'
+    for pmid in range(start_pmid, start_pmid + n_articles):
+        yield _article_xml(generator.article(pmid))
+    if deleted:
+        pmids = ''.join(f'<PMID Version="1">{pmid}</PMID>' for pmid in range(start_pmid, start_pmid + deleted))
+        yield f'<DeleteCitation>{pmids}</DeleteCitation>\n'
+    yield '</PubmedArticleSet>\n'
+
+
+def generate_medline_text(filename: str, n_articles: int, *args, **kwargs) -> int:
+    """
+    生成合成的MEDLINE文本格式文件（以.gz结尾时压缩），内容与同一seed生成的XML文件对应。
+
+    参数同generate_medline_xml（不支持deleted），返回未压缩的字节数。
+    """
+    start_pmid = kwargs.get('start_pmid', 1)
+    generator = _ArticleGenerator(kwargs.get('seed', 0))
+    opener = gzip.open if filename.endswith('.gz') else open
+    size = 0
+    with opener(filename, 'wt', encoding='utf-8') as f:
+        for pmid in range(start_pmid, start_pmid + n_articles):
+            chunk = _article_text(generator.article(pmid))
+            f.write(chunk)
+            size += len(chunk.encode('utf-8'))
+    return size
+
+
+def _keyword_set(seed: int, size: int) -> list:
+    # 从词表的中低频部分选取关键词，避免少数高频词命中全部记录
+    vocabulary = _vocabulary(seed)
+    rng = random.Random(seed + size)
+    return rng.sample(vocabulary[len(vocabulary) // 10:], size)
+
+
+def _peak_rss_mb() -> float:
+    # Linux上优先读取VmHWM，它在exec后重新计数，不包含启动子进程的父进程的内存
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _measure(stage: str, name: str, function, repeat: int, data_bytes: int = 0, records: int = None, **params) -> dict:
+    # function返回处理的记录数；给出records时function返回的是保留的记录数，记为kept
+    timings = []
+    returned = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        returned = function()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    result = {
+        'stage': stage,
+        'name': name,
+        'params': params,
+        'records': returned if records is None else records,
+        'seconds': round(best, 6),
+        'seconds_all': [round(t, 6) for t in timings],
+    }
+    if records is not None:
+        result['kept'] = returned
+    result['records_per_second'] = round(result['records'] / best, 1) if best else None
+    result['mb_per_second'] = round(data_bytes / best / 1e6, 2) if data_bytes and best else None
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def _parsed_records(xmlfile: str) -> list:
+    from .baseline import iter_baseline
+    return list(iter_baseline(xmlfile))
+
+
+def _bench_startup(options: dict) -> list:
+    # 每次在新的解释器中导入，耗时只包括导入语句本身，不包括解释器启动
+    env = dict(os.environ)
+    root = dirname(dirname(abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    results = []
+    for statement in _STARTUP_STATEMENTS:
+        code = (f'import sys, time\nstart = time.perf_counter()\n{statement}\n'
+                f'elapsed = time.perf_counter() - start\n'
+                f'print(elapsed, ",".join(m for m in {_HEAVY_MODULES!r} if m in sys.modules))')
+        timings = []
+        for _ in range(options['repeat']):
+            output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                                    check=True).stdout.split()
+            timings.append(float(output[0]))
+            heavy_modules = output[1].split(',') if len(output) > 1 else []
+        best = min(timings)
+        results.append({
+            'stage': 'startup',
+            'name': statement,
+            'params': {},
+            'records': 1,
+            'seconds': round(best, 6),
+            'seconds_all': [round(t, 6) for t in timings],
+            'heavy_modules': heavy_modules,
+            'records_per_second': round(1 / best, 1) if best else None,
+            'mb_per_second': None,
+            'peak_rss_mb': None,
+        })
+    return results
+
+
+def _bench_parse(options: dict) -> list:
+    from .baseline import iter_medline_articles
+    return [_measure('parse', 'iter_medline_articles', lambda: sum(1 for _ in iter_medline_articles(options['xml'])),
+                     options['repeat'], options['xml_bytes'])]
+
+
+def _bench_parse_pp(options: dict) -> list:
+    import pubmed_parser as pp
+    return [_measure('parse_pp', 'pp.parse_medline_xml', lambda: sum(1 for _ in pp.parse_medline_xml(options['xml'])),
+                     options['repeat'], options['xml_bytes'])]
+
+
+def _bench_filter(options: dict) -> list:
+    from .baseline import KeywordMatcher, filter_articles
+    records = _parsed_records(options['xml'])
+    results = []
+    for size in options['keyword_sizes']:
+        keywords = _keyword_set(options['seed'], size)
+        for kw_filter in ['abstract', 'both']:
+            def run():
+                matcher = KeywordMatcher(keywords)
+                return sum(1 for _ in filter_articles(records, 'bench', keywords=matcher, kw_filter=kw_filter))
+            results.append(_measure('filter', f'filter_articles[{kw_filter}]', run, options['repeat'],
+                                    records=len(records), keywords=size, kw_filter=kw_filter))
+    return results
+
+
+def _bench_load(options: dict) -> list:
+    from .baseline import load_baseline
+    results = []
+    for size in [0] + list(options['keyword_sizes']):
+        keywords = _keyword_set(options['seed'], size) if size else []
+        results.append(_measure('load', 'load_baseline', lambda: len(load_baseline(options['xml'], keywords=keywords)),
+                                options['repeat'], options['xml_bytes'], records=options['articles'], keywords=size))
+    return results
+
+
+def _bench_convert(options: dict) -> list:
+    from .baseline import records_to_pd
+    records = _parsed_records(options['xml'])
+    data_dict = {entry['pmid']: entry for entry in records}
+    return [
+        _measure('convert', 'dict', lambda: len({entry['pmid']: entry for entry in records}), options['repeat']),
+        _measure('convert', 'list', lambda: len(list(data_dict.values())), options['repeat']),
+        _measure('convert', 'pd', lambda: len(records_to_pd(data_dict)), options['repeat']),
+    ]
+
+
+def _bench_text(options: dict) -> list:
+    from .load_pubmed_file import iter_medline_text
+    return [_measure('text', 'iter_medline_text', lambda: sum(1 for _ in iter_medline_text(options['text'])),
+                     options['repeat'], options['text_bytes'])]
+
+
+def _bench_insert(options: dict) -> list:
+    from sqlalchemy import create_engine
+    from .db_utils import create_pubmed_table, insert_pubmed_data, bulk_insert_pubmed_data
+    records = _parsed_records(options['xml'])
+    results = []
+    for database in ['memory', 'file']:
+        for name, insert in [('insert_pubmed_data', insert_pubmed_data),
+                             ('bulk_insert_pubmed_data', bulk_insert_pubmed_data)]:
+            def run():
+                if database == 'memory':
+                    engine = create_engine('sqlite://')
+                else:
+                    path = join(options['workdir'], 'bench.sqlite')
+                    if os.path.exists(path):
+                        os.remove(path)
+                    engine = create_engine(f'sqlite:///{path}')
+                create_pubmed_table(engine)
+                insert(engine, records)
+                engine.dispose()
+                return len(records)
+            results.append(_measure('insert', name, run, options['repeat'], database=f'sqlite-{database}'))
+    return results
+
+
+_STAGE_FUNCTIONS = {
+    'startup': _bench_startup,
+    'parse': _bench_parse,
+    'parse_pp': _bench_parse_pp,
+    'filter': _bench_filter,
+    'load': _bench_load,
+    'convert': _bench_convert,
+    'text': _bench_text,
+    'insert': _bench_insert,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=dirname(abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_version():
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version('pubmedkit')
+    except PackageNotFoundError:
+        return None
+
+
+def run_benchmarks(*args, **kwargs) -> dict:
+    """
+    生成合成数据并依次运行各阶段的基准测试。
+
+    每个阶段在新启动的子进程中运行，peak_rss_mb为该子进程的峰值内存（包括阶段所需的输入数据），
+    不受其他阶段的影响。seconds为repeat次运行中最快的一次。
+
+    参数:
+    **kwargs: 支持articles（文章数，默认10000）、stages（默认全部，见STAGES）、
+              keyword_sizes（关键词集合大小，默认[1, 10, 100]）、repeat（默认3）、seed（默认0）、
+              workdir（存放生成文件的目录，默认临时目录）和isolate（默认True，为False时在当前进程中运行）。
+
+    返回:
+    dict: 包含运行环境信息和results列表的结果，可用json保存。
+    """
+    articles = kwargs.get('articles', 10000)
+    stages = list(kwargs.get('stages', STAGES))
+    unknown = [stage for stage in stages if stage not in _STAGE_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Unknown stages {unknown}, must be in {STAGES}")
+    isolate = kwargs.get('isolate', True)
+
+    with tempfile.TemporaryDirectory(dir=kwargs.get('workdir', None)) as workdir:
+        options = {
+            'articles': articles,
+            'keyword_sizes': list(kwargs.get('keyword_sizes', [1, 10, 100])),
+            'repeat': kwargs.get('repeat', 3),
+            'seed': kwargs.get('seed', 0),
+            'workdir': workdir,
+            'xml': join(workdir, 'pubmedbench.xml.gz'),
+            'text': join(workdir, 'pubmedbench.txt'),
+        }
+        start = time.perf_counter()
+        options['xml_bytes'] = generate_medline_xml(options['xml'], articles, seed=options['seed'])
+        options['text_bytes'] = generate_medline_text(options['text'], articles, seed=options['seed'])
+        generate_seconds = time.perf_counter() - start
+        xml_compressed_bytes = getsize(options['xml'])
+
+        results = []
+        for stage in stages:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    results.extend(executor.submit(_STAGE_FUNCTIONS[stage], options).result())
+            else:
+                results.extend(_STAGE_FUNCTIONS[stage](options))
+
+    return {
+        'format': BENCHMARK_FORMAT_VERSION,
+        'version': _package_version(),
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'articles': articles,
+        'xml_bytes': options['xml_bytes'],
+        'text_bytes': options['text_bytes'],
+        'xml_compressed_bytes': xml_compressed_bytes,
+        'generate_seconds': round(generate_seconds, 3),
+        'results': results,
+    }
+
+
+def _result_key(result: dict):
+    return (result['stage'], result['name'], json.dumps(result['params'], sort_keys=True))
+
+
+def compare_results(old: dict, new: dict, threshold: float = 0.1) -> list:
+    """
+    比较两次基准测试结果，返回每个共同测试项的变化，ratio为新耗时与旧耗时之比。
+
+    耗时增加超过threshold（默认10%）的测试项regression为True。
+    不同文章数的结果按每秒记录数比较。
+    """
+    old_results = {_result_key(result): result for result in old['results']}
+    comparison = []
+    for result in new['results']:
+        previous = old_results.get(_result_key(result))
+        if previous is None or not previous['records_per_second'] or not result['records_per_second']:
+            continue
+        ratio = previous['records_per_second'] / result['records_per_second']
+        comparison.append({
+            'stage': result['stage'],
+            'name': result['name'],
+            'params': result['params'],
+            'old_records_per_second': previous['records_per_second'],
+            'new_records_per_second': result['records_per_second'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold,
+        })
+    return comparison
+
+
+def _format_table(results: list) -> str:
+    lines = [f"{'stage':<9} {'name':<30} {'params':<32} {'records/s':>12} {'MB/s':>8} {'peak MB':>8}"]
+    for result in results:
+        params = ','.join(f'{key}={value}' for key, value in result['params'].items())
+        mb_per_second = result['mb_per_second'] if result['mb_per_second'] is not None else ''
+        peak_rss_mb = result['peak_rss_mb'] if result['peak_rss_mb'] is not None else ''
+        lines.append(f"{result['stage']:<9} {result['name']:<30} {params:<32} "
+                     f"{result['records_per_second'] or 0:>12.0f} {mb_per_second:>8} {peak_rss_mb:>8}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pubmedkit.benchmark', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000, help='合成文件中的文章数')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=STAGES)
+    parser.add_argument('--keyword-sizes', nargs='+', type=int, default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=None, help='存放生成文件的目录')
+    parser.add_argument('--output', default=None, help='结果JSON文件，默认输出到标准输出')
+    parser.add_argument('--compare', default=None, help='与之前的结果JSON文件比较，有回退时退出码为1')
+    parser.add_argument('--threshold', type=float, default=0.1, help='判定为回退的耗时增加比例')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(articles=args.articles, stages=args.stages, keyword_sizes=args.keyword_sizes,
+                            repeat=args.repeat, seed=args.seed, workdir=args.workdir)
+    print(_format_table(report['results']), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        comparison = compare_results(previous, report, args.threshold)
+        regressions = [item for item in comparison if item['regression']]
+        for item in comparison:
+            flag = 'REGRESSION' if item['regression'] else ''
+            print(f"{item['stage']:<9} {item['name']:<30} {item['ratio']:>6.2f}x {flag}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    # import pubmedkit不应导入任何重量级依赖
+    eager = [result for result in report['results']
+             if result['name'] == _STARTUP_STATEMENTS[0] and result.get('heavy_modules')]
+    if eager:
+        print(f"import pubmedkit loaded {', '.join(eager[0]['heavy_modules'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
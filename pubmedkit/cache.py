@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import logging
+import os
+import pickle
+from os.path import abspath, getsize, isdir, join
+from .baseline import iter_medline_articles
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['ParseCache']
+
+# 缓存格式变化时递增，旧格式的缓存文件会自动失效
+CACHE_FORMAT_VERSION = 2
+
+_FIELDS = ('pmid', 'title', 'abstract', 'journal', 'pubdate', 'publication_types', 'authors', 'doi')
+
+
+class ParseCache:
+    """
+    基线文件解析结果的磁盘缓存。
+
+    缓存中保存的是未经过滤的文章记录（包括删除记录），以元组分块pickle后gzip压缩写入。
+    缓存键由文件路径、大小和修改时间（或文件内容的MD5）生成，文件变化后自动失效。
+    修改keywords、kw_filter或impact_factor后再次加载同一文件时，直接从缓存读取再过滤，
+    无需重新解析XML。缓存总大小超过max_bytes时，按最近使用时间淘汰最旧的缓存文件。
+
+    用法:
+    cache = ParseCache('~/.cache/pubmedkit')
+    data = load_baseline(xmlfile, keywords=keywords, cache=cache)
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 20 * 1024 ** 3, checksum: str = 'stat', chunk_size: int = 1000):
+        if checksum not in ['stat', 'md5']:
+            raise ValueError('checksum must be "stat" or "md5"')
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.checksum = checksum
+        self.chunk_size = chunk_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, xmlfile: str) -> str:
+        if self.checksum == 'md5':
+            digest = hashlib.md5()
+            with open(xmlfile, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            source = f"md5:{digest.hexdigest()}"
+        else:
+            stat = os.stat(xmlfile)
+            source = f"stat:{abspath(xmlfile)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha1(f"{CACHE_FORMAT_VERSION}:{source}".encode()).hexdigest()
+
+    def path(self, xmlfile: str) -> str:
+        return join(self.cache_dir, self.key(xmlfile) + '.pkl.gz')
+
+    def iter_articles(self, xmlfile: str, include_deleted: bool = False):
+        """
+        产出文件中未经过滤的文章记录：命中缓存时从缓存读取，否则解析XML并同时写入缓存。
+        """
+        cache_file = self.path(xmlfile)
+        if os.path.exists(cache_file):
+            # 更新修改时间，作为淘汰时的最近使用时间
+            os.utime(cache_file)
+            yield from self._read(cache_file, include_deleted)
+            return
+
+        # 先写入临时文件，完整解析后再替换，中途失败或提前停止都不会留下不完整的缓存
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(tmp_file, 'wb', compresslevel=1) as f:
+                chunk = []
+                for entry in iter_medline_articles(xmlfile, include_deleted=True):
+                    if entry.get('delete', False):
+                        # 删除记录只保存pmid
+                        chunk.append((entry['pmid'],))
+                    else:
+                        chunk.append(tuple(entry[field] for field in _FIELDS))
+                    if len(chunk) >= self.chunk_size:
+                        pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                        chunk = []
+                    if include_deleted or not entry.get('delete', False):
+                        yield entry
+                if chunk:
+                    pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        self.evict()
+
+    def evict(self):
+        """
+        缓存总大小超过max_bytes时，删除最久未使用的缓存文件。
+        """
+        if not isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl.gz'):
+                cache_file = join(self.cache_dir, name)
+                stat = os.stat(cache_file)
+                entries.append((stat.st_mtime, stat.st_size, cache_file))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, cache_file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            logger.info(f"evict parse cache {cache_file}")
+            os.remove(cache_file)
+            total -= size
+
+    def size(self) -> int:
+        return sum(getsize(join(self.cache_dir, name)) for name in os.listdir(self.cache_dir) if name.endswith('.pkl.gz'))
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl.gz'):
+                os.remove(join(self.cache_dir, name))
+
+    @staticmethod
+    def _read(cache_file: str, include_deleted: bool):
+        with gzip.open(cache_file, 'rb') as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    break
+                for values in chunk:
+                    if len(values) == 1:
+                        if include_deleted:
+                            yield {'pmid': values[0], 'delete': True}
+                    else:
+                        yield dict(zip(_FIELDS, values))
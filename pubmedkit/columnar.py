@@ -0,0 +1,194 @@
+from array import array
+from .baseline import iter_baseline
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+__all__ = ['ArrowRecordBuilder', 'records_to_arrow', 'arrow_to_records', 'baseline_to_arrow', 'write_parquet_dataset',
+           'baseline_to_parquet', 'load_parquet', 'PUBMED_ARROW_SCHEMA']
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError('pyarrow is required for columnar output, install it with "pip install pyarrow"')
+
+
+if pa is not None:
+    PUBMED_ARROW_SCHEMA = pa.schema([
+        ('pmid', pa.int64()),
+        ('title', pa.string()),
+        ('abstract', pa.string()),
+        ('journal', pa.dictionary(pa.int32(), pa.string())),
+        ('pubdate', pa.string()),
+        ('publication_types', pa.list_(pa.string())),
+        ('authors', pa.list_(pa.string())),
+        ('doi', pa.string()),
+        ('version', pa.dictionary(pa.int32(), pa.string())),
+    ])
+else:
+    PUBMED_ARROW_SCHEMA = None
+
+
+class ArrowRecordBuilder:
+    """
+    边解析边构建列式缓冲区，最后组装为pyarrow.Table。
+
+    pmid直接写入int64数组，journal和version在追加时进行字典编码，
+    authors和publication_types拆分为列表列（偏移量数组 + 扁平值列表），
+    避免先构建字典再转置成全object类型的DataFrame。
+    """
+
+    _string_columns = ('title', 'abstract', 'pubdate', 'doi')
+    _dictionary_columns = ('journal', 'version')
+    # 与pubmed_parser输出字符串中的分隔符对应
+    _list_columns = {'publication_types': '; ', 'authors': ';'}
+
+    def __init__(self):
+        _require_pyarrow()
+        self._pmid = array('q')
+        self._strings = {name: [] for name in self._string_columns}
+        self._dictionaries = {name: {} for name in self._dictionary_columns}
+        self._indices = {name: array('i') for name in self._dictionary_columns}
+        self._offsets = {name: array('i', [0]) for name in self._list_columns}
+        self._values = {name: [] for name in self._list_columns}
+
+    def __len__(self):
+        return len(self._pmid)
+
+    def append(self, record: dict):
+        self._pmid.append(int(record['pmid']))
+        for name in self._string_columns:
+            self._strings[name].append(record[name])
+        for name in self._dictionary_columns:
+            self._indices[name].append(self._dictionaries[name].setdefault(record[name], len(self._dictionaries[name])))
+        for name, separator in self._list_columns.items():
+            value = record[name]
+            if isinstance(value, str):
+                value = value.split(separator) if value else []
+            self._values[name].extend(value)
+            self._offsets[name].append(len(self._values[name]))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+        return self
+
+    def finish(self):
+        """
+        组装并返回pyarrow.Table，pmid等数值缓冲区不经复制直接转换为Arrow数组，
+        因此调用finish之后不能再继续追加记录。
+        """
+        columns = {'pmid': pa.Array.from_buffers(pa.int64(), len(self._pmid), [None, pa.py_buffer(self._pmid)])}
+        for name in self._string_columns:
+            columns[name] = pa.array(self._strings[name], type=pa.string())
+        for name in self._dictionary_columns:
+            indices = pa.Array.from_buffers(pa.int32(), len(self._indices[name]), [None, pa.py_buffer(self._indices[name])])
+            columns[name] = pa.DictionaryArray.from_arrays(indices, pa.array(list(self._dictionaries[name]), type=pa.string()))
+        for name in self._list_columns:
+            offsets = pa.Array.from_buffers(pa.int32(), len(self._offsets[name]), [None, pa.py_buffer(self._offsets[name])])
+            columns[name] = pa.ListArray.from_arrays(offsets, pa.array(self._values[name], type=pa.string()))
+        return pa.Table.from_arrays([columns[field.name] for field in PUBMED_ARROW_SCHEMA], schema=PUBMED_ARROW_SCHEMA)
+
+
+def records_to_arrow(records):
+    """
+    将记录字典的可迭代对象（例如iter_baseline或iter_baseline_corpus的批次）转换为pyarrow.Table。
+    """
+    return ArrowRecordBuilder().extend(records).finish()
+
+
+def arrow_to_records(table):
+    """
+    将pyarrow.Table逐行还原为记录字典，列表列按原来的分隔符重新拼接为字符串，
+    得到的记录可以直接交给insert_pubmed_data、bulk_insert_pubmed_data等函数。
+
+    返回:
+    generator: 逐条产出记录字典。
+    """
+    separators = ArrowRecordBuilder._list_columns
+    for batch in table.to_batches():
+        columns = {name: batch.column(name).to_pylist() for name in batch.schema.names}
+        for i in range(batch.num_rows):
+            record = {name: values[i] for name, values in columns.items()}
+            for name, separator in separators.items():
+                if isinstance(record.get(name), list):
+                    record[name] = separator.join(record[name])
+            yield record
+
+
+def baseline_to_arrow(xmlfile: str, *args, **kwargs):
+    """
+    解析基线文件并直接构建列式的pyarrow.Table。
+
+    参数:
+    xmlfile (str): XML文件路径。
+    **kwargs: 传给iter_baseline的参数（keywords、kw_filter、impact_factor等）。
+
+    返回:
+    pyarrow.Table: 列类型见PUBMED_ARROW_SCHEMA。
+    """
+    return records_to_arrow(iter_baseline(xmlfile, **kwargs))
+
+
+def write_parquet_dataset(table, root_path: str, *args, **kwargs):
+    """
+    将pyarrow.Table按version分区写入Parquet数据集（root_path/version=.../*.parquet）。
+
+    重复写入同一个基线版本时，该版本原有的分区会被替换。
+
+    参数:
+    table: pyarrow.Table或记录字典的可迭代对象。
+    root_path (str): 数据集根目录。
+    **kwargs: 支持compression（默认'zstd'）。
+    """
+    _require_pyarrow()
+    if not isinstance(table, pa.Table):
+        table = records_to_arrow(table)
+
+    compression = kwargs.get('compression', 'zstd')
+    pq.write_to_dataset(table, root_path, partition_cols=['version'], compression=compression,
+                        existing_data_behavior='delete_matching')
+
+
+def baseline_to_parquet(xmlfile: str, root_path: str, *args, **kwargs):
+    """
+    解析基线文件并写入按version分区的Parquet数据集，返回写入的记录数。
+
+    **kwargs: compression传给write_parquet_dataset，其余参数传给iter_baseline。
+    """
+    compression = kwargs.pop('compression', 'zstd')
+    table = baseline_to_arrow(xmlfile, **kwargs)
+    write_parquet_dataset(table, root_path, compression=compression)
+    return table.num_rows
+
+
+def load_parquet(root_path: str, *args, **kwargs):
+    """
+    从Parquet数据集读取记录。
+
+    参数:
+    root_path (str): 数据集根目录。
+    **kwargs: 支持columns（只读取部分列）、versions（只读取部分基线版本）
+              和output_type（'arrow'或'pd'，默认'arrow'）。
+
+    返回:
+    pyarrow.Table或DataFrame。
+    """
+    _require_pyarrow()
+    columns = kwargs.get('columns', None)
+    versions = kwargs.get('versions', None)
+    output_type = kwargs.get('output_type', 'arrow')
+
+    if output_type not in ['arrow', 'pd']:
+        raise ValueError('output_type must be "arrow" or "pd"')
+
+    filters = [('version', 'in', list(versions))] if versions else None
+    table = pq.read_table(root_path, columns=columns, filters=filters)
+
+    if output_type == 'pd':
+        return table.to_pandas()
+    return table
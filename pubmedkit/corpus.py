@@ -0,0 +1,352 @@
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import traceback
+from os.path import basename
+from .baseline import iter_baseline, KeywordMatcher
+from .journal import get_journal_table
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['iter_baseline_corpus', 'load_baseline_corpus', 'format_error']
+
+
+def iter_baseline_corpus(files: list, workers: int = 4, *args, **kwargs):
+    """
+    使用多个进程并行解析基线文件，并以批次的形式逐批产出记录。
+
+    工作进程把记录按batch_size分批放入一个有界队列，父进程消费得慢时
+    工作进程会阻塞等待（背压），因此父进程的内存不会随语料大小增长。
+
+    参数:
+    files (list): XML文件路径列表。
+    workers (int): 工作进程数，为0时在当前进程中顺序解析。
+    **kwargs: 支持batch_size（默认1000）、queue_size（默认workers * 2）、report、metrics、
+              transport、db_url和parquet_path，
+              其余参数（keywords、kw_filter、impact_factor等）传给iter_baseline。
+              report为字典时，每个文件的处理结果会写入其中：
+              {xmlfile: {'records': 记录数, 'error': None或错误信息}}。
+              metrics为Metrics时，工作进程中记录的解析时间和计数会传回父进程记入其中。
+              transport为'pickle'（默认）时记录字典列表经pickle通过队列传回父进程；
+              为'arrow'时工作进程把每批记录转换为pyarrow.Table，以Arrow IPC格式写入共享内存（/dev/shm），
+              队列中只传递文件名，父进程通过内存映射得到零复制的pyarrow.Table，不再逐条反序列化（需要pyarrow）。
+              db_url或parquet_path不为None时，每个工作进程直接写入：db_url为数据库URL，
+              每个工作进程使用自己的连接调用bulk_insert_pubmed_data（适合PostgreSQL、MySQL等服务器数据库，
+              多个进程同时写SQLite会互相等待锁）；parquet_path为按version分区的Parquet数据集目录，
+              每个工作进程写自己的文件。此时父进程只接收写入的记录数。
+
+    返回:
+    generator: 逐批产出(xmlfile, records)元组，records为记录字典列表（transport='arrow'时为pyarrow.Table，
+               工作进程直接写入时为写入的记录数）。
+    """
+    batch_size = kwargs.pop('batch_size', 1000)
+    queue_size = kwargs.pop('queue_size', max(workers, 1) * 2)
+    report = kwargs.pop('report', None)
+    if report is None:
+        report = {}
+    metrics = kwargs.pop('metrics', None)
+    transport = kwargs.pop('transport', 'pickle')
+    output = _worker_output(kwargs.pop('db_url', None), kwargs.pop('parquet_path', None))
+    if transport not in ['pickle', 'arrow']:
+        raise ValueError('transport must be "pickle" or "arrow"')
+    if transport == 'arrow' or (output is not None and output[0] == 'parquet'):
+        from .columnar import _require_pyarrow
+        _require_pyarrow()
+
+    # 关键词在父进程中编译一次，随参数传给各个工作进程
+    if 'keywords' in kwargs and not isinstance(kwargs['keywords'], KeywordMatcher):
+        kwargs['keywords'] = KeywordMatcher(kwargs['keywords'])
+    # 在父进程中构建期刊查找表，fork出的工作进程直接继承，不再各自加载
+    if kwargs.get('impact_factor', 0) > 0 and kwargs.get('journal_table', None) is None:
+        get_journal_table()
+
+    files = list(files)
+    if workers <= 0:
+        writer = _BatchWriter(output, metrics)
+        for xmlfile in files:
+            count = 0
+            try:
+                for number, records in enumerate(_iter_batches(xmlfile, batch_size, dict(kwargs, metrics=metrics))):
+                    if output is not None:
+                        records = writer.write(xmlfile, number, records)
+                        count += records
+                        yield xmlfile, records
+                        continue
+                    count += len(records)
+                    if transport == 'arrow':
+                        records = _to_arrow(records)
+                    yield xmlfile, records
+            except Exception as e:
+                _report_error(report, xmlfile, count, format_error(e))
+            else:
+                report[xmlfile] = {'records': count, 'error': None}
+        writer.close()
+        return
+
+    # 共享内存中的批次文件放在本次运行自己的目录中，结束时（包括工作进程异常退出时）整体删除
+    shared_dir = tempfile.mkdtemp(prefix='pubmedkit-', dir=_shared_memory_dir()) if transport == 'arrow' else None
+
+    ctx = multiprocessing.get_context()
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue(maxsize=queue_size)
+    for xmlfile in files:
+        task_queue.put(xmlfile)
+
+    workers = min(workers, len(files))
+    for _ in range(workers):
+        task_queue.put(None)
+
+    processes = [
+        ctx.Process(target=_corpus_worker, args=(worker_id, task_queue, result_queue, batch_size, kwargs, metrics is not None,
+                                                 shared_dir, output),
+                    daemon=True)
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # 记录每个工作进程正在处理的文件，工作进程异常退出时据此报告失败
+    in_progress = {}
+    counts = {}
+    running = set(range(workers))
+
+    def handle(kind, worker_id, xmlfile, payload):
+        if kind == 'start':
+            in_progress[worker_id] = xmlfile
+            counts[xmlfile] = 0
+        elif kind == 'batch':
+            counts[xmlfile] += len(payload)
+            yield xmlfile, payload
+        elif kind == 'shared':
+            table = _read_shared_batch(payload)
+            counts[xmlfile] += table.num_rows
+            yield xmlfile, table
+        elif kind == 'written':
+            counts[xmlfile] += payload
+            yield xmlfile, payload
+        elif kind == 'metrics':
+            for event in payload:
+                metrics.record(*event)
+        elif kind == 'done':
+            in_progress.pop(worker_id, None)
+            report[xmlfile] = {'records': counts.pop(xmlfile), 'error': None}
+        elif kind == 'error':
+            in_progress.pop(worker_id, None)
+            _report_error(report, xmlfile, counts.pop(xmlfile), payload)
+        elif kind == 'exit':
+            running.discard(worker_id)
+
+    try:
+        while running:
+            try:
+                message = result_queue.get(timeout=1)
+            except queue.Empty:
+                # 工作进程可能在超时之后发完最后的批次和'done'、'exit'再退出，
+                # 先记下已经退出的进程，再取完队列中剩余的消息，之后仍未发出'exit'的才是异常退出
+                exited = [worker_id for worker_id in running if not processes[worker_id].is_alive()]
+                while True:
+                    try:
+                        message = result_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    yield from handle(*message)
+                for worker_id in exited:
+                    if worker_id not in running:
+                        continue
+                    running.discard(worker_id)
+                    xmlfile = in_progress.pop(worker_id, None)
+                    if xmlfile is not None:
+                        _report_error(report, xmlfile, counts.get(xmlfile, 0),
+                                      f"worker exited with code {processes[worker_id].exitcode}")
+                continue
+            yield from handle(*message)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def load_baseline_corpus(files: list, sink=None, workers: int = 4, *args, **kwargs):
+    """
+    并行解析一组基线文件，把记录批次交给sink处理，并返回每个文件的处理结果。
+
+    参数:
+    files (list): XML文件路径列表。
+    sink (callable): 接收记录列表的函数，例如
+                     lambda records: insert_pubmed_data(engine, records)。
+                     transport='arrow'时接收pyarrow.Table。
+                     为None时把所有记录收集到列表中（transport='arrow'时合并为一个pyarrow.Table）返回。
+    workers (int): 工作进程数。
+    **kwargs: 传给iter_baseline_corpus的参数。给出db_url或parquet_path时由工作进程直接写入，sink不会被调用。
+
+    返回:
+    dict或tuple: 有sink或由工作进程直接写入时返回报告字典{xmlfile: {'records': 记录数, 'error': 错误信息}}；
+                 否则返回(records, report)。
+    """
+    report = {}
+    direct = kwargs.get('db_url', None) is not None or kwargs.get('parquet_path', None) is not None
+    collected = [] if sink is None else None
+    for xmlfile, records in iter_baseline_corpus(files, workers, report=report, **kwargs):
+        if direct:
+            continue
+        if sink is None:
+            if isinstance(records, list):
+                collected.extend(records)
+            else:
+                collected.append(records)
+        else:
+            sink(records)
+
+    if direct or sink is not None:
+        return report
+    if kwargs.get('transport', 'pickle') == 'arrow':
+        import pyarrow as pa
+        from .columnar import PUBMED_ARROW_SCHEMA
+        return pa.concat_tables(collected) if collected \
+            else PUBMED_ARROW_SCHEMA.empty_table(), report
+    return collected, report
+
+
+def _iter_batches(xmlfile: str, batch_size: int, kwargs: dict):
+    records = []
+    for entry in iter_baseline(xmlfile, **kwargs):
+        records.append(entry)
+        if len(records) >= batch_size:
+            yield records
+            records = []
+    if records:
+        yield records
+
+
+def _shared_memory_dir() -> str:
+    # Linux上/dev/shm是内存文件系统，其他平台退回到临时目录（仍由页缓存承载）
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def _to_arrow(records):
+    from .columnar import records_to_arrow
+    return records_to_arrow(records)
+
+
+def _write_shared_batch(shared_dir: str, records: list) -> str:
+    import pyarrow as pa
+    table = _to_arrow(records)
+    fd, path = tempfile.mkstemp(suffix='.arrow', dir=shared_dir)
+    os.close(fd)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def _read_shared_batch(path: str):
+    import pyarrow as pa
+    # 读出的Table直接引用映射的内存；映射建立后即可删除文件，内存在Table释放后回收
+    source = pa.memory_map(path)
+    os.remove(path)
+    return pa.ipc.open_stream(source).read_all()
+
+
+def _worker_output(db_url, parquet_path):
+    if db_url is not None and parquet_path is not None:
+        raise ValueError('db_url and parquet_path cannot be used together')
+    if db_url is not None:
+        return 'db', db_url
+    if parquet_path is not None:
+        return 'parquet', parquet_path
+    return None
+
+
+class _BatchWriter:
+    """
+    工作进程直接写入数据库或Parquet数据集，数据库引擎在第一次写入时在工作进程中创建。
+    """
+
+    def __init__(self, output, metrics=None):
+        self.output = output
+        self.metrics = metrics
+        self.engine = None
+
+    def write(self, xmlfile: str, number: int, records: list) -> int:
+        kind, target = self.output
+        if kind == 'db':
+            from .db_utils import create_db_engine, bulk_insert_pubmed_data
+            if self.engine is None:
+                self.engine = create_db_engine(target)
+            return bulk_insert_pubmed_data(self.engine, records, chunk_size=len(records), metrics=self.metrics)
+
+        import pyarrow.parquet as pq
+        table = _to_arrow(records)
+        # 文件名由源文件和批次序号决定，重新处理同一文件时覆盖原来的文件
+        stem = basename(xmlfile).split('.')[0]
+        pq.write_to_dataset(table, target, partition_cols=['version'], compression='zstd',
+                            basename_template=f'{stem}-{number:06d}-{{i}}.parquet',
+                            existing_data_behavior='overwrite_or_ignore')
+        return table.num_rows
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
+
+
+def _corpus_worker(worker_id, task_queue, result_queue, batch_size, kwargs, collect_metrics=False,
+                   shared_dir=None, output=None):
+    # 工作进程中记录的数据先缓存为事件列表，每个文件结束后发回父进程重放
+    events = []
+    metrics = None
+    if collect_metrics:
+        metrics = Metrics(callbacks=[lambda *event: events.append(event)])
+        kwargs = dict(kwargs, metrics=metrics)
+    writer = _BatchWriter(output, metrics)
+    while True:
+        xmlfile = task_queue.get()
+        if xmlfile is None:
+            break
+        result_queue.put(('start', worker_id, xmlfile, None))
+        try:
+            for number, records in enumerate(_iter_batches(xmlfile, batch_size, kwargs)):
+                if output is not None:
+                    result_queue.put(('written', worker_id, xmlfile, writer.write(xmlfile, number, records)))
+                elif shared_dir is not None:
+                    result_queue.put(('shared', worker_id, xmlfile, _write_shared_batch(shared_dir, records)))
+                else:
+                    result_queue.put(('batch', worker_id, xmlfile, records))
+        except Exception as e:
+            error = format_error(e)
+        else:
+            error = None
+        if events:
+            result_queue.put(('metrics', worker_id, xmlfile, events))
+            events = []
+        if error is None:
+            result_queue.put(('done', worker_id, xmlfile, None))
+        else:
+            result_queue.put(('error', worker_id, xmlfile, error))
+    writer.close()
+    result_queue.put(('exit', worker_id, None, None))
+
+
+def format_error(e: Exception) -> str:
+    """
+    把异常格式化为一行错误信息，有__cause__时附上其原因，用于报告和清单表。
+    """
+    message = ''.join(traceback.format_exception_only(type(e), e)).strip()
+    if e.__cause__ is not None:
+        message += ': ' + ''.join(traceback.format_exception_only(type(e.__cause__), e.__cause__)).strip()
+    # lxml的语法错误和异常链中常带有换行，合并为一行
+    return ' '.join(message.split())
+
+
+def _report_error(report: dict, xmlfile: str, count: int, message: str):
+    logger.error(f"Error in file {xmlfile}: {message}")
+    report[xmlfile] = {'records': count, 'error': message}
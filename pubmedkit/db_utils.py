@@ -1,18 +1,68 @@
+import io
 import logging
-import pandas as pd
-from sqlalchemy import (create_engine, Table, Column, String, Integer, MetaData, Text, Float, BigInteger,
-                        select, and_, or_, not_, func, insert, text, exc)
+import pickle
+import time
+from datetime import datetime
+from os.path import basename
+from sqlalchemy import (create_engine, Table, Column, String, Integer, MetaData, Text, Float, BigInteger, DateTime,
+                        Index, select, and_, or_, not_, func, insert, update, delete, text, exc)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from .baseline import iter_baseline
+from .journal import get_journal_table
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_db_engine(db_url: str):
-    return create_engine(db_url)
+__all__ = ['PUBMED_COLUMNS', 'create_db_engine', 'get_table', 'create_pubmed_table', 'create_journal_table',
+           'insert_pubmed_data', 'bulk_insert_pubmed_data', 'insert_pubmed_frame', 'create_pmid_unique_index',
+           'deduplicate_pubmed_table', 'create_update_file_table', 'upsert_pubmed_data', 'apply_pubmed_file', 'record_update_file',
+           'apply_update_file', 'apply_update_files',
+           'search_pubmed_table_simple', 'search_pubmed_table', 'insert_journal_data', 'insert_journal_metrics',
+           'update_pubmed_journal_ids', 'join_pubmed_and_journal']
+
+# 已反射的表对象缓存，键为(数据库URL, 表名)
+_table_cache = {}
+
+# 默认JournalTable加载失败时的异常，之后不再重试
+_journal_table_error = None
+
+PUBMED_COLUMNS = ('pmid', 'title', 'abstract', 'journal', 'pubdate', 'publication_types', 'authors', 'doi', 'version')
+
+def create_db_engine(db_url: str, *args, **kwargs):
+    """
+    创建SQLAlchemy引擎并配置连接池。
+
+    参数:
+    db_url (str): 数据库URL。
+    **kwargs: 支持pool_size（连接池大小，默认5）、max_overflow（超出连接池的额外连接数，默认10）、
+              pool_pre_ping（取出连接时检查连接是否仍然可用，默认True）、
+              pool_recycle（连接使用多少秒后重建，避免被服务器断开，默认3600）和pool_timeout（默认30），
+              其余参数传给create_engine。内存中的SQLite数据库不使用连接池参数。
+    """
+    kwargs.setdefault('pool_pre_ping', True)
+    kwargs.setdefault('pool_recycle', 3600)
+    url = make_url(db_url)
+    if url.get_backend_name() == 'sqlite' and url.database in [None, '', ':memory:']:
+        for key in ['pool_size', 'max_overflow', 'pool_timeout']:
+            kwargs.pop(key, None)
+    else:
+        kwargs.setdefault('pool_size', 5)
+        kwargs.setdefault('max_overflow', 10)
+    return create_engine(db_url, **kwargs)
+
+def get_table(engine, table_name: str, refresh: bool = False):
+    # 只反射需要的表，并在进程内缓存，避免每次插入都反射整个数据库
+    key = (engine.url.render_as_string(hide_password=False), table_name)
+    if refresh or key not in _table_cache:
+        _table_cache[key] = Table(table_name, MetaData(), autoload_with=engine)
+    return _table_cache[key]
 
 def create_pubmed_table(engine):
     metadata = MetaData()
+    # journal_id与journal_table.id使用同一套JournalTable编号，但不建外键约束：
+    # 写入记录不要求先写入journal_table，期刊不在影响因子数据中时journal_id为NULL
+    journal_table = _define_journal_table(metadata)
     pubmed_table = Table('pubmed_table', metadata,
                          Column('id', Integer, primary_key=True, autoincrement=True),
                          Column('pmid', Integer),
@@ -23,7 +73,8 @@ def create_pubmed_table(engine):
                          Column('publication_types', Text),
                          Column('authors', Text),
                          Column('doi', Text),
-                         Column('version', Text))
+                         Column('version', Text),
+                         Column('journal_id', Integer, index=True, nullable=True))
                          
     if engine.dialect.name == 'mysql':
         pubmed_table.append_column(Column('index', Integer, nullable=True))
@@ -31,47 +82,42 @@ def create_pubmed_table(engine):
         pubmed_table.append_column(Column('index', Integer, nullable=True, server_default='0'))
                          
     metadata.create_all(engine)
+    _table_cache[(engine.url.render_as_string(hide_password=False), 'pubmed_table')] = pubmed_table
+    _table_cache[(engine.url.render_as_string(hide_password=False), 'journal_table')] = journal_table
     return pubmed_table
 
 def create_journal_table(engine):
     metadata = MetaData()
-    journal_table = Table('journal_table', metadata,
-                          Column('id', Integer, primary_key=True, autoincrement=True),
-                          Column('journal', String),
-                          Column('IF2023', Float),
-                          Column('IF5year', Float))
+    journal_table = _define_journal_table(metadata)
     metadata.create_all(engine)
+    _table_cache[(engine.url.render_as_string(hide_password=False), 'journal_table')] = journal_table
     return journal_table
 
-def insert_pubmed_data(engine, data):
+def _define_journal_table(metadata):
+    return Table('journal_table', metadata,
+                 Column('id', Integer, primary_key=True, autoincrement=True),
+                 Column('journal', String(255)),
+                 Column('IF2023', Float),
+                 Column('IF5year', Float))
+
+def insert_pubmed_data(engine, data, metrics=None):
     # 确保 data 是list类型
     if not isinstance(data, list):
         raise ValueError("Data must be a list")
 
-    metadata = MetaData()
-    metadata.reflect(bind=engine)
-    pubmed_table = metadata.tables['pubmed_table']
+    pubmed_table = get_table(engine, 'pubmed_table')
 
     try:
         with engine.begin() as conn:
             # 构建插入数据
-            records_to_insert = [
-                {
-                    'pmid': record['pmid'],
-                    'title': record['title'],
-                    'abstract': record['abstract'],
-                    'journal': record['journal'],
-                    'pubdate': record['pubdate'],
-                    'publication_types': record['publication_types'],
-                    'authors': record['authors'],
-                    'doi': record['doi'],
-                    'version': record['version']
-                }
-                for record in data
-            ]
+            columns = _pubmed_columns(pubmed_table)
+            records_to_insert = [_pubmed_row(record, columns) for record in data]
             
             # 批量执行插入
+            start = time.perf_counter()
             conn.execute(insert(pubmed_table), records_to_insert)
+            if metrics is not None:
+                _record_batch(metrics, 'insert', len(records_to_insert), time.perf_counter() - start)
             
             logger.info(f"Inserted {len(data)} records successfully.")
     
@@ -80,12 +126,402 @@ def insert_pubmed_data(engine, data):
     except Exception as e:
         logger.error(f"An error occurred: {e}")
 
+def bulk_insert_pubmed_data(engine, records, chunk_size: int = 10000, method: str = 'auto', metrics=None) -> int:
+    """
+    按块批量写入pubmed_table，每块单独提交，并根据数据库类型选择最快的写入方式。
+
+    参数:
+    engine: SQLAlchemy引擎。
+    records: 记录字典的可迭代对象，可以是列表，也可以是iter_baseline等生成器。
+    chunk_size (int): 每次提交的记录数。
+    method (str): 'auto'按数据库类型选择：PostgreSQL使用COPY FROM STDIN，
+                  MySQL使用多行VALUES，SQLite在加载期间设置WAL和synchronous=OFF，结束后恢复原来的设置；
+                  'executemany'强制使用通用的executemany。
+    metrics (Metrics): 可选，记录每块的写入耗时（insert_batch_seconds）和写入行数（rows_written）。
+
+    返回:
+    int: 写入的记录数。出错时抛出异常，已提交的块不会回滚。
+    """
+    if method not in ['auto', 'executemany']:
+        raise ValueError('method must be "auto" or "executemany"')
+
+    pubmed_table = get_table(engine, 'pubmed_table')
+    dialect = engine.dialect.name if method == 'auto' else 'default'
+
+    if dialect == 'postgresql' and engine.dialect.driver in ['psycopg2', 'psycopg']:
+        write_chunk = _copy_chunk_postgresql
+    elif dialect in ['mysql', 'mariadb']:
+        write_chunk = _values_chunk_mysql
+    else:
+        write_chunk = _executemany_chunk
+
+    total = 0
+    with engine.connect() as conn:
+        if dialect == 'sqlite':
+            synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+            journal_mode = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+            conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+            conn.commit()
+        try:
+            for chunk in _iter_chunks(records, chunk_size, _pubmed_columns(pubmed_table)):
+                start = time.perf_counter()
+                write_chunk(conn, pubmed_table, chunk)
+                conn.commit()
+                if metrics is not None:
+                    _record_batch(metrics, 'insert', len(chunk), time.perf_counter() - start)
+                total += len(chunk)
+                logger.debug(f"Inserted chunk of {len(chunk)} records.")
+        finally:
+            if dialect == 'sqlite':
+                conn.rollback()
+                conn.exec_driver_sql(f'PRAGMA synchronous={synchronous}')
+                # 退出WAL时检查点写回主文件并删除-wal/-shm文件；有其他连接正在使用数据库时无法切换
+                try:
+                    conn.exec_driver_sql(f'PRAGMA journal_mode={journal_mode}')
+                except exc.OperationalError as e:
+                    logger.warning(f"Could not restore journal_mode={journal_mode}: {e}")
+                conn.commit()
+
+    logger.info(f"Inserted {total} records successfully.")
+    return total
+
+def insert_pubmed_frame(engine, df, chunk_size: int = 10000, method: str = 'auto', metrics=None) -> int:
+    """
+    将DataFrame（例如load_baseline(output_type='pd')的结果）按列批量写入pubmed_table。
+
+    每列一次性转换为Python列表，缺失值转换为None；journal_id按journal的分类编码计算，
+    每个不同的期刊只查找一次。写入方式和参数同bulk_insert_pubmed_data。
+
+    返回:
+    int: 写入的记录数。
+    """
+    columns = {}
+    for column in PUBMED_COLUMNS:
+        series = df[column]
+        columns[column] = series.astype(object).where(series.notna(), None).tolist()
+    journal_table = _default_journal_table()
+    if 'journal_id' in _pubmed_columns(get_table(engine, 'pubmed_table')) and journal_table is not None:
+        journals = df['journal'].astype('category')
+        ids = [journal_table.journal_id(name) for name in journals.cat.categories] + [None]
+        columns['journal_id'] = [ids[code] for code in journals.cat.codes.tolist()]
+
+    names = list(columns)
+    records = (dict(zip(names, values)) for values in zip(*columns.values()))
+    return bulk_insert_pubmed_data(engine, records, chunk_size=chunk_size, method=method, metrics=metrics)
+
+def _record_batch(metrics, operation: str, rows: int, seconds: float):
+    metrics.observe('insert_batch_seconds', seconds, table='pubmed_table', operation=operation)
+    metrics.incr('rows_written', rows, table='pubmed_table', operation=operation)
 
+def _pubmed_columns(pubmed_table) -> tuple:
+    # 新建的pubmed_table带有journal_id列，旧表没有
+    if 'journal_id' in pubmed_table.c:
+        return PUBMED_COLUMNS + ('journal_id',)
+    return PUBMED_COLUMNS
 
+def _default_journal_table():
+    """
+    返回默认的JournalTable；影响因子数据无法加载时返回None，只记录一次警告，
+    写入记录本身不依赖影响因子数据，此时journal_id留空，之后可以用update_pubmed_journal_ids回填。
+    """
+    global _journal_table_error
+    if _journal_table_error is not None:
+        return None
+    try:
+        return get_journal_table()
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        _journal_table_error = e
+        logger.warning(f"Journal table unavailable, journal_id is left empty: {e}")
+        return None
+
+def _pubmed_row(record, columns=PUBMED_COLUMNS) -> dict:
+    row = {column: record[column] for column in PUBMED_COLUMNS}
+    if 'journal_id' in columns:
+        # insert_pubmed_frame预先按列计算好journal_id
+        if 'journal_id' in record:
+            row['journal_id'] = record['journal_id']
+        else:
+            journal_table = _default_journal_table()
+            row['journal_id'] = journal_table.journal_id(record['journal']) if journal_table is not None else None
+    return row
+
+def _iter_chunks(records, chunk_size: int, columns=PUBMED_COLUMNS):
+    chunk = []
+    for record in records:
+        chunk.append(_pubmed_row(record, columns))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _executemany_chunk(conn, table, chunk):
+    conn.execute(insert(table), chunk)
+
+def _values_chunk_mysql(conn, table, chunk):
+    # 单条INSERT携带多行VALUES，减少往返次数
+    conn.execute(insert(table).values(chunk))
+
+def _copy_csv_field(value) -> str:
+    # NULL写为不加引号的\N，字符串全部加引号：加引号的值不会被COPY解释为NULL，空字符串仍是空字符串
+    if value is None:
+        return '\\N'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_csv(chunk, names) -> str:
+    return ''.join(','.join(_copy_csv_field(row[column]) for column in names) + '\n' for row in chunk)
+
+def _copy_chunk_postgresql(conn, table, chunk):
+    names = list(chunk[0])
+    buffer = io.StringIO(_copy_csv(chunk, names))
+
+    columns = ', '.join(f'"{column}"' for column in names)
+    sql = f"COPY \"{table.name}\" ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    dbapi_conn = conn.connection.driver_connection
+    with dbapi_conn.cursor() as cursor:
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+def create_pmid_unique_index(engine):
+    """
+    在pubmed_table.pmid上创建唯一索引，增量更新和upsert依赖该索引。
+
+    已有重复pmid的旧表需要先调用deduplicate_pubmed_table。
+    """
+    pubmed_table = get_table(engine, 'pubmed_table')
+    index = Index('ux_pubmed_table_pmid', pubmed_table.c.pmid, unique=True)
+    index.create(engine, checkfirst=True)
+    return index
+
+def deduplicate_pubmed_table(engine) -> int:
+    """
+    删除pubmed_table中重复的pmid，每个pmid只保留version最新的一行（version相同时保留id最大的一行）。
+
+    返回:
+    int: 删除的行数。
+    """
+    if engine.dialect.name in ['mysql', 'mariadb']:
+        stmt = text(
+            "DELETE t1 FROM pubmed_table t1 JOIN pubmed_table t2 ON t1.pmid = t2.pmid "
+            "AND (t2.version > t1.version OR (t2.version = t1.version AND t2.id > t1.id))"
+        )
+    else:
+        stmt = text(
+            "DELETE FROM pubmed_table WHERE EXISTS (SELECT 1 FROM pubmed_table t2 "
+            "WHERE t2.pmid = pubmed_table.pmid AND (t2.version > pubmed_table.version "
+            "OR (t2.version = pubmed_table.version AND t2.id > pubmed_table.id)))"
+        )
+    with engine.begin() as conn:
+        deleted = conn.execute(stmt).rowcount
+    logger.info(f"Removed {deleted} duplicate records.")
+    return deleted
+
+def create_update_file_table(engine):
+    metadata = MetaData()
+    update_file_table = Table('pubmed_update_files', metadata,
+                              Column('filename', String(255), primary_key=True),
+                              Column('version', String(64)),
+                              Column('records', Integer),
+                              Column('deleted', Integer),
+                              Column('applied_at', DateTime))
+    metadata.create_all(engine)
+    _table_cache[(engine.url.render_as_string(hide_password=False), 'pubmed_update_files')] = update_file_table
+    return update_file_table
+
+def upsert_pubmed_data(engine, records, chunk_size: int = 10000, conn=None, metrics=None,
+                       replace: bool = False) -> int:
+    """
+    按pmid写入或更新pubmed_table，只有新记录的version比已有记录新时才覆盖。
+
+    version是基线/更新文件名（如pubmed24n1220），同一格式下按字符串比较即为先后顺序。
+    需要pmid上的唯一索引（见create_pmid_unique_index）。
+    同一块中重复的pmid只保留version最新的一条（version相同时保留先出现的），
+    否则PostgreSQL的多行INSERT ... ON CONFLICT DO UPDATE会因为同一行被更新两次而失败。
+
+    参数:
+    engine: SQLAlchemy引擎。
+    records: 记录字典的可迭代对象。
+    chunk_size (int): 每块的记录数。
+    conn: 可选的已开启事务的连接；提供时不在内部提交。
+    metrics (Metrics): 可选，记录每块的耗时和行数，operation标签为'upsert'。
+    replace (bool): 为True时version相同的已有记录也被覆盖，用于内容改变后重新应用同一个文件。
+
+    返回:
+    int: 提交写入的记录数（包括被version条件跳过的记录）。
+    """
+    pubmed_table = get_table(engine, 'pubmed_table')
+    stmt = _upsert_statement(engine, pubmed_table, replace)
+    columns = _pubmed_columns(pubmed_table)
+
+    total = 0
+    if conn is not None:
+        for chunk in _iter_chunks(records, chunk_size, columns):
+            start = time.perf_counter()
+            conn.execute(stmt, _latest_rows(chunk, replace))
+            if metrics is not None:
+                _record_batch(metrics, 'upsert', len(chunk), time.perf_counter() - start)
+            total += len(chunk)
+        return total
+
+    for chunk in _iter_chunks(records, chunk_size, columns):
+        start = time.perf_counter()
+        with engine.begin() as chunk_conn:
+            chunk_conn.execute(stmt, _latest_rows(chunk, replace))
+        if metrics is not None:
+            _record_batch(metrics, 'upsert', len(chunk), time.perf_counter() - start)
+        total += len(chunk)
+    logger.info(f"Upserted {total} records successfully.")
+    return total
+
+def _latest_rows(chunk: list, replace: bool = False) -> list:
+    # 每个pmid只保留version最新的一行，与逐行执行带version条件的upsert结果相同：
+    # version相同时通常保留先出现的一行，replace为True时保留后出现的一行
+    latest = {}
+    for row in chunk:
+        current = latest.get(row['pmid'])
+        if current is None or row['version'] > current['version'] or \
+                (replace and row['version'] == current['version']):
+            latest[row['pmid']] = row
+    if len(latest) == len(chunk):
+        return chunk
+    return list(latest.values())
+
+def _upsert_statement(engine, pubmed_table, replace: bool = False):
+    dialect = engine.dialect.name
+    update_columns = [column for column in _pubmed_columns(pubmed_table) if column not in ['pmid', 'version']]
+
+    if dialect in ['sqlite', 'postgresql']:
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(pubmed_table)
+        newer = stmt.excluded.version >= pubmed_table.c.version if replace else stmt.excluded.version > pubmed_table.c.version
+        return stmt.on_conflict_do_update(
+            index_elements=[pubmed_table.c.pmid],
+            set_={column: stmt.excluded[column] for column in update_columns + ['version']},
+            where=newer
+        )
+    elif dialect in ['mysql', 'mariadb']:
+        stmt = mysql.insert(pubmed_table)
+        newer = stmt.inserted.version >= pubmed_table.c.version if replace else stmt.inserted.version > pubmed_table.c.version
+        # MySQL按顺序执行赋值，version必须最后更新，前面的条件才能看到旧的version
+        assignments = [(column, func.if_(newer, stmt.inserted[column], pubmed_table.c[column])) for column in update_columns]
+        assignments.append(('version', func.if_(newer, stmt.inserted.version, pubmed_table.c.version)))
+        return stmt.on_duplicate_key_update(assignments)
+    else:
+        raise ValueError(f"upsert is not supported for dialect {dialect}")
+
+def apply_update_file(engine, xmlfile: str, *args, **kwargs) -> dict:
+    """
+    将一个基线或更新文件增量写入数据库：按pmid upsert文章，执行DeleteCitation删除，
+    并在pubmed_update_files中记录该文件。整个文件在一个事务中完成，已经应用过的文件直接跳过。
+
+    参数:
+    engine: SQLAlchemy引擎。
+    xmlfile (str): XML文件路径。
+    **kwargs: 支持chunk_size，其余参数（keywords、impact_factor、metrics等）传给iter_baseline。
+              metrics还会记录upsert的耗时和行数，以及删除的行数（rows_deleted）。
+
+    返回:
+    dict: {'filename', 'version', 'records', 'deleted', 'skipped'}。
+    """
+    chunk_size = kwargs.pop('chunk_size', 10000)
+    filename = basename(xmlfile)
+    version = filename.split('.')[0]
+
+    create_pmid_unique_index(engine)
+    update_file_table = create_update_file_table(engine)
+
+    with engine.connect() as conn:
+        applied = conn.execute(
+            select(update_file_table.c.filename).where(update_file_table.c.filename == filename)
+        ).first()
+    if applied is not None:
+        logger.info(f"{filename} already applied, skip.")
+        return {'filename': filename, 'version': version, 'records': 0, 'deleted': 0, 'skipped': True}
+
+    with engine.begin() as conn:
+        records, deleted = apply_pubmed_file(conn, engine, xmlfile, chunk_size=chunk_size, **kwargs)
+        record_update_file(conn, update_file_table, filename, version, records, deleted)
+
+    logger.info(f"Applied {filename}: {records} records, {deleted} deleted.")
+    return {'filename': filename, 'version': version, 'records': records, 'deleted': deleted, 'skipped': False}
+
+def apply_pubmed_file(conn, engine, xmlfile: str, *args, **kwargs) -> tuple:
+    """
+    在调用方的事务中把一个基线或更新文件写入pubmed_table：按pmid upsert文章并执行DeleteCitation删除，
+    记录的版本取自文件名。apply_update_file和run_ingestion_job共用。
+
+    参数:
+    conn: 调用方事务中的连接。
+    engine: SQLAlchemy引擎。
+    xmlfile (str): XML文件路径。
+    **kwargs: 支持chunk_size（默认10000）、metrics和replace（默认False），其余参数传给iter_baseline。
+              replace为True时文件中的文章也覆盖version相同的已有记录，用于文件内容改变后重新导入；
+              新文件中不再出现的PMID保留原来的记录。
+
+    返回:
+    tuple: (写入数, 删除数)。
+    """
+    chunk_size = kwargs.pop('chunk_size', 10000)
+    replace = kwargs.pop('replace', False)
+    metrics = kwargs.get('metrics', None)
+    version = basename(xmlfile).split('.')[0]
+    pubmed_table = get_table(engine, 'pubmed_table')
+    deleted_pmids = []
+
+    def articles():
+        for entry in iter_baseline(xmlfile, **dict(kwargs, include_deleted=True)):
+            if entry.get('delete', False):
+                deleted_pmids.append(entry['pmid'])
+            else:
+                yield entry
+
+    records = upsert_pubmed_data(engine, articles(), chunk_size=chunk_size, conn=conn, metrics=metrics,
+                                 replace=replace)
+
+    deleted = 0
+    for start in range(0, len(deleted_pmids), chunk_size):
+        # 只删除不比当前文件新的记录，避免乱序应用时误删
+        deleted += conn.execute(
+            delete(pubmed_table).where(
+                pubmed_table.c.pmid.in_(deleted_pmids[start:start + chunk_size]),
+                pubmed_table.c.version <= version
+            )
+        ).rowcount
+
+    if metrics is not None:
+        metrics.incr('rows_deleted', deleted, table='pubmed_table', operation='delete')
+    return records, deleted
+
+def record_update_file(conn, update_file_table, filename: str, version: str, records: int, deleted: int):
+    """
+    在调用方的事务中把文件记入pubmed_update_files，文件已经记录过时更新记录数和应用时间。
+    """
+    values = {'version': version, 'records': records, 'deleted': deleted, 'applied_at': datetime.now()}
+    exists = conn.execute(
+        select(update_file_table.c.filename).where(update_file_table.c.filename == filename)
+    ).first()
+    if exists is None:
+        conn.execute(insert(update_file_table), [dict(values, filename=filename)])
+    else:
+        conn.execute(update(update_file_table).where(update_file_table.c.filename == filename).values(**values))
+
+def apply_update_files(engine, files: list, *args, **kwargs) -> list:
+    """
+    按文件名顺序依次应用多个基线/更新文件，返回每个文件的apply_update_file结果。
+    """
+    return [apply_update_file(engine, xmlfile, **kwargs) for xmlfile in sorted(files, key=basename)]
 
 def search_pubmed_table_simple(engine, table, search_term, search_field='journal'):
     with engine.connect() as conn:
-        stmt = select([table]).where(func.lower(table.c[search_field]).like(f'%{search_term.lower()}%'))
+        stmt = select(table).where(func.lower(table.c[search_field]).like(f'%{search_term.lower()}%'))
         result = conn.execute(stmt)
         return result.fetchall()
 
@@ -96,11 +532,11 @@ def search_pubmed_table(engine, table, search_terms, search_fields, operator='AN
             conditions.append(func.lower(table.c[field]).like(f'%{term.lower()}%'))
 
         if operator == 'AND':
-            stmt = select([table]).where(and_(*conditions))
+            stmt = select(table).where(and_(*conditions))
         elif operator == 'OR':
-            stmt = select([table]).where(or_(*conditions))
+            stmt = select(table).where(or_(*conditions))
         elif operator == 'NOT':
-            stmt = select([table]).where(not_(or_(*conditions)))
+            stmt = select(table).where(not_(or_(*conditions)))
         else:
             raise ValueError("Operator must be 'AND', 'OR', or 'NOT'")
 
@@ -108,6 +544,13 @@ def search_pubmed_table(engine, table, search_terms, search_fields, operator='AN
         return result.fetchall()
 
 def insert_journal_data(engine, df):
+    """
+    将DataFrame中的期刊影响因子（journal、IF2023、IF5year列）写入journal_table。
+
+    期刊的ID与JournalTable（insert_journal_metrics、pubmed_table.journal_id）使用同一套编号，
+    因此join_pubmed_and_journal按journal_id连接时不会对应到错误的期刊；
+    不在JournalTable中的期刊分配在已有ID之后的新ID，已存在的ID会被跳过。
+    """
     # Preprocess the DataFrame to handle '<0.1' values
     try:
         df['IF2023'] = df['IF2023'].replace('<0.1', '0.1').astype(float)
@@ -120,34 +563,81 @@ def insert_journal_data(engine, df):
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"DataFrame contents:\n{df.head()}")
 
-    metadata = MetaData()
-    metadata.reflect(bind=engine)
-    journal_table = Table('journal_table', metadata, autoload_with=engine)
+    journal_table = get_table(engine, 'journal_table')
+    journals = _default_journal_table()
 
     with engine.begin() as conn:
         try:
+            existing = set(conn.execute(select(journal_table.c.id)).scalars())
+            next_id = max([len(journals) if journals is not None else 0, *existing]) + 1
+            rows = []
+            for row in df[['journal', 'IF2023', 'IF5year']].to_dict('records'):
+                journal_id = journals.journal_id(row['journal']) if journals is not None else None
+                if journal_id is None:
+                    journal_id = next_id
+                    next_id += 1
+                elif journal_id in existing:
+                    continue
+                existing.add(journal_id)
+                rows.append(dict(row, id=journal_id))
             # Batch insert for better performance
-            conn.execute(
-                insert(journal_table),
-                [
-                    {
-                        "journal": row['journal'],
-                        "IF2023": row['IF2023'],
-                        "IF5year": row['IF5year']
-                    }
-                    for index, row in df.iterrows()
-                ]
-            )
+            if rows:
+                conn.execute(insert(journal_table), rows)
         except IntegrityError as e:
             logger.error(f"Database integrity error: {e}")
         except Exception as e:
             logger.error(f"Error executing SQL: {e}")
 
+def insert_journal_metrics(engine, journal_table=None) -> int:
+    """
+    将JournalTable中的期刊和影响因子写入journal_table，ID与JournalTable一致，
+    因此pubmed_table.journal_id可以直接与journal_table.id关联。已存在的ID会被跳过。
+
+    返回:
+    int: 新写入的期刊数。
+    """
+    journal_table = journal_table or get_journal_table()
+    table = get_table(engine, 'journal_table')
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(table.c.id)).scalars())
+        rows = [row for row in journal_table.rows() if row['id'] not in existing]
+        if rows:
+            conn.execute(insert(table), rows)
+    logger.info(f"Inserted {len(rows)} journals successfully.")
+    return len(rows)
+
+def update_pubmed_journal_ids(engine, journal_table=None) -> int:
+    """
+    为pubmed_table中journal_id为空的记录回填期刊ID。
+
+    返回:
+    int: 更新的行数。
+    """
+    journal_table = journal_table or get_journal_table()
+    pubmed_table = get_table(engine, 'pubmed_table')
+    updated = 0
+    with engine.begin() as conn:
+        journals = conn.execute(
+            select(pubmed_table.c.journal).where(pubmed_table.c.journal_id.is_(None)).distinct()
+        ).scalars().all()
+        for journal in journals:
+            journal_id = journal_table.journal_id(journal)
+            if journal_id is not None:
+                updated += conn.execute(
+                    update(pubmed_table)
+                    .where(pubmed_table.c.journal == journal, pubmed_table.c.journal_id.is_(None))
+                    .values(journal_id=journal_id)
+                ).rowcount
+    logger.info(f"Updated journal_id of {updated} records.")
+    return updated
+
 def join_pubmed_and_journal(engine, pubmed_table, journal_table):
     with engine.connect() as conn:
-        stmt = select([pubmed_table, journal_table]).where(
-            func.lower(pubmed_table.c.journal) == func.lower(journal_table.c.journal)
-        )
+        if 'journal_id' in pubmed_table.c:
+            # 整数外键上的等值连接可以使用索引
+            condition = pubmed_table.c.journal_id == journal_table.c.id
+        else:
+            condition = func.lower(pubmed_table.c.journal) == func.lower(journal_table.c.journal)
+        stmt = select(pubmed_table, journal_table).where(condition)
         result = conn.execute(stmt)
         return result.fetchall()
-
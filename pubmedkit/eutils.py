@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from lxml import etree
+from .baseline import parse_article, filter_articles, KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['EutilsClient', 'TokenBucket', 'fetch_pubmed_records', 'EUTILS_BASE_URL']
+
+EUTILS_BASE_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+
+# 这些HTTP状态码表示可以稍后重试
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    异步令牌桶限速器，rate为每秒允许的请求数。
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EutilsClient:
+    """
+    基于asyncio的NCBI E-utilities客户端。
+
+    esearch结果保存在history server（WebEnv/query_key）上，再用并发的分批efetch取回记录，
+    所有请求经过令牌桶限速（无API key时每秒3次，有API key时每秒10次），
+    网络错误和429/5xx响应按指数退避重试。解析后的记录与load_baseline的格式相同。
+    base_url可以指向本地的测试服务器。
+
+    参数:
+    email (str): 联系邮箱，NCBI要求提供。
+    api_key (str): NCBI API key，可以为None。
+    base_url (str): E-utilities地址。
+    rate (float): 每秒请求数，默认根据是否有api_key选择3或10。
+    concurrency (int): 同时进行的efetch请求数。
+    max_retries (int): 每个请求的最大重试次数。
+    backoff (float): 第一次重试前等待的秒数，之后每次翻倍。
+    timeout (float): 单个请求的超时时间（秒）。
+    """
+
+    def __init__(self, email: str = "your_email@example.com", api_key: str = None, *args, **kwargs):
+        self.email = email
+        self.api_key = api_key
+        self.tool = kwargs.get('tool', 'pubmedkit')
+        self.base_url = kwargs.get('base_url', EUTILS_BASE_URL)
+        self.rate = kwargs.get('rate', 10 if api_key else 3)
+        self.concurrency = kwargs.get('concurrency', 3)
+        self.max_retries = kwargs.get('max_retries', 5)
+        self.backoff = kwargs.get('backoff', 0.5)
+        self.timeout = kwargs.get('timeout', 60)
+        self._bucket = TokenBucket(self.rate)
+
+    async def request(self, utility: str, params: dict) -> bytes:
+        """
+        以POST方式调用一个E-utility（如'esearch.fcgi'），失败时重试，返回响应内容。
+        """
+        params = dict(params, tool=self.tool, email=self.email)
+        if self.api_key:
+            params['api_key'] = self.api_key
+        data = urllib.parse.urlencode(params).encode()
+        url = urllib.parse.urljoin(self.base_url, utility)
+
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                return await asyncio.to_thread(self._post, url, data)
+            except urllib.error.HTTPError as e:
+                if e.code not in _RETRY_STATUS or attempt == self.max_retries:
+                    raise
+                error = e
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                if attempt == self.max_retries:
+                    raise
+                error = e
+            delay = self.backoff * 2 ** attempt
+            logger.warning(f"{utility} failed ({error}), retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _post(self, url: str, data: bytes) -> bytes:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=self.timeout) as response:
+            return response.read()
+
+    async def esearch(self, query: str, retmax: int = 0, retstart: int = 0, usehistory: bool = True) -> dict:
+        """
+        执行esearch，返回{'count', 'webenv', 'query_key', 'ids'}。
+        """
+        params = {'db': 'pubmed', 'term': query, 'retmode': 'json', 'retmax': retmax, 'retstart': retstart}
+        if usehistory:
+            params['usehistory'] = 'y'
+        result = json.loads(await self.request('esearch.fcgi', params))['esearchresult']
+        if 'ERROR' in result:
+            raise RuntimeError(f"esearch error: {result['ERROR']}")
+        return {
+            'count': int(result['count']),
+            'webenv': result.get('webenv'),
+            'query_key': result.get('querykey'),
+            'ids': result.get('idlist', []),
+        }
+
+    async def search_pmids(self, query: str, retmax: int = None, batch_size: int = 5000) -> list:
+        """
+        分页取回检索式命中的全部PMID（retmax为None时不设上限）。
+
+        PubMed的esearch不返回retstart超过9999之后的结果，因此esearch只用于把结果保存在history server上，
+        PMID列表用efetch（rettype=uilist）按WebEnv/query_key分页读取，不受这一限制。
+        """
+        search = await self.esearch(query)
+        total = search['count'] if retmax is None else min(retmax, search['count'])
+        pmids = []
+        for retstart in range(0, total, batch_size):
+            params = {'db': 'pubmed', 'query_key': search['query_key'], 'WebEnv': search['webenv'],
+                      'rettype': 'uilist', 'retmode': 'text', 'retstart': retstart,
+                      'retmax': min(batch_size, total - retstart)}
+            content = await self.request('efetch.fcgi', params)
+            pmids.extend(line.strip() for line in content.decode().splitlines() if line.strip())
+        if len(pmids) != total:
+            logger.warning(f"esearch reported {total} PMIDs but {len(pmids)} were fetched")
+        return pmids
+
+    async def efetch_articles(self, params: dict) -> list:
+        """
+        执行一次efetch（XML格式），返回解析后的文章字典列表。
+        """
+        content = await self.request('efetch.fcgi', dict(params, db='pubmed', retmode='xml'))
+        root = etree.fromstring(content)
+        return [parse_article(element) for element in root.iter('PubmedArticle')]
+
+    async def iter_article_batches(self, query: str = None, pmids: list = None, *args, **kwargs):
+        """
+        异步逐批产出检索式（或PMID列表）对应的未经过滤的文章字典列表。
+
+        检索式先执行esearch并保存在history server上，再按WebEnv/query_key分批efetch；
+        PMID列表按批以id参数efetch。最多concurrency个efetch同时进行，按完成顺序产出。
+
+        **kwargs: 支持batch_size（每次efetch的记录数，默认500）和retmax（最多取回的记录数）。
+        """
+        batch_size = kwargs.get('batch_size', 500)
+        retmax = kwargs.get('retmax', None)
+
+        if (query is None) == (pmids is None):
+            raise ValueError('exactly one of query and pmids must be given')
+
+        if query is not None:
+            search = await self.esearch(query)
+            total = search['count'] if retmax is None else min(retmax, search['count'])
+            batches = [
+                {'query_key': search['query_key'], 'WebEnv': search['webenv'],
+                 'retstart': retstart, 'retmax': min(batch_size, total - retstart)}
+                for retstart in range(0, total, batch_size)
+            ]
+        else:
+            pmids = [str(pmid) for pmid in pmids][:retmax]
+            batches = [{'id': ','.join(pmids[start:start + batch_size])} for start in range(0, len(pmids), batch_size)]
+
+        # 只保留concurrency个进行中的请求，消费得慢时不会无限制地提前抓取
+        batches = iter(batches)
+        pending = set()
+        for params in batches:
+            pending.add(asyncio.ensure_future(self.efetch_articles(params)))
+            if len(pending) >= self.concurrency:
+                break
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for params in batches:
+                        pending.add(asyncio.ensure_future(self.efetch_articles(params)))
+                        break
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_records(self, query: str = None, pmids: list = None, *args, **kwargs):
+        """
+        异步产出与load_baseline格式相同的记录，支持keywords、kw_filter、impact_factor过滤。
+
+        **kwargs: version（写入记录的version字段，默认'eutils'）、batch_size、retmax，
+                  其余参数传给filter_articles。
+        """
+        version = kwargs.pop('version', 'eutils')
+        batch_options = {key: kwargs.pop(key) for key in ['batch_size', 'retmax'] if key in kwargs}
+        # 关键词只编译一次，所有批次共用
+        if 'keywords' in kwargs and not isinstance(kwargs['keywords'], KeywordMatcher):
+            kwargs['keywords'] = KeywordMatcher(kwargs['keywords'])
+
+        async for batch in self.iter_article_batches(query, pmids, **batch_options):
+            for record in filter_articles(batch, version, **kwargs):
+                yield record
+
+
+def fetch_pubmed_records(query: str = None, pmids: list = None, *args, **kwargs) -> list:
+    """
+    同步接口：取回检索式或PMID列表对应的记录列表。
+
+    **kwargs: email、api_key、base_url、rate、concurrency等传给EutilsClient，其余传给iter_records。
+    """
+    client_options = ['email', 'api_key', 'tool', 'base_url', 'rate', 'concurrency', 'max_retries', 'backoff', 'timeout']
+    client_kwargs = {key: kwargs.pop(key) for key in client_options if key in kwargs}
+
+    async def collect():
+        client = EutilsClient(**client_kwargs)
+        return [record async for record in client.iter_records(query, pmids, **kwargs)]
+
+    return asyncio.run(collect())
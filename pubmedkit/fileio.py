@@ -0,0 +1,163 @@
+import gzip
+import io
+import mmap
+import os
+import queue
+import threading
+
+__all__ = ['open_medline', 'open_medline_text', 'ReadAheadReader', 'FAST_GZIP']
+
+# 可选的更快的gzip实现：python-isal或zlib-ng，都没有安装时使用标准库gzip
+try:
+    from isal import igzip as _gzip_module
+    FAST_GZIP = 'isal'
+except ImportError:
+    try:
+        from zlib_ng import gzip_ng as _gzip_module
+        FAST_GZIP = 'zlib-ng'
+    except ImportError:
+        _gzip_module = gzip
+        FAST_GZIP = None
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ReadAheadReader(io.RawIOBase):
+    """
+    在后台线程中从底层文件读取（并解压）数据块，放入有界队列供解析器读取。
+
+    zlib/isal解压时会释放GIL，因此解压和XML解析可以在两个CPU核上同时进行。
+    队列中最多缓存blocks个大小为block_size的数据块，内存占用有上限。
+    底层文件在关闭时一并关闭，读取线程中的异常会在read中重新抛出。
+    """
+
+    def __init__(self, raw, block_size: int = DEFAULT_BLOCK_SIZE, blocks: int = 4):
+        self._raw = raw
+        self._block_size = block_size
+        self._queue = queue.Queue(maxsize=blocks)
+        self._stop = threading.Event()
+        self._buffer = b''
+        self._offset = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(self._block_size)
+                if not block:
+                    break
+                self._put(block)
+        except BaseException as e:
+            self._put(e)
+            return
+        self._put(None)
+
+    def _put(self, item):
+        # 消费者提前关闭时不再阻塞在满的队列上
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _next_block(self) -> bool:
+        if self._eof:
+            return False
+        item = self._queue.get()
+        if item is None:
+            self._eof = True
+            return False
+        if isinstance(item, BaseException):
+            self._eof = True
+            raise item
+        self._buffer = item
+        self._offset = 0
+        return True
+
+    def readable(self):
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self.readall()
+        if self._offset >= len(self._buffer) and not self._next_block():
+            return b''
+        end = self._offset + size
+        if self._offset == 0 and end >= len(self._buffer):
+            # 整块返回，避免复制
+            data = self._buffer
+        else:
+            data = self._buffer[self._offset:end]
+        self._offset += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        chunks = [self._buffer[self._offset:]]
+        self._offset = len(self._buffer)
+        while self._next_block():
+            chunks.append(self._buffer)
+            self._offset = len(self._buffer)
+        return b''.join(chunks)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def open_medline(filename: str, *args, **kwargs):
+    """
+    以二进制方式打开MEDLINE文件（.xml/.xml.gz/.txt/.txt.gz），返回可读的文件对象。
+
+    .gz文件优先使用python-isal或zlib-ng解压（见FAST_GZIP），没有安装时使用标准库gzip。
+    未压缩的文件可以用mmap方式读取，由操作系统负责预读和页缓存。
+
+    参数:
+    filename (str): 文件路径。
+    **kwargs: 支持read_ahead（是否在后台线程中预读解压，默认在多核机器上对.gz文件启用）、
+              block_size（预读块大小，默认4MB）、blocks（最多缓存的块数，默认4）
+              和mmap（未压缩文件是否使用mmap，默认False）。
+    """
+    read_ahead = kwargs.get('read_ahead', None)
+    block_size = kwargs.get('block_size', DEFAULT_BLOCK_SIZE)
+    blocks = kwargs.get('blocks', 4)
+    use_mmap = kwargs.get('mmap', False)
+
+    if filename.endswith('.gz'):
+        raw = _gzip_module.open(filename, 'rb')
+        if read_ahead is None:
+            # 单核机器上后台线程只会与解析争抢CPU
+            read_ahead = (os.cpu_count() or 1) > 1
+    elif use_mmap and os.path.getsize(filename) > 0:
+        with open(filename, 'rb') as f:
+            raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            raw.madvise(mmap.MADV_SEQUENTIAL)
+        return raw
+    else:
+        raw = open(filename, 'rb', buffering=block_size)
+        read_ahead = bool(read_ahead)
+
+    if read_ahead:
+        return ReadAheadReader(raw, block_size, blocks)
+    return raw
+
+
+def open_medline_text(filename: str, *args, **kwargs):
+    """
+    以文本方式（UTF-8）打开MEDLINE文本文件，参数同open_medline（不支持mmap）。
+    """
+    handle = open_medline(filename, **dict(kwargs, mmap=False))
+    if isinstance(handle, ReadAheadReader):
+        handle = io.BufferedReader(handle, kwargs.get('block_size', DEFAULT_BLOCK_SIZE))
+    return io.TextIOWrapper(handle, encoding='utf-8')
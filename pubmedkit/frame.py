@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from .baseline import KeywordMatcher
+from .journal import get_journal_table
+from .record import PubmedRecord, RECORD_FIELDS
+
+__all__ = ['records_to_frame', 'keyword_mask', 'journal_impact_factors', 'filter_frame', 'PUBMED_FRAME_DTYPES']
+
+# 文本列由pandas推断：pandas 2中为object，pandas 3中为默认的str类型
+PUBMED_FRAME_DTYPES = {'pmid': 'int64', 'journal': 'category', 'version': 'category'}
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """
+    将记录（字典或PubmedRecord）按列构建为DataFrame，行索引为pmid。
+
+    pmid为int64，journal和version为category，其余文本列由pandas推断，
+    不再像DataFrame.from_dict(...).T那样把所有列变成object。
+
+    参数:
+    records: 记录的可迭代对象，或pmid到记录的字典。
+    """
+    if isinstance(records, dict):
+        records = records.values()
+    columns = {field: [] for field in RECORD_FIELDS}
+    for record in records:
+        for field in RECORD_FIELDS:
+            columns[field].append(getattr(record, field) if isinstance(record, PubmedRecord) else record.get(field))
+
+    df = pd.DataFrame(columns, columns=list(RECORD_FIELDS)).astype(PUBMED_FRAME_DTYPES)
+    df.index = df['pmid'].to_numpy()
+    return df
+
+
+def keyword_mask(df: pd.DataFrame, keywords, kw_filter: str = 'abstract') -> pd.Series:
+    """
+    对整列做向量化的关键词匹配，返回布尔Series，语义与article_filter中的关键词过滤相同。
+
+    参数:
+    df (DataFrame): 包含title和abstract列的DataFrame。
+    keywords: 关键词列表或KeywordMatcher。
+    kw_filter (str): 'abstract'、'title'或'both'。
+    """
+    if kw_filter not in ['abstract', 'title', 'both']:
+        raise ValueError('kw_filter must be "abstract", "title", or "both"')
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+    pattern = matcher.pattern
+    if pattern is None:
+        return pd.Series(False, index=df.index)
+
+    def match(column):
+        # 空值和空字符串不匹配
+        return df[column].str.lower().str.contains(pattern, regex=True, na=False).astype(bool)
+
+    if kw_filter == 'both':
+        return match('abstract') | match('title')
+    return match(kw_filter)
+
+
+def journal_impact_factors(df: pd.DataFrame, journal_table=None) -> pd.Series:
+    """
+    返回每行期刊的影响因子（float64，找不到的期刊为NaN）。
+
+    journal列转换为category后，每个不同的期刊只在JournalTable中查找一次，
+    再按分类编码取值，查找次数与期刊数而不是行数成正比。
+    """
+    journal_table = journal_table or get_journal_table()
+    journals = df['journal'].astype('category')
+    factors = [journal_table.impact_factor(name) for name in journals.cat.categories]
+    values = np.array([np.nan if factor is None else factor for factor in factors] + [np.nan], dtype=np.float64)
+    # 编码-1（缺失值）取到最后的NaN
+    return pd.Series(values[journals.cat.codes.to_numpy()], index=df.index, name='impact_factor')
+
+
+def filter_frame(df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
+    """
+    按关键词和影响因子过滤DataFrame，结果与iter_baseline使用相同参数过滤一致。
+
+    参数:
+    df (DataFrame): load_baseline(output_type='pd')或records_to_frame得到的DataFrame。
+    **kwargs: 支持keywords、kw_filter、impact_factor和journal_table，含义同iter_baseline。
+
+    返回:
+    DataFrame: 保留的行。
+    """
+    keywords = kwargs.get('keywords', [])
+    kw_filter = kwargs.get('kw_filter', 'abstract')
+    impact_factor = kwargs.get('impact_factor', 0)
+
+    mask = pd.Series(True, index=df.index)
+    if impact_factor > 0:
+        # 找不到影响因子的期刊与NaN比较为False，直接丢弃
+        mask &= journal_impact_factors(df, kwargs.get('journal_table', None)) >= impact_factor
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+    if matcher.keywords:
+        mask &= keyword_mask(df, matcher, kw_filter)
+    return df[mask]
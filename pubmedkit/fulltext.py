@@ -0,0 +1,293 @@
+import logging
+import re
+from sqlalchemy import text
+from .db_utils import PUBMED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['create_fulltext_index', 'parse_fulltext_query', 'fulltext_search', 'FULLTEXT_FIELDS']
+
+# 支持字段限定检索的字段，PostgreSQL中分别对应tsvector的权重A、B、C
+FULLTEXT_FIELDS = ('title', 'abstract', 'journal')
+_PG_WEIGHTS = {'title': 'A', 'abstract': 'B', 'journal': 'C'}
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|(?:(\w+):)?(?:"([^"]*)"(\*)?|([^\s()"]+)))')
+
+
+def create_fulltext_index(engine):
+    """
+    为pubmed_table创建全文索引，并保持与pubmed_table同步。
+
+    - SQLite: 外部内容的FTS5虚拟表pubmed_fts，通过触发器同步插入、更新和删除；
+    - PostgreSQL: 生成列search_vector（title/abstract/journal分别为权重A/B/C）和GIN索引；
+    - MySQL: title、abstract、journal各自的FULLTEXT索引以及三者的联合FULLTEXT索引。
+
+    可以重复调用，已有的索引不会重复创建。
+    """
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        statements = _sqlite_fulltext_ddl(engine)
+    elif dialect == 'postgresql':
+        statements = [
+            "ALTER TABLE pubmed_table ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(abstract, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(journal, '')), 'C')) STORED",
+            "CREATE INDEX IF NOT EXISTS ix_pubmed_table_search_vector ON pubmed_table USING GIN (search_vector)",
+        ]
+    elif dialect in ['mysql', 'mariadb']:
+        statements = _mysql_fulltext_ddl(engine)
+    else:
+        raise ValueError(f"full-text search is not supported for dialect {dialect}")
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    logger.info(f"Full-text index ready for {dialect}.")
+
+
+def _sqlite_fulltext_ddl(engine):
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'pubmed_fts'")).first()
+
+    columns = ', '.join(FULLTEXT_FIELDS)
+    new_values = ', '.join(f'new.{field}' for field in FULLTEXT_FIELDS)
+    old_values = ', '.join(f'old.{field}' for field in FULLTEXT_FIELDS)
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS pubmed_fts USING fts5({columns}, "
+        "content='pubmed_table', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS pubmed_fts_ai AFTER INSERT ON pubmed_table BEGIN "
+        f"INSERT INTO pubmed_fts(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS pubmed_fts_ad AFTER DELETE ON pubmed_table BEGIN "
+        f"INSERT INTO pubmed_fts(pubmed_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS pubmed_fts_au AFTER UPDATE ON pubmed_table BEGIN "
+        f"INSERT INTO pubmed_fts(pubmed_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO pubmed_fts(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+    if exists is None:
+        # 首次创建时为已有数据建立索引
+        statements.append("INSERT INTO pubmed_fts(pubmed_fts) VALUES ('rebuild')")
+    return statements
+
+
+def _mysql_fulltext_ddl(engine):
+    with engine.connect() as conn:
+        existing = {row[0] for row in conn.execute(text(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'pubmed_table'"
+        ))}
+
+    statements = []
+    indexes = {f'ft_pubmed_{field}': field for field in FULLTEXT_FIELDS}
+    indexes['ft_pubmed_all'] = ', '.join(FULLTEXT_FIELDS)
+    for name, columns in indexes.items():
+        if name not in existing:
+            statements.append(f"ALTER TABLE pubmed_table ADD FULLTEXT INDEX {name} ({columns})")
+    return statements
+
+
+def parse_fulltext_query(query: str):
+    """
+    将检索式解析为语法树。
+
+    支持AND、OR、NOT（大写）、括号、字段限定（title:promoter）、短语（"cis regulatory"）
+    和前缀（promot*，短语的最后一个词也可以是前缀："cis regul"*），相邻的词之间默认为AND。
+    MySQL的全文检索不支持短语前缀，fulltext_search在MySQL中遇到多个词的前缀时抛出ValueError。
+
+    返回:
+    tuple: ('term', field, words, prefix)、('and', [...])、('or', [...])或('not', node)。
+    """
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid full-text query near: {query[position:]!r}")
+        position = match.end()
+        open_paren, close_paren, field, phrase, star, word = match.groups()
+        if open_paren:
+            tokens.append(('(', None))
+        elif close_paren:
+            tokens.append((')', None))
+        elif field is None and phrase is None and word in ['AND', 'OR', 'NOT']:
+            tokens.append((word, None))
+        else:
+            if field is not None and field not in FULLTEXT_FIELDS:
+                raise ValueError(f"Unknown field {field!r}, must be one of {FULLTEXT_FIELDS}")
+            prefix = star is not None if phrase is not None else word.endswith('*')
+            raw = phrase if phrase is not None else word.rstrip('*')
+            words = tuple(re.findall(r'\w+', raw))
+            if not words:
+                raise ValueError(f"Empty term in full-text query: {query!r}")
+            tokens.append(('term', (field, words, prefix)))
+
+    node, index = _parse_or(tokens, 0)
+    if index != len(tokens):
+        raise ValueError(f"Unexpected {tokens[index][0]!r} in full-text query: {query!r}")
+    return node
+
+
+def _parse_or(tokens, index):
+    children = []
+    node, index = _parse_and(tokens, index)
+    children.append(node)
+    while index < len(tokens) and tokens[index][0] == 'OR':
+        node, index = _parse_and(tokens, index + 1)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ('or', children)), index
+
+
+def _parse_and(tokens, index):
+    children = []
+    node, index = _parse_not(tokens, index)
+    children.append(node)
+    while index < len(tokens) and tokens[index][0] in ['AND', 'NOT', 'term', '(']:
+        if tokens[index][0] == 'AND':
+            index += 1
+        node, index = _parse_not(tokens, index)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ('and', children)), index
+
+
+def _parse_not(tokens, index):
+    if index >= len(tokens):
+        raise ValueError("Unexpected end of full-text query")
+    kind, value = tokens[index]
+    if kind == 'NOT':
+        node, index = _parse_not(tokens, index + 1)
+        return ('not', node), index
+    if kind == '(':
+        node, index = _parse_or(tokens, index + 1)
+        if index >= len(tokens) or tokens[index][0] != ')':
+            raise ValueError("Unbalanced parentheses in full-text query")
+        return node, index + 1
+    if kind == 'term':
+        field, words, prefix = value
+        return ('term', field, words, prefix), index + 1
+    raise ValueError(f"Unexpected {kind!r} in full-text query")
+
+
+def fulltext_search(engine, query: str, *args, **kwargs):
+    """
+    使用全文索引检索pubmed_table，按相关度排序并分页返回。
+
+    参数:
+    engine: SQLAlchemy引擎，需要先调用create_fulltext_index。
+    query (str): 检索式，语法见parse_fulltext_query，
+                 例如 'title:promoter AND (enhancer OR silencer) NOT abstract:review'。
+    **kwargs: 支持fields（未限定字段的词检索的字段，默认title、abstract、journal）、
+              limit（默认20）和offset（默认0）。
+
+    返回:
+    list: 结果行，包含pubmed_table的列和相关度score（越大越相关）。
+    """
+    fields = tuple(kwargs.get('fields', FULLTEXT_FIELDS))
+    limit = kwargs.get('limit', 20)
+    offset = kwargs.get('offset', 0)
+    for field in fields:
+        if field not in FULLTEXT_FIELDS:
+            raise ValueError(f"Unknown field {field!r}, must be one of {FULLTEXT_FIELDS}")
+
+    node = parse_fulltext_query(query)
+    columns = ', '.join(f'p.{column}' for column in ('id',) + PUBMED_COLUMNS)
+    params = {'limit': limit, 'offset': offset}
+
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        params['query'] = _render_fts5(node, fields)
+        # bm25越小越相关，取负数使score越大越相关；title权重最高
+        stmt = (f"SELECT {columns}, -bm25(pubmed_fts, 10.0, 5.0, 1.0) AS score "
+                "FROM pubmed_fts JOIN pubmed_table p ON p.id = pubmed_fts.rowid "
+                "WHERE pubmed_fts MATCH :query ORDER BY score DESC LIMIT :limit OFFSET :offset")
+    elif dialect == 'postgresql':
+        params['query'] = _render_tsquery(node, fields)
+        stmt = (f"SELECT {columns}, ts_rank_cd(p.search_vector, q) AS score "
+                "FROM pubmed_table p, to_tsquery('english', :query) q "
+                "WHERE p.search_vector @@ q ORDER BY score DESC LIMIT :limit OFFSET :offset")
+    elif dialect in ['mysql', 'mariadb']:
+        scores = []
+        where = _render_mysql(node, fields, params, scores)
+        score = ' + '.join(scores) if scores else '0'
+        stmt = (f"SELECT {columns}, ({score}) AS score FROM pubmed_table p "
+                f"WHERE {where} ORDER BY score DESC LIMIT :limit OFFSET :offset")
+    else:
+        raise ValueError(f"full-text search is not supported for dialect {dialect}")
+
+    with engine.connect() as conn:
+        return conn.execute(text(stmt), params).fetchall()
+
+
+def _render_fts5(node, fields):
+    kind = node[0]
+    if kind == 'term':
+        _, field, words, prefix = node
+        phrase = '"' + ' '.join(words) + '"' + ('*' if prefix else '')
+        scope = (field,) if field else fields
+        if scope == FULLTEXT_FIELDS:
+            return phrase
+        return '{' + ' '.join(scope) + '} : ' + phrase
+    if kind == 'or':
+        return '(' + ' OR '.join(_render_fts5(child, fields) for child in node[1]) + ')'
+    if kind == 'and':
+        # FTS5的NOT是二元运算符，必须跟在肯定条件之后
+        positives = [_render_fts5(child, fields) for child in node[1] if child[0] != 'not']
+        negatives = [_render_fts5(child[1], fields) for child in node[1] if child[0] == 'not']
+        if not positives:
+            raise ValueError("NOT must be combined with at least one positive term in SQLite full-text queries")
+        rendered = '(' + ' AND '.join(positives) + ')'
+        for negative in negatives:
+            rendered = f'({rendered} NOT {negative})'
+        return rendered
+    raise ValueError("NOT must be combined with at least one positive term in SQLite full-text queries")
+
+
+def _render_tsquery(node, fields):
+    kind = node[0]
+    if kind == 'term':
+        _, field, words, prefix = node
+        scope = (field,) if field else fields
+        weights = '' if scope == FULLTEXT_FIELDS else ''.join(_PG_WEIGHTS[name] for name in scope)
+        lexemes = []
+        for i, word in enumerate(words):
+            suffix = ''
+            if prefix and i == len(words) - 1:
+                suffix = '*'
+            suffix += weights
+            lexemes.append(f"'{word}'" + (f':{suffix}' if suffix else ''))
+        return '(' + ' <-> '.join(lexemes) + ')'
+    if kind == 'or':
+        return '(' + ' | '.join(_render_tsquery(child, fields) for child in node[1]) + ')'
+    if kind == 'and':
+        return '(' + ' & '.join(_render_tsquery(child, fields) for child in node[1]) + ')'
+    return '!' + _render_tsquery(node[1], fields)
+
+
+def _render_mysql(node, fields, params, scores, negated=False):
+    kind = node[0]
+    if kind == 'term':
+        _, field, words, prefix = node
+        scope = (field,) if field else fields
+        name = f'q{len(params)}'
+        if prefix and len(words) > 1:
+            # 布尔模式的短语中不能使用*，改为普通短语会悄悄变成精确匹配，因此直接拒绝
+            raise ValueError(f"Prefix phrases are not supported by MySQL full-text search: {' '.join(words)!r}")
+        if prefix:
+            params[name] = words[0] + '*'
+        else:
+            params[name] = '"' + ' '.join(words) + '"'
+        # MATCH的列必须与某个FULLTEXT索引完全一致，部分字段组合时逐列匹配
+        if len(scope) == 1 or set(scope) == set(FULLTEXT_FIELDS):
+            groups = [tuple(column for column in FULLTEXT_FIELDS if column in scope)]
+        else:
+            groups = [(column,) for column in scope]
+        matches = [f"MATCH({', '.join('p.' + column for column in group)}) AGAINST(:{name} IN BOOLEAN MODE)"
+                   for group in groups]
+        if not negated:
+            scores.extend(matches)
+        return '(' + ' OR '.join(f'{match} > 0' for match in matches) + ')'
+    if kind == 'or':
+        return '(' + ' OR '.join(_render_mysql(child, fields, params, scores, negated) for child in node[1]) + ')'
+    if kind == 'and':
+        return '(' + ' AND '.join(_render_mysql(child, fields, params, scores, negated) for child in node[1]) + ')'
+    return 'NOT ' + _render_mysql(node[1], fields, params, scores, not negated)
@@ -0,0 +1,258 @@
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left
+from os.path import join
+import numpy as np
+from .baseline import iter_baseline
+from .fulltext import parse_fulltext_query
+
+__all__ = ['InvertedIndex', 'tokenize']
+
+INDEX_FORMAT_VERSION = 1
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(sentence: str) -> list:
+    if not sentence:
+        return []
+    return _WORD_RE.findall(sentence.lower())
+
+
+class InvertedIndex:
+    """
+    基于已解析记录的内存倒排索引，无需数据库即可检索本地语料。
+
+    每个字段的倒排表由若干段组成，每段保存排好序的词表，以及段内所有词的PMID倒排表拼接成的一个int64数组和偏移量数组。
+    commit只把新增记录构建为一个新段，不重写已有的段；新段与前一段大小相近时合并，段数保持在O(log n)，
+    每条倒排记录平均只被复制O(log n)次，逐个加入上千个基线文件时总开销不会随文件数平方增长。
+    compact把所有段合并为一段，save前会自动调用。
+    可以用save保存到目录，用load以内存映射方式打开，加载时间与语料大小基本无关。
+    检索语法与fulltext_search相同（AND/OR/NOT、括号、字段限定、前缀），
+    由于不保存词的位置，短语按字段内同时包含所有词处理。
+
+    用法:
+    index = InvertedIndex()
+    index.add_baseline(xmlfile, keywords=keywords)
+    pmids = index.search('title:promoter AND arabid*')
+    """
+
+    def __init__(self, fields=('title', 'abstract', 'journal')):
+        self.fields = tuple(fields)
+        self.files = []
+        # 每个字段的段列表，每段为(词表, 偏移量, 倒排表)，从旧到新排列
+        self._segments = {field: [] for field in self.fields}
+        self._pmid_segments = []
+        # 尚未合并进倒排表的新增记录
+        self._pending = {field: {} for field in self.fields}
+        self._pending_pmids = array('q')
+
+    def __len__(self):
+        return len(self._pmids)
+
+    @property
+    def _pmids(self) -> np.ndarray:
+        # 全部PMID只在NOT检索和计数时需要，用到时才合并
+        self.commit()
+        if len(self._pmid_segments) != 1:
+            self._pmid_segments = [_union(self._pmid_segments)]
+        return self._pmid_segments[0]
+
+    def add(self, record: dict):
+        pmid = int(record['pmid'])
+        self._pending_pmids.append(pmid)
+        for field in self.fields:
+            pending = self._pending[field]
+            for term in set(tokenize(record[field])):
+                postings = pending.get(term)
+                if postings is None:
+                    postings = pending[term] = array('q')
+                postings.append(pmid)
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record)
+        self.commit()
+        return self
+
+    def add_baseline(self, xmlfile: str, *args, **kwargs):
+        """
+        解析基线文件并加入索引，kwargs传给iter_baseline（keywords、impact_factor等）。
+
+        同一个PMID在后续文件中被修订时，新版本的词会加入索引，但旧版本独有的词不会被移除。
+        """
+        self.add_records(iter_baseline(xmlfile, **kwargs))
+        self.files.append(os.path.basename(xmlfile))
+        return self
+
+    def commit(self):
+        """
+        将新增记录构建为新段加入倒排表，只处理新增记录中出现的词。
+        """
+        if not self._pending_pmids:
+            return
+        for field in self.fields:
+            pending = self._pending[field]
+            if not pending:
+                continue
+            segment = _build_segment({term: np.unique(np.frombuffer(postings, dtype=np.int64))
+                                      for term, postings in pending.items()})
+            segments = self._segments[field]
+            segments.append(segment)
+            # 新段不小于前一段的一半时合并，段的大小按倍数递增
+            while len(segments) > 1 and len(segments[-2][2]) <= 2 * len(segments[-1][2]):
+                segments[-2:] = [_merge_segments(segments[-2:])]
+            self._pending[field] = {}
+        pmids = self._pmid_segments
+        pmids.append(np.unique(np.frombuffer(self._pending_pmids, dtype=np.int64)))
+        while len(pmids) > 1 and len(pmids[-2]) <= 2 * len(pmids[-1]):
+            pmids[-2:] = [_union(pmids[-2:])]
+        self._pending_pmids = array('q')
+
+    def compact(self):
+        """
+        将每个字段的所有段合并为一段，之后的检索只需查找一次词表。
+        """
+        self.commit()
+        for field in self.fields:
+            if len(self._segments[field]) > 1:
+                self._segments[field] = [_merge_segments(self._segments[field])]
+        if len(self._pmid_segments) > 1:
+            self._pmid_segments = [_union(self._pmid_segments)]
+
+    def postings(self, field: str, term: str) -> np.ndarray:
+        found = []
+        for terms, offsets, postings in self._segments[field]:
+            i = bisect_left(terms, term)
+            if i < len(terms) and terms[i] == term:
+                found.append(postings[offsets[i]:offsets[i + 1]])
+        if len(found) == 1:
+            return found[0]
+        return _union(found)
+
+    def prefix_postings(self, field: str, prefix: str) -> np.ndarray:
+        found = []
+        for terms, offsets, postings in self._segments[field]:
+            start = bisect_left(terms, prefix)
+            end = start
+            while end < len(terms) and terms[end].startswith(prefix):
+                end += 1
+            if start < end:
+                # 连续词的倒排表在postings中也是连续的，一次切片即可
+                found.append(postings[offsets[start]:offsets[end]])
+        return _union(found)
+
+    def search(self, query: str, *args, **kwargs) -> np.ndarray:
+        """
+        执行布尔检索，返回排好序的PMID数组。
+
+        参数:
+        query (str): 检索式，语法见parse_fulltext_query。
+        **kwargs: 支持fields，即未限定字段的词检索的字段，默认为索引的全部字段。
+        """
+        self.commit()
+        fields = tuple(kwargs.get('fields', self.fields))
+        return self._evaluate(parse_fulltext_query(query), fields)
+
+    def _evaluate(self, node, fields):
+        kind = node[0]
+        if kind == 'term':
+            _, field, words, prefix = node
+            scope = (field,) if field else fields
+            result = None
+            for field in scope:
+                if field not in self.fields:
+                    raise ValueError(f"Field {field!r} is not indexed")
+                matched = None
+                for i, word in enumerate(words):
+                    word = word.lower()
+                    if prefix and i == len(words) - 1:
+                        postings = self.prefix_postings(field, word)
+                    else:
+                        postings = self.postings(field, word)
+                    matched = postings if matched is None else np.intersect1d(matched, postings, assume_unique=True)
+                result = matched if result is None else np.union1d(result, matched)
+            return result
+        if kind == 'or':
+            result = np.zeros(0, dtype=np.int64)
+            for child in node[1]:
+                result = np.union1d(result, self._evaluate(child, fields))
+            return result
+        if kind == 'and':
+            positives = [child for child in node[1] if child[0] != 'not']
+            negatives = [child[1] for child in node[1] if child[0] == 'not']
+            result = self._evaluate(positives[0], fields) if positives else self._pmids
+            for child in positives[1:]:
+                result = np.intersect1d(result, self._evaluate(child, fields), assume_unique=True)
+            for child in negatives:
+                result = np.setdiff1d(result, self._evaluate(child, fields), assume_unique=True)
+            return result
+        return np.setdiff1d(self._pmids, self._evaluate(node[1], fields), assume_unique=True)
+
+    def save(self, path: str):
+        """
+        将索引保存到目录，数组以.npy格式保存以便内存映射加载。
+        """
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        for field in self.fields:
+            terms, offsets, postings = self._segments[field][0] if self._segments[field] else _build_segment({})
+            with open(join(path, f'{field}.terms.txt'), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(terms))
+            np.save(join(path, f'{field}.offsets.npy'), offsets)
+            np.save(join(path, f'{field}.postings.npy'), postings)
+        np.save(join(path, 'pmids.npy'), self._pmids)
+        with open(join(path, 'meta.json'), 'w') as f:
+            json.dump({'format': INDEX_FORMAT_VERSION, 'fields': list(self.fields), 'files': self.files}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        从目录加载索引。mmap为True时倒排表以只读内存映射方式打开，按需读入内存；
+        之后仍可以继续添加记录，新记录写入新的段，合并时会生成新的内存数组。
+        """
+        with open(join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['format'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format {meta['format']}")
+
+        mmap_mode = 'r' if mmap else None
+        index = cls(fields=meta['fields'])
+        index.files = meta['files']
+        for field in index.fields:
+            with open(join(path, f'{field}.terms.txt'), encoding='utf-8') as f:
+                content = f.read()
+            if content:
+                index._segments[field] = [(content.split('\n'),
+                                           np.load(join(path, f'{field}.offsets.npy'), mmap_mode=mmap_mode),
+                                           np.load(join(path, f'{field}.postings.npy'), mmap_mode=mmap_mode))]
+        index._pmid_segments = [np.load(join(path, 'pmids.npy'), mmap_mode=mmap_mode)]
+        return index
+
+
+def _union(arrays: list) -> np.ndarray:
+    # 合并若干个PMID数组，返回排好序的去重结果
+    if not arrays:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.concatenate(arrays))
+
+
+def _build_segment(merged: dict) -> tuple:
+    # 由{词: 排好序的去重PMID数组}构建一段(词表, 偏移量, 倒排表)
+    terms = sorted(merged)
+    lengths = np.fromiter((len(merged[term]) for term in terms), dtype=np.int64, count=len(terms))
+    offsets = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(lengths)])
+    postings = np.concatenate([merged[term] for term in terms]) if terms else np.zeros(0, dtype=np.int64)
+    return terms, offsets, postings
+
+
+def _merge_segments(segments: list) -> tuple:
+    merged = {}
+    for terms, offsets, postings in segments:
+        for i, term in enumerate(terms):
+            current = merged.get(term)
+            chunk = postings[offsets[i]:offsets[i + 1]]
+            merged[term] = chunk if current is None else np.union1d(current, chunk)
+    return _build_segment(merged)
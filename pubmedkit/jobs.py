@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import time
+from datetime import datetime
+from os.path import basename
+from sqlalchemy import Table, Column, String, Integer, Float, Text, DateTime, MetaData, select, insert, update
+from .corpus import format_error
+from .db_utils import apply_pubmed_file, record_update_file, create_pmid_unique_index, create_update_file_table
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['run_ingestion_job', 'create_ingest_manifest_table', 'get_ingest_manifest', 'file_checksum']
+
+
+def file_checksum(filename: str) -> str:
+    """
+    计算文件内容的MD5。
+    """
+    digest = hashlib.md5()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def create_ingest_manifest_table(engine):
+    """
+    创建导入任务的清单表pubmed_ingest_manifest，每个文件一行，记录状态、校验和、尝试次数、记录数和耗时。
+
+    status为'running'（开始处理但尚未完成，例如进程中途崩溃）、'done'或'failed'。
+    """
+    metadata = MetaData()
+    manifest_table = Table('pubmed_ingest_manifest', metadata,
+                           Column('filename', String(255), primary_key=True),
+                           Column('checksum', String(32)),
+                           Column('status', String(16)),
+                           Column('attempts', Integer),
+                           Column('records', Integer),
+                           Column('deleted', Integer),
+                           Column('seconds', Float),
+                           Column('error', Text),
+                           Column('started_at', DateTime),
+                           Column('finished_at', DateTime))
+    metadata.create_all(engine)
+    return manifest_table
+
+
+def get_ingest_manifest(engine) -> dict:
+    """
+    返回清单表的内容：{filename: 该文件的清单行（字典）}。
+    """
+    manifest_table = create_ingest_manifest_table(engine)
+    with engine.connect() as conn:
+        return {row['filename']: dict(row) for row in conn.execute(select(manifest_table)).mappings()}
+
+
+def run_ingestion_job(engine, files: list, *args, **kwargs) -> list:
+    """
+    可中断、可恢复的批量导入任务：按文件名顺序把基线/更新文件逐个写入pubmed_table。
+
+    每个文件的upsert、DeleteCitation删除、pubmed_update_files记录和清单表中的'done'状态在同一个事务中提交，
+    因此任务在任何时刻中断都不会留下写了一半的文件，重新运行同一任务时已完成的文件会被跳过，
+    重复写入的记录按pmid覆盖而不会产生重复行。
+    已完成的文件内容改变（校验和不同）时重新导入，文件中的文章覆盖同一版本的已有记录，
+    新文件中不再出现的PMID保留原来的记录。
+    失败的文件按retry_delay等待后重试，每个文件累计最多尝试max_attempts次（包括之前的运行），
+    达到上限的文件不再处理，直到用reset_failed=True重新运行。
+
+    参数:
+    engine: SQLAlchemy引擎，pubmed_table需要已经创建。
+    files (list): XML文件路径列表。
+    **kwargs: 支持max_attempts（默认3）、retry_delay（第一次重试前等待的秒数，之后每次翻倍，默认5）、
+              reset_failed（默认False）和chunk_size（默认10000），
+              其余参数（keywords、impact_factor、cache、metrics等）传给iter_baseline。
+              metrics还会记录ingest_files {status}。
+
+    返回:
+    list: 每个文件一个字典{'filename', 'status', 'attempts', 'records', 'deleted', 'seconds', 'error'}，
+          status为'done'、'skipped'或'failed'。
+    """
+    max_attempts = kwargs.pop('max_attempts', 3)
+    retry_delay = kwargs.pop('retry_delay', 5)
+    reset_failed = kwargs.pop('reset_failed', False)
+    chunk_size = kwargs.pop('chunk_size', 10000)
+    metrics = kwargs.get('metrics', None)
+    if max_attempts < 1:
+        raise ValueError('max_attempts must be at least 1')
+
+    create_pmid_unique_index(engine)
+    update_file_table = create_update_file_table(engine)
+    manifest_table = create_ingest_manifest_table(engine)
+    manifest = get_ingest_manifest(engine)
+    with engine.connect() as conn:
+        applied = {row.filename for row in conn.execute(select(update_file_table.c.filename))}
+
+    results = []
+    for xmlfile in sorted(files, key=basename):
+        filename = basename(xmlfile)
+        checksum = file_checksum(xmlfile)
+        entry = manifest.get(filename)
+
+        if entry is not None and entry['status'] == 'done':
+            if entry['checksum'] == checksum:
+                result = _result(entry, 'skipped')
+                results.append(result)
+                _count(metrics, result)
+                continue
+            logger.warning(f"{filename} changed since it was ingested, ingest again.")
+        elif entry is None and filename in applied:
+            # 由apply_update_file写入过的文件，补记到清单表中
+            result = {'filename': filename, 'status': 'skipped', 'attempts': 0, 'records': 0,
+                      'deleted': 0, 'seconds': 0.0, 'error': None}
+            _write_manifest(engine, manifest_table, filename, False, checksum=checksum, status='done', attempts=0)
+            results.append(result)
+            _count(metrics, result)
+            continue
+
+        # 'running'是上次运行中途中断的文件，和'failed'一样计入已用的尝试次数
+        attempts = 0
+        if entry is not None and entry['status'] in ['failed', 'running'] and not reset_failed:
+            attempts = entry['attempts']
+        result = None
+        tries = 0
+        while attempts < max_attempts:
+            if tries:
+                delay = retry_delay * 2 ** (tries - 1)
+                logger.warning(f"Retry {filename} in {delay:.1f}s (attempt {attempts + 1}/{max_attempts})")
+                time.sleep(delay)
+            attempts += 1
+            tries += 1
+            # 已经提交过的文件（包括内容改变后重新导入失败的）需要整体替换该版本的记录
+            result = _ingest_file(engine, xmlfile, filename, checksum, attempts, entry is not None,
+                                  manifest_table, update_file_table, chunk_size, filename in applied, kwargs)
+            entry = entry or {'filename': filename}
+            if result['status'] == 'done':
+                break
+
+        if result is None:
+            # 之前的运行已经用完了尝试次数
+            logger.warning(f"{filename} failed {attempts} times, skip.")
+            result = _result(entry, 'failed')
+        results.append(result)
+        _count(metrics, result)
+    return results
+
+
+def _ingest_file(engine, xmlfile, filename, checksum, attempts, exists, manifest_table, update_file_table,
+                 chunk_size, replace, kwargs) -> dict:
+    version = filename.split('.')[0]
+    started_at = datetime.now()
+    # 先在单独的事务中记下'running'和尝试次数，进程崩溃后重启时也计入尝试次数
+    _write_manifest(engine, manifest_table, filename, exists, checksum=checksum, status='running',
+                    attempts=attempts, error=None, started_at=started_at, finished_at=None)
+    start = time.perf_counter()
+    try:
+        with engine.begin() as conn:
+            records, deleted = apply_pubmed_file(conn, engine, xmlfile, chunk_size=chunk_size, replace=replace,
+                                                 **kwargs)
+            record_update_file(conn, update_file_table, filename, version, records, deleted)
+            seconds = time.perf_counter() - start
+            conn.execute(update(manifest_table).where(manifest_table.c.filename == filename).values(
+                status='done', records=records, deleted=deleted, seconds=seconds, finished_at=datetime.now()))
+    except Exception as e:
+        error = format_error(e)
+        seconds = time.perf_counter() - start
+        logger.error(f"Error in file {xmlfile} (attempt {attempts}): {error}")
+        _write_manifest(engine, manifest_table, filename, True, status='failed', error=error,
+                        seconds=seconds, finished_at=datetime.now())
+        return {'filename': filename, 'status': 'failed', 'attempts': attempts, 'records': 0,
+                'deleted': 0, 'seconds': seconds, 'error': error}
+
+    logger.info(f"Ingested {filename}: {records} records, {deleted} deleted in {seconds:.1f}s.")
+    return {'filename': filename, 'status': 'done', 'attempts': attempts, 'records': records,
+            'deleted': deleted, 'seconds': seconds, 'error': None}
+
+
+def _write_manifest(engine, manifest_table, filename, exists, **values):
+    # exists为False时插入新行，否则更新已有的行
+    with engine.begin() as conn:
+        if not exists:
+            conn.execute(insert(manifest_table), [dict(values, filename=filename)])
+        else:
+            conn.execute(update(manifest_table).where(manifest_table.c.filename == filename).values(**values))
+
+
+def _result(entry: dict, status: str) -> dict:
+    return {'filename': entry['filename'], 'status': status, 'attempts': entry['attempts'],
+            'records': entry['records'] or 0, 'deleted': entry['deleted'] or 0,
+            'seconds': entry['seconds'] or 0.0, 'error': entry['error']}
+
+
+def _count(metrics, result: dict):
+    if metrics is not None:
+        metrics.incr('ingest_files', status=result['status'])
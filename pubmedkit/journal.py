@@ -0,0 +1,192 @@
+import os
+import pickle
+import re
+import sys
+import unicodedata
+from array import array
+from importlib import resources
+from os import PathLike
+
+__all__ = ['JournalTable', 'normalize_journal_name', 'get_journal_table', 'load_nlm_journal_aliases',
+           'DEFAULT_IF_FILE', 'DEFAULT_IF5_FILE']
+
+# 影响因子数据作为包数据随pubmedkit安装，通过importlib.resources读取，不依赖当前工作目录和安装方式
+_DATA_DIR = resources.files(__package__) / 'data'
+DEFAULT_IF_FILE = _DATA_DIR / 'if2024.pickle'
+DEFAULT_IF5_FILE = _DATA_DIR / 'if2024_5year.pickle'
+
+_NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+_PARENTHESES_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+
+# 每个进程只构建一次，fork出的工作进程直接继承
+_default_table = None
+
+
+def normalize_journal_name(name: str) -> str:
+    """
+    规范化期刊名：去掉重音、转小写、"&"替换为"and"、标点统一为空格、去掉开头的"the"。
+
+    例如"The Plant Journal"和"plant journal"、"CA: a cancer journal for clinicians"
+    和"ca-a cancer journal for clinicians"规范化后相同。
+    """
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower().replace('&', ' and ')
+    name = _NON_ALNUM_RE.sub(' ', name).strip()
+    if name.startswith('the '):
+        name = name[4:]
+    return sys.intern(name)
+
+
+def _open_data(path):
+    # path可以是文件路径，也可以是importlib.resources返回的Traversable（例如安装在zip中的包数据）
+    if isinstance(path, (str, PathLike)):
+        return open(path, 'rb')
+    return path.open('rb')
+
+
+def _is_data_file(path) -> bool:
+    if isinstance(path, (str, PathLike)):
+        return os.path.isfile(path)
+    return path.is_file()
+
+
+def _candidate_keys(name: str):
+    # 依次尝试：完整名称、去掉括号内容、去掉冒号后的副标题
+    yield normalize_journal_name(name)
+    without_parentheses = _PARENTHESES_RE.sub(' ', name)
+    yield normalize_journal_name(without_parentheses)
+    if ':' in without_parentheses:
+        yield normalize_journal_name(without_parentheses.split(':', 1)[0])
+
+
+class JournalTable:
+    """
+    期刊到影响因子的查找表。
+
+    期刊按影响因子文件中的顺序分配从1开始的整数ID，规范化后的期刊名映射到ID，
+    影响因子保存在按ID索引的紧凑数组中。原始期刊名的查找结果会被缓存，
+    同一个期刊名在热路径上只需一次字典查询。找不到的期刊返回None。
+
+    参数:
+    if_file (str): 期刊名到影响因子的pickle字典，默认使用包内的数据。
+    if5_file (str): 期刊名到5年影响因子的pickle字典，可以为None。
+    aliases (dict): 额外的别名（例如ISO缩写）到期刊名的映射，见load_nlm_journal_aliases。
+    """
+
+    def __init__(self, if_file: str = DEFAULT_IF_FILE, if5_file: str = DEFAULT_IF5_FILE, aliases: dict = None):
+        with _open_data(if_file) as f:
+            impact_factors = pickle.load(f)
+        impact_factors_5year = {}
+        if if5_file is not None and _is_data_file(if5_file):
+            with _open_data(if5_file) as f:
+                impact_factors_5year = pickle.load(f)
+
+        # ID 0保留为"未知期刊"
+        self.names = ['']
+        self.impact_factors = array('d', [float('nan')])
+        self.impact_factors_5year = array('d', [float('nan')])
+        self._ids = {}
+        for name, value in impact_factors.items():
+            key = normalize_journal_name(name)
+            if key in self._ids:
+                # 规范化后重名时保留先出现的期刊
+                continue
+            self._ids[key] = len(self.names)
+            self.names.append(name)
+            self.impact_factors.append(float(value))
+            self.impact_factors_5year.append(float(impact_factors_5year.get(name, float('nan'))))
+
+        if aliases:
+            self.add_aliases(aliases)
+        self._lookup_cache = {}
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lookup_cache'] = {}
+        return state
+
+    def add_aliases(self, aliases: dict):
+        """
+        添加别名到期刊名的映射，期刊名不在表中的别名会被忽略。
+        """
+        for alias, name in aliases.items():
+            journal_id = self.journal_id(name)
+            if journal_id is not None:
+                self._ids.setdefault(normalize_journal_name(alias), journal_id)
+        self._lookup_cache = {}
+
+    def journal_id(self, name: str):
+        try:
+            return self._lookup_cache[name]
+        except KeyError:
+            pass
+        journal_id = None
+        if name:
+            for key in _candidate_keys(name):
+                journal_id = self._ids.get(key)
+                if journal_id is not None:
+                    break
+        self._lookup_cache[name] = journal_id
+        return journal_id
+
+    def impact_factor(self, name: str):
+        journal_id = self.journal_id(name)
+        return None if journal_id is None else self.impact_factors[journal_id]
+
+    def impact_factor_5year(self, name: str):
+        journal_id = self.journal_id(name)
+        return None if journal_id is None else self.impact_factors_5year[journal_id]
+
+    def rows(self):
+        """
+        产出用于写入journal_table的行：{'id', 'journal', 'IF2023', 'IF5year'}。
+        """
+        for journal_id in range(1, len(self.names)):
+            if5 = self.impact_factors_5year[journal_id]
+            yield {
+                'id': journal_id,
+                'journal': self.names[journal_id],
+                'IF2023': self.impact_factors[journal_id],
+                'IF5year': None if if5 != if5 else if5,
+            }
+
+
+def get_journal_table(**kwargs) -> JournalTable:
+    """
+    返回进程内共享的默认JournalTable，第一次调用时构建。
+
+    在父进程中先调用一次，再用fork方式启动的工作进程会直接继承已构建好的表（写时复制），
+    不必在每个进程、每个文件中重新加载pickle。传入参数时构建一个新的表而不替换默认表。
+    """
+    global _default_table
+    if kwargs:
+        return JournalTable(**kwargs)
+    if _default_table is None:
+        _default_table = JournalTable()
+    return _default_table
+
+
+def load_nlm_journal_aliases(filename: str) -> dict:
+    """
+    读取NLM的期刊列表文件（https://ftp.ncbi.nlm.nih.gov/pubmed/J_Medline.txt），
+    返回MedAbbr和IsoAbbr到JournalTitle的映射，可传给JournalTable的aliases参数。
+    """
+    aliases = {}
+    title = None
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('-----'):
+                title = None
+                continue
+            key, _, value = line.partition(':')
+            value = value.strip()
+            if key == 'JournalTitle':
+                title = value
+            elif key in ['MedAbbr', 'IsoAbbr'] and title and value:
+                aliases[value] = title
+    return aliases
@@ -1,78 +1,133 @@
-from Bio import Entrez
-from Bio import Medline
-import pandas as pd
-
-def query_pmid(query: str, email: str="your_email@example.com", retmax: int=9999) -> list:
-    Entrez.email = email 
-    search_handle = Entrez.esearch(db="pubmed", term=query, retmax=retmax)
-    record = Entrez.read(search_handle)
-    idlist = record["IdList"]
-    return idlist
+import asyncio
+import re
+from os.path import basename, isfile
+from .baseline import filter_articles, records_to_pd
+from .eutils import EutilsClient
+from .fileio import open_medline_text
+
+def query_pmid(query: str, email: str="your_email@example.com", retmax: int=None, api_key: str=None) -> list:
+    # 通过history server分页取回全部PMID，retmax为None时不截断
+    client = EutilsClient(email=email, api_key=api_key)
+    return asyncio.run(client.search_pmids(query, retmax=retmax))
+
+
+# 只解析需要的字段，其余标签（以及它们的续行）直接跳过
+_MEDLINE_TAGS = {'PMID', 'TI', 'AB', 'JT', 'DP', 'PT', 'FAU', 'AU', 'LID', 'AID'}
+_YEAR_RE = re.compile(r'\d{4}')
+
+
+def iter_medline_text(filename: str):
+    """
+    逐条解析MEDLINE文本格式（PubMed导出的"PubMed"格式）文件，产出未经过滤的文章字典，
+    字段格式与iter_medline_articles相同。
+
+    按行解析标签，只保留需要的字段，内存占用与文件大小无关。
+    """
+    record = {}
+    values = None
+    with open_medline_text(filename) as handle:
+        for line in handle:
+            if line.startswith('      '):
+                # 续行，拼接到上一个值
+                if values is not None:
+                    values[-1] += ' ' + line.strip()
+            elif len(line) > 5 and line[4] == '-':
+                tag = line[:4].rstrip()
+                if tag in _MEDLINE_TAGS:
+                    values = record.setdefault(tag, [])
+                    values.append(line[6:].strip())
+                else:
+                    values = None
+            elif not line.strip():
+                # 空行分隔记录
+                if 'PMID' in record:
+                    yield _medline_text_article(record)
+                record = {}
+                values = None
+        if 'PMID' in record:
+            yield _medline_text_article(record)
+
+
+def _medline_text_article(record: dict) -> dict:
+    full_names = record.get('FAU', [])
+    short_names = record.get('AU', [])
+    authors = []
+    for i in range(max(len(full_names), len(short_names))):
+        short_name = short_names[i] if i < len(short_names) else ''
+        lastname, _, initials = short_name.rpartition(' ')
+        if i < len(full_names):
+            lastname, _, forename = full_names[i].partition(', ')
+        else:
+            forename = ''
+        authors.append(f"{lastname}|{forename}|{initials}|")
+
+    doi = ''
+    for value in record.get('LID', []) + record.get('AID', []):
+        if value.endswith('[doi]'):
+            doi = value[:-len('[doi]')].strip()
+            break
+
+    year = _YEAR_RE.search(record.get('DP', [''])[0])
+
+    return {
+        'pmid': int(record['PMID'][0]),
+        'title': ' '.join(record.get('TI', [])),
+        'abstract': ' '.join(record.get('AB', [])),
+        'journal': record.get('JT', [''])[0],
+        'pubdate': year.group(0) if year else '',
+        'publication_types': '; '.join(record.get('PT', [])),
+        'authors': ';'.join(authors),
+        'doi': doi,
+    }
+
+
+def iter_pubmed_file(filename: str, *args, **kwargs):
+    """
+    以流式方式读取MEDLINE文本文件，按关键词和影响因子过滤后逐条产出记录，
+    记录格式与iter_baseline相同，可以直接交给bulk_insert_pubmed_data或InvertedIndex。
+
+    参数:
+    filename (str): MEDLINE文本文件路径。
+    **kwargs: 支持keywords、kw_filter、impact_factor、journal_table和log，
+              version默认为不带扩展名的文件名。
+
+    返回:
+    generator: 逐条产出记录字典。
+    """
+    if not isfile(filename):
+        raise FileNotFoundError(f"The specified file {filename} does not exist.")
+    version = kwargs.pop('version', basename(filename).split('.')[0])
+    yield from filter_articles(iter_medline_text(filename), version, **kwargs)
 
 
 def load_pubmed_file(filename: str,  *args, **kwargs):
-
+    """
+    读取MEDLINE文本文件，返回列表、字典或DataFrame；参数同load_baseline，
+    sink为DatabaseSink时记录边读取边异步写入数据库，返回交给sink的记录数。
+    """
     # 获取输出类型，默认为'list'
-    output_type = kwargs.get('output_type', 'list')
+    output_type = kwargs.pop('output_type', 'list')
+    sink = kwargs.pop('sink', None)
+    if sink is not None:
+        return sink.consume(iter_pubmed_file(filename, **kwargs))
 
     # 验证输出类型的有效性
     if output_type not in ['list', 'dict', 'pd']:
         raise ValueError('output_type must be "pd", "list" or "dict"')
 
-    records_dict = {}
-
-    with open(filename, 'r') as handle:
-
-        for record in Medline.parse(handle):
-            pmid = record['PMID']
-            records_dict[pmid] = {
-                'pmid': pmid,
-                'title': record.get('TI', 'N/A'),
-                'abstract': record.get('AB', 'No abstract available'),
-                'journal': record.get('JT', 'N/A'),
-                'pubdate': record.get('DP', 'N/A'),
-                'publication_types': record.get('PT', []),
-                'authors': record.get('AU', [])
-            }
-    # records = []
-
-
-    # with open(filename) as handle:
-    #     records = Medline.parse(handle)
-    
-    # # return records
-
-    # records_dict = {}
-
-    # for record in records:
-    #     pmid = record['PMID']
-    #     records_dict[pmid] = {
-    #         'pmid': pmid,
-    #         'title': record['TI'],
-    #         'abstract':  record['AB'],
-    #         'journal': record['JT'],
-    #         'pubdate': record['DP'],    
-    #         'publication_types': record['PT'],
-    #         'authors': record['AU'],
-
-    #     }
-    
-
+    records_dict = {record['pmid']: record for record in iter_pubmed_file(filename, **kwargs)}
 
     # 根据输出类型返回数据
     if output_type == 'pd':
         # 如果是'pd'，则返回DataFrame格式的数据
-        return pd.DataFrame.from_dict(records_dict).T
+        return records_to_pd(records_dict)
     elif output_type == 'dict':
         # 如果是'dict'，则返回字典格式的数据
         return records_dict
-    elif output_type == 'list':
+    else:
         # 如果是'list'，则返回列表格式的数据
         return list(records_dict.values())
-    else:
-        # output_type无效，抛出异常
-        raise ValueError('Invalid output_type')
     
 
 if __name__ == '__main__':
-    records = load_pubmed_file("../data/pubmed_Arabidopsis_ChIP.txt")
\ No newline at end of file
+    records = load_pubmed_file("../data/pubmed_Arabidopsis_ChIP.txt")
@@ -0,0 +1,150 @@
+import logging
+import pickle
+import re
+from os.path import basename
+from .baseline import iter_baseline, filter_articles
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['file_sequence', 'iter_merged_corpus', 'merge_corpus']
+
+# pubmed24n0001.xml.gz -> (24, 1)
+_FILE_SEQUENCE_RE = re.compile(r'(\d+)n(\d+)')
+
+# 解析文件时只影响读取方式、不做过滤的参数
+_PARSE_OPTIONS = ('cache', 'read_ahead', 'block_size', 'mmap', 'log')
+
+
+def file_sequence(xmlfile: str) -> tuple:
+    """
+    返回文件在PubMed发布序列中的位置(年份, 序号, 文件名)，用于对基线文件和更新文件排序。
+
+    pubmed24n1220.xml.gz在pubmed24n1219.xml.gz之后，pubmed25n0001.xml.gz在所有pubmed24n*之后；
+    无法识别的文件名排在最前面，按文件名排序。
+    """
+    name = basename(xmlfile)
+    match = _FILE_SEQUENCE_RE.search(name)
+    if match is None:
+        return -1, -1, name
+    return int(match.group(1)), int(match.group(2)), name
+
+
+class _PmidSet:
+    """
+    以位图保存已经见过的PMID，3600万个PMID约占5MB。
+    """
+
+    def __init__(self, size: int = 1 << 20):
+        self._bits = bytearray(size >> 3)
+
+    def add(self, pmid: int) -> bool:
+        # 返回pmid是否是第一次出现
+        index = pmid >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1, len(self._bits) * 2) - len(self._bits)))
+        mask = 1 << (pmid & 7)
+        if self._bits[index] & mask:
+            return False
+        self._bits[index] |= mask
+        return True
+
+
+def iter_merged_corpus(files: list, *args, **kwargs):
+    """
+    合并一组基线文件和更新文件，每个PMID只产出最新的版本，并去掉已被DeleteCitation删除的PMID。
+
+    文件按file_sequence从新到旧处理，每个文件内从后往前处理，因此每个PMID第一次出现时就是它的最新版本，
+    之后出现的旧版本直接跳过。已见过的PMID保存在位图中，每次只缓存一个文件的文章，
+    内存占用与语料中的文章总数基本无关。
+    关键词和影响因子过滤在去重之后进行：最新版本被过滤掉时，不会退回到旧版本。
+    产出顺序为从新到旧，需要按PMID排序时由下游处理。
+
+    参数:
+    files (list): XML文件路径列表，顺序不限。
+    **kwargs: 支持stats，其余参数（keywords、kw_filter、impact_factor、fields、compact、cache、metrics等）
+              含义同iter_baseline。
+              stats为字典时写入合并的统计：{'files', 'records', 'duplicates', 'deleted', 'dropped'}，
+              分别为文件数、产出的记录数、跳过的旧版本数、删除的PMID数和被过滤掉的记录数。
+
+    返回:
+    generator: 逐条产出记录。
+    """
+    stats = kwargs.pop('stats', None)
+    if stats is None:
+        stats = {}
+    stats.update({'files': 0, 'records': 0, 'duplicates': 0, 'deleted': 0, 'dropped': 0})
+    parse_options = {key: kwargs[key] for key in _PARSE_OPTIONS if key in kwargs}
+    seen = _PmidSet()
+
+    for xmlfile in sorted(files, key=file_sequence, reverse=True):
+        version = basename(xmlfile).split('.')[0]
+        entries = list(iter_baseline(xmlfile, include_deleted=True, **parse_options))
+        latest = []
+        for entry in reversed(entries):
+            if not seen.add(int(entry['pmid'])):
+                stats['duplicates'] += 1
+            elif entry.get('delete', False):
+                stats['deleted'] += 1
+            else:
+                latest.append(entry)
+        del entries
+
+        kept = 0
+        for record in filter_articles(latest, version, **kwargs):
+            kept += 1
+            yield record
+        stats['files'] += 1
+        stats['records'] += kept
+        stats['dropped'] += len(latest) - kept
+        if kwargs.get('log', False):
+            logger.info(f"merged {xmlfile}: {kept} records")
+
+
+def merge_corpus(files: list, output: str = None, *args, **kwargs):
+    """
+    合并一组基线文件和更新文件，得到去重后的语料快照，见iter_merged_corpus。
+
+    参数:
+    files (list): XML文件路径列表。
+    output (str): 输出文件路径。以.parquet结尾时按batch_size（默认10000）分批写入Parquet文件，
+                  内存占用有上限（需要pyarrow）；以.pkl结尾时写入记录列表的pickle，
+                  可以用load_dict_from_pickle读取，但需要在内存中保留所有记录；
+                  为None时返回记录列表。
+    **kwargs: 支持batch_size和compression（Parquet的压缩方式，默认'zstd'），其余参数传给iter_merged_corpus。
+
+    返回:
+    dict或tuple: 有output时返回统计字典；否则返回(records, stats)。
+    """
+    batch_size = kwargs.pop('batch_size', 10000)
+    compression = kwargs.pop('compression', 'zstd')
+    stats = {}
+    records = iter_merged_corpus(files, stats=stats, **kwargs)
+
+    if output is None:
+        return list(records), stats
+
+    if output.endswith('.parquet'):
+        _write_parquet(records, output, batch_size, compression)
+    elif output.endswith('.pkl'):
+        with open(output, 'wb') as f:
+            pickle.dump(list(records), f)
+    else:
+        raise ValueError('output must end with ".parquet" or ".pkl"')
+    logger.info(f"Merged {stats['records']} records from {stats['files']} files into {output}.")
+    return stats
+
+
+def _write_parquet(records, output: str, batch_size: int, compression: str):
+    from .columnar import _require_pyarrow, ArrowRecordBuilder, PUBMED_ARROW_SCHEMA
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(output, PUBMED_ARROW_SCHEMA, compression=compression) as writer:
+        builder = ArrowRecordBuilder()
+        for record in records:
+            builder.append(record)
+            if len(builder) >= batch_size:
+                writer.write_table(builder.finish())
+                builder = ArrowRecordBuilder()
+        if len(builder):
+            writer.write_table(builder.finish())
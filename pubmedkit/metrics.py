@@ -0,0 +1,186 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = ['Metrics', 'StatsdExporter', 'start_prometheus_server']
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """
+    导入流程的计数器和计时器，不依赖logging，也不修改任何全局配置。
+
+    iter_baseline、filter_articles、iter_baseline_corpus、bulk_insert_pubmed_data、
+    upsert_pubmed_data和apply_update_file等函数接受metrics参数，传入Metrics对象后记录：
+
+    - parse_seconds / filter_seconds {file}: 每个文件解析（或过滤）所用时间，不包括消费者处理记录的时间
+    - records_seen / records_kept / records_deleted {file}: 处理、保留和DeleteCitation记录数
+    - records_dropped {file, reason}: 被关键词（reason="keyword"）或影响因子（reason="impact_factor"）过滤掉的记录数
+    - unknown_journals {file}: 影响因子过滤时找不到期刊的记录数
+    - insert_batch_seconds {table, operation}: 每块写入的耗时
+    - rows_written / rows_deleted {table, operation}: 写入和删除的行数
+
+    每次记录时依次调用callbacks中的函数callback(kind, name, value, labels)，
+    kind为'counter'或'timer'，可以用来对接StatsdExporter或其他监控系统；
+    也可以用to_prometheus输出Prometheus文本格式，或用start_prometheus_server提供/metrics接口。
+    Metrics是线程安全的。
+
+    用法:
+    metrics = Metrics(callbacks=[StatsdExporter('localhost', 8125)])
+    load_baseline(xmlfile, keywords=keywords, metrics=metrics)
+    print(metrics.to_prometheus())
+    """
+
+    def __init__(self, callbacks=None):
+        self.callbacks = list(callbacks or [])
+        self.counters = {}
+        # (name, labels) -> [次数, 总时间, 最长时间]
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        for callback in self.callbacks:
+            callback('counter', name, value, labels)
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+        for callback in self.callbacks:
+            callback('timer', name, seconds, labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels):
+        """
+        返回计数器的值；不给出labels时返回所有标签下的总和。
+        """
+        with self._lock:
+            if labels:
+                return self.counters.get((name, _label_key(labels)), 0)
+            return sum(value for (key, _), value in self.counters.items() if key == name)
+
+    def record(self, kind: str, name: str, value, labels: dict):
+        """
+        按callback的参数格式记录一次数据，用于重放其他进程中收集的记录（见iter_baseline_corpus）。
+        """
+        if kind == 'timer':
+            self.observe(name, value, **labels)
+        else:
+            self.incr(name, value, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.timers = {}
+
+    def to_prometheus(self, prefix: str = 'pubmedkit_') -> str:
+        """
+        以Prometheus文本格式输出：计数器为counter（名称加_total后缀），计时器为summary（_count和_sum）。
+        """
+        def render(labels):
+            if not labels:
+                return ''
+            values = ','.join(
+                '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, value in labels
+            )
+            return '{' + values + '}'
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timers = sorted(self.timers.items())
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f'{prefix}{name}_total'
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{render(labels)} {value}')
+        for (name, labels), (count, total, _) in timers:
+            metric = f'{prefix}{name}'
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{metric}_count{render(labels)} {count}')
+            lines.append(f'{metric}_sum{render(labels)} {total}')
+        return '\n'.join(lines) + '\n'
+
+
+class StatsdExporter:
+    """
+    把Metrics的记录以StatsD协议通过UDP发送出去，作为Metrics的callback使用。
+
+    计数器发送为"<prefix>.<name>:<value>|c"，计时器发送为毫秒"|ms"。
+    tags为True时标签以DogStatsD格式（"|#key:value"）附加，否则丢弃标签。
+    发送失败会被忽略，不影响导入流程。
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 8125, prefix: str = 'pubmedkit', tags: bool = True):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.tags = tags
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, kind: str, name: str, value, labels: dict):
+        if kind == 'timer':
+            line = f'{self.prefix}.{name}:{value * 1000:.3f}|ms'
+        else:
+            line = f'{self.prefix}.{name}:{value}|c'
+        if self.tags and labels:
+            line += '|#' + ','.join(f'{key}:{value}' for key, value in labels.items())
+        try:
+            self._socket.sendto(line.encode(), self.address)
+        except OSError:
+            pass
+
+    def close(self):
+        self._socket.close()
+
+
+def start_prometheus_server(metrics: Metrics, port: int = 9108, addr: str = ''):
+    """
+    在后台线程中启动HTTP服务，在/metrics上以Prometheus文本格式提供metrics的数据。
+
+    返回:
+    ThreadingHTTPServer: 调用其shutdown()停止服务。
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,75 @@
+import sys
+
+__all__ = ['PubmedRecord', 'RECORD_FIELDS']
+
+RECORD_FIELDS = ('pmid', 'title', 'abstract', 'journal', 'pubdate', 'publication_types', 'authors', 'doi', 'version')
+
+
+class PubmedRecord:
+    """
+    紧凑的文章记录，用__slots__代替每条记录一个九键字典。
+
+    journal、version和pubdate在大量记录中重复出现，构造时会被intern，所有记录共享同一个字符串对象。
+    pickle时只序列化字段值组成的元组，跨进程传输更小更快。
+    支持record['pmid']、record.get(...)、in、keys()和dict(record)，
+    可以直接交给insert_pubmed_data、bulk_insert_pubmed_data等接受记录字典的函数；
+    需要真正的字典时调用to_dict()。
+    按字段投影得到的记录中缺少的字段为None，in、keys()和get()把值为None的字段视为不存在，
+    与投影后的字典一致；record[field]对这些字段返回None。
+    记录可以比较和哈希（按全部字段的值），可以放入集合或作为字典的键。
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, pmid, title, abstract, journal, pubdate, publication_types, authors, doi, version):
+        self.pmid = pmid
+        self.title = title
+        self.abstract = abstract
+        self.journal = sys.intern(journal) if journal else journal
+        self.pubdate = sys.intern(pubdate) if pubdate else pubdate
+        self.publication_types = publication_types
+        self.authors = authors
+        self.doi = doi
+        self.version = sys.intern(version) if version else version
+
+    @classmethod
+    def from_dict(cls, entry: dict):
+        # 按字段投影得到的记录中缺少的字段为None
+        return cls(*[entry.get(field) for field in RECORD_FIELDS])
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, field) for field in RECORD_FIELDS)
+
+    def keys(self):
+        return tuple(field for field in RECORD_FIELDS if getattr(self, field) is not None)
+
+    def __getitem__(self, key):
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in RECORD_FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in RECORD_FIELDS and getattr(self, key) is not None
+
+    def __reduce__(self):
+        return (PubmedRecord, self.to_tuple())
+
+    def __eq__(self, other):
+        if isinstance(other, PubmedRecord):
+            return self.to_tuple() == other.to_tuple()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.to_tuple())
+
+    def __repr__(self):
+        return f"PubmedRecord(pmid={self.pmid!r}, title={self.title!r}, version={self.version!r})"
@@ -0,0 +1,142 @@
+import heapq
+import math
+from collections import Counter, OrderedDict
+from .journal import get_journal_table
+
+__all__ = ['RelevanceScorer', 'rank_records']
+
+
+class RelevanceScorer:
+    """
+    按关键词词频为记录打分，用于在关键词过滤之后对结果排序。
+
+    关键词的匹配语义与KeywordMatcher相同：title、abstract小写后按空白切分，包含关键词的词计为一次出现。
+    每条记录的分词结果（各字段的词频Counter）按(pmid, version)缓存在大小为cache_size的LRU中，
+    修改关键词或权重后重新打分不需要重新分词。
+
+    每个关键词在每个字段中的得分为 权重 × 字段权重 × log(1 + 出现次数)，相加得到相关性；
+    if_weight大于0时再加上 if_weight × log(1 + 影响因子)，找不到影响因子的期刊按0计算。
+
+    用法:
+    scorer = RelevanceScorer({'promoter': 1.0, 'cis-regulatory': 2.0}, if_weight=0.5)
+    for score, record in scorer.top_k(iter_baseline(xmlfile, keywords=keywords), 100):
+        print(score, record['title'])
+    """
+
+    def __init__(self, keywords, *args, **kwargs):
+        """
+        参数:
+        keywords: 关键词列表（权重均为1），或{关键词: 权重}字典。
+        **kwargs: 支持field_weights（默认{'title': 2.0, 'abstract': 1.0}）、if_weight（默认0）、
+                  journal_table（默认get_journal_table()）和cache_size（缓存分词结果的记录数，默认100000）。
+        """
+        self.field_weights = dict(kwargs.get('field_weights', {'title': 2.0, 'abstract': 1.0}))
+        self.if_weight = kwargs.get('if_weight', 0)
+        self.journal_table = kwargs.get('journal_table', None)
+        self.cache_size = kwargs.get('cache_size', 100000)
+        self._cache = OrderedDict()
+        self.set_keywords(keywords)
+
+    def set_keywords(self, keywords):
+        """
+        更换关键词或权重，已缓存的分词结果继续使用。
+        """
+        if not isinstance(keywords, dict):
+            keywords = {keyword: 1.0 for keyword in keywords}
+        # 包含空白的关键词永远不会命中，与KeywordMatcher一致
+        self.keywords = {keyword.lower(): weight for keyword, weight in keywords.items()
+                         if keyword.split() == [keyword] or keyword == ''}
+
+    def tokens(self, record) -> dict:
+        """
+        返回记录各字段的词频{field: Counter}，命中缓存时不重新分词。
+        """
+        key = (record['pmid'], record.get('version'))
+        tokens = self._cache.get(key)
+        if tokens is not None:
+            self._cache.move_to_end(key)
+            return tokens
+        tokens = {field: Counter((record.get(field) or '').lower().split()) for field in self.field_weights}
+        self._cache[key] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def term_frequencies(self, record) -> dict:
+        """
+        返回每个关键词在各字段中的出现次数{keyword: {field: 次数}}。
+        """
+        tokens = self.tokens(record)
+        frequencies = {keyword: {} for keyword in self.keywords}
+        for field, counts in tokens.items():
+            for keyword in self.keywords:
+                frequencies[keyword][field] = sum(count for word, count in counts.items() if keyword in word)
+        return frequencies
+
+    def relevance(self, record) -> float:
+        score = 0.0
+        for keyword, fields in self.term_frequencies(record).items():
+            weight = self.keywords[keyword]
+            for field, frequency in fields.items():
+                if frequency:
+                    score += weight * self.field_weights[field] * math.log1p(frequency)
+        return score
+
+    def score(self, record) -> float:
+        """
+        返回记录的得分：相关性加上影响因子项。
+        """
+        score = self.relevance(record)
+        if self.if_weight > 0:
+            if self.journal_table is None:
+                self.journal_table = get_journal_table()
+            impact_factor = self.journal_table.impact_factor(record['journal']) or 0.0
+            score += self.if_weight * math.log1p(impact_factor)
+        return score
+
+    def iter_scored(self, records):
+        """
+        逐条产出(score, record)。
+        """
+        for record in records:
+            yield self.score(record), record
+
+    def top_k(self, records, k: int) -> list:
+        """
+        流式选出得分最高的k条记录，堆中最多保留k条，内存占用与记录总数无关。
+
+        返回:
+        list: 按得分从高到低排列的(score, record)列表，得分相同时先出现的记录在前；k不大于0时为空列表。
+        """
+        if k <= 0:
+            return []
+        heap = []
+        for seq, (score, record) in enumerate(self.iter_scored(records)):
+            # 得分相同时序号小的更优，堆顶是当前最差的记录
+            item = (score, -seq, record)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+        return [(score, record) for score, _, record in sorted(heap, key=lambda item: item[:2], reverse=True)]
+
+
+def rank_records(records, keywords, k: int = None, *args, **kwargs) -> list:
+    """
+    按RelevanceScorer的得分对记录排序。
+
+    参数:
+    records: 记录的可迭代对象，例如iter_baseline或load_baseline的结果。
+    keywords: 关键词列表或{关键词: 权重}字典。
+    k (int): 只返回得分最高的k条；为None时返回全部记录。
+    **kwargs: 传给RelevanceScorer（field_weights、if_weight、journal_table、cache_size）。
+
+    返回:
+    list: 按得分从高到低排列的(score, record)列表。
+    """
+    scorer = RelevanceScorer(keywords, **kwargs)
+    if k is not None:
+        return scorer.top_k(records, k)
+    scored = list(scorer.iter_scored(records))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from .db_utils import bulk_insert_pubmed_data, upsert_pubmed_data
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['DatabaseSink']
+
+_STOP = object()
+
+
+class DatabaseSink:
+    """
+    把记录批次异步写入pubmed_table的写入端。
+
+    put只把批次放入有界队列，由后台写入线程取出写入，数据来源（load_baseline、load_pubmed_file、
+    iter_baseline_corpus等）在解析下一批时上一批正在写入，解析和写入重叠进行；
+    队列满时put阻塞，内存占用有上限。
+    服务器数据库（PostgreSQL、MySQL等）使用workers个写入线程，各自从引擎的连接池取连接并发写入，
+    连接池大小应不小于workers（见create_db_engine）；SQLite同一时间只允许一个写事务，
+    固定使用一个写入线程，并把队列中积压的小批次合并到batch_size条后一次写入。
+    写入线程出错后，之后的put和close会抛出RuntimeError；with块中已经抛出异常时，退出时不再抛出写入线程的错误。
+
+    用法:
+    engine = create_db_engine(db_url, pool_size=8)
+    with DatabaseSink(engine, workers=8) as sink:
+        load_baseline(xmlfile, keywords=keywords, sink=sink)
+    print(sink.written)
+    """
+
+    def __init__(self, engine, workers: int = 4, *args, **kwargs):
+        """
+        参数:
+        engine: SQLAlchemy引擎，pubmed_table需要已经创建。
+        workers (int): 写入线程数，SQLite固定为1。
+        **kwargs: 支持operation（'insert'使用bulk_insert_pubmed_data，'upsert'使用upsert_pubmed_data，默认'insert'）、
+                  batch_size（SQLite合并批次和每次写入的记录数，默认10000）、
+                  queue_size（队列中最多缓存的批次数，默认workers * 2）和metrics。
+        """
+        operation = kwargs.get('operation', 'insert')
+        if operation not in ['insert', 'upsert']:
+            raise ValueError('operation must be "insert" or "upsert"')
+        self.engine = engine
+        self.operation = operation
+        self.batch_size = kwargs.get('batch_size', 10000)
+        self.metrics = kwargs.get('metrics', None)
+        self.workers = 1 if engine.dialect.name == 'sqlite' else max(workers, 1)
+        self.written = 0
+        self._queue = queue.Queue(maxsize=kwargs.get('queue_size', self.workers * 2))
+        self._lock = threading.Lock()
+        self._error = None
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f'pubmedkit-db-writer-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # with块中已经有异常时仍然停止写入线程，写入线程的错误只记录日志，不掩盖原来的异常
+        try:
+            self.close()
+        except RuntimeError as e:
+            logger.error(f"{e}: {e.__cause__}")
+
+    def __call__(self, records):
+        # 可以直接作为load_baseline_corpus的sink
+        self.put(records)
+
+    def put(self, records):
+        """
+        把一批记录（列表）放入写入队列，队列满时阻塞。
+        """
+        if self._closed:
+            raise RuntimeError('DatabaseSink is closed')
+        self._check()
+        records = list(records)
+        if not records:
+            return
+        while True:
+            try:
+                self._queue.put(records, timeout=0.1)
+                return
+            except queue.Full:
+                # 写入线程全部出错退出时不再等待
+                self._check()
+
+    def consume(self, records, batch_size: int = None) -> int:
+        """
+        从记录的可迭代对象（例如iter_baseline）中按batch_size分批放入写入队列，返回放入的记录数。
+        """
+        batch_size = batch_size or self.batch_size
+        count = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.put(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.put(batch)
+            count += len(batch)
+        return count
+
+    def close(self) -> int:
+        """
+        等待队列中的批次全部写入后停止写入线程，返回写入的记录数。
+        """
+        if not self._closed:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+        self._check()
+        return self.written
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError('DatabaseSink writer failed') from self._error
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                return
+            stop = False
+            if self.workers == 1:
+                # 单个写入线程时把积压的小批次合并后一次写入
+                while len(batch) < self.batch_size:
+                    try:
+                        more = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is _STOP:
+                        stop = True
+                        break
+                    batch.extend(more)
+            if self._error is None:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    logger.error(f"Error writing {len(batch)} records: {e}")
+                    self._error = e
+            if stop:
+                return
+
+    def _write(self, batch: list):
+        if self.operation == 'upsert':
+            written = upsert_pubmed_data(self.engine, batch, chunk_size=self.batch_size, metrics=self.metrics)
+        else:
+            written = bulk_insert_pubmed_data(self.engine, batch, chunk_size=self.batch_size, metrics=self.metrics)
+        with self._lock:
+            self.written += written
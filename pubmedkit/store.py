@@ -0,0 +1,326 @@
+import json
+import mmap
+import os
+import pickle
+import zlib
+from collections import OrderedDict
+from os.path import exists, join
+import numpy as np
+from .baseline import iter_baseline, article_filter
+from .record import PubmedRecord, RECORD_FIELDS
+
+# 可选的zstd压缩，没有安装zstandard时使用zlib
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__all__ = ['RecordStore', 'build_record_store']
+
+STORE_FORMAT_VERSION = 1
+
+# 只影响文件读取方式的iter_baseline参数，过滤参数由add_baseline自己判断
+_PARSE_OPTIONS = ('cache', 'read_ahead', 'block_size', 'mmap', 'log')
+
+_LOCATION_DTYPE = np.dtype([('block', '<i4'), ('item', '<i4')])
+_BLOCK_DTYPE = np.dtype([('segment', '<i4'), ('offset', '<i8'), ('length', '<i8')])
+
+
+def _compressor(codec: str, level: int):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError('zstandard is required for codec="zstd", install it with "pip install zstandard"')
+        return zstandard.ZstdCompressor(level=level).compress
+    if codec == 'zlib':
+        return lambda data: zlib.compress(data, level)
+    raise ValueError('codec must be "zstd" or "zlib"')
+
+
+def _decompressor(codec: str):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError('zstandard is required to read this store, install it with "pip install zstandard"')
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+class RecordStore:
+    """
+    按PMID随机读取文章记录的只追加存储。
+
+    记录按block_records条一块，以元组列表pickle后压缩（zstd或zlib），追加写入段文件（segment-*.dat），
+    每次append写一个新的段文件，已写入的数据不再修改。
+    排好序的PMID数组和每条记录所在的块、块内位置保存为.npy文件（每次更新写入新一代的文件，由meta.json指向），
+    打开时以内存映射方式加载，打开时间与语料大小无关；get用二分查找定位记录，只解压所在的块，最近读取的块缓存在内存中。
+    同一PMID再次写入时以最新的版本为准，DeleteCitation删除记录（旧版本的数据仍留在段文件中）。
+
+    用法:
+    store = build_record_store('pubmed_store', files, keywords=keywords)
+    record = store.get(31452104)
+    records = store.get_many([31452104, 31452105])
+    """
+
+    def __init__(self, path: str, *args, **kwargs):
+        """
+        打开存储目录，目录不存在时创建新的存储。
+
+        参数:
+        path (str): 存储目录。
+        **kwargs: 支持codec（新建存储时的压缩方式，默认安装了zstandard时为'zstd'，否则为'zlib'）、
+                  level（压缩级别，默认zstd为3、zlib为6）、block_records（每块的记录数，默认32）
+                  和cache_blocks（缓存的解压后的块数，默认256）。
+        """
+        self.path = path
+        self.cache_blocks = kwargs.get('cache_blocks', 256)
+        self._segments = {}
+        self._cache = OrderedDict()
+
+        if exists(join(path, 'meta.json')):
+            with open(join(path, 'meta.json')) as f:
+                self.meta = json.load(f)
+            if self.meta['format'] != STORE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported store format {self.meta['format']}")
+        else:
+            codec = kwargs.get('codec', 'zstd' if zstandard is not None else 'zlib')
+            self.meta = {
+                'format': STORE_FORMAT_VERSION,
+                'codec': codec,
+                'level': kwargs.get('level', 3 if codec == 'zstd' else 6),
+                'block_records': kwargs.get('block_records', 32),
+                'segments': 0,
+                'files': [],
+            }
+            _compressor(codec, self.meta['level'])
+            os.makedirs(path, exist_ok=True)
+            self._write_index(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=_LOCATION_DTYPE),
+                              np.zeros(0, dtype=_BLOCK_DTYPE))
+        self._decompress = _decompressor(self.meta['codec'])
+        self._load_index()
+
+    def __len__(self):
+        return len(self._pmids)
+
+    def __contains__(self, pmid):
+        return self._find(int(pmid)) >= 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def pmids(self) -> np.ndarray:
+        """
+        返回所有PMID（升序，内存映射的只读数组）。
+        """
+        return self._pmids
+
+    def get(self, pmid, default=None):
+        """
+        返回PMID对应的PubmedRecord，不存在时返回default。
+        """
+        i = self._find(int(pmid))
+        if i < 0:
+            return default
+        block, item = self._locations[i]
+        return PubmedRecord(*self._read_block(int(block))[item])
+
+    def get_many(self, pmids) -> list:
+        """
+        按给定顺序返回多个PMID对应的PubmedRecord，不存在的为None。
+        查找是向量化的，同一块中的记录只解压一次。
+        """
+        pmids = np.asarray(pmids, dtype=np.int64).ravel()
+        if len(pmids) == 0 or len(self._pmids) == 0:
+            return [None] * len(pmids)
+        positions = np.searchsorted(self._pmids, pmids)
+        positions[positions >= len(self._pmids)] = 0
+        found = self._pmids[positions] == pmids
+
+        records = [None] * len(pmids)
+        locations = self._locations[positions[found]]
+        indices = np.flatnonzero(found)
+        # 按块排序，依次解压每个块
+        for j in np.argsort(locations['block'], kind='stable'):
+            block, item = locations[j]
+            records[indices[j]] = PubmedRecord(*self._read_block(int(block))[item])
+        return records
+
+    def __iter__(self):
+        # 按段文件中的写入顺序逐块读取，只产出仍然有效的记录
+        order = np.lexsort((self._locations['item'], self._locations['block']))
+        for i in order:
+            block, item = self._locations[i]
+            yield PubmedRecord(*self._read_block(int(block))[item])
+
+    def append(self, records, *args, **kwargs) -> int:
+        """
+        把记录写入一个新的段文件并更新索引，返回写入（包括删除）的记录数。
+
+        参数:
+        records: 记录的可迭代对象（字典或PubmedRecord），{'pmid': pmid, 'delete': True}表示删除该PMID。
+                 同一次append中同一PMID出现多次时以最后一次为准。
+        **kwargs: 支持source（记录来源的文件名，写入meta.json的files）。
+        """
+        block_records = self.meta['block_records']
+        compress = _compressor(self.meta['codec'], self.meta['level'])
+        segment = self.meta['segments']
+        blocks = list(self._blocks)
+        pmids = []
+        locations = []
+        count = 0
+
+        tmp_file = join(self.path, f'segment-{segment:06d}.dat.tmp')
+        with open(tmp_file, 'wb') as f:
+            chunk = []
+
+            def write_chunk():
+                data = compress(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL))
+                blocks.append((segment, f.tell(), len(data)))
+                f.write(data)
+
+            for record in records:
+                count += 1
+                pmid = int(record['pmid'])
+                if record.get('delete', False):
+                    pmids.append(pmid)
+                    locations.append((-1, -1))
+                    continue
+                pmids.append(pmid)
+                locations.append((len(blocks), len(chunk)))
+                chunk.append(tuple(record.get(field) for field in RECORD_FIELDS))
+                if len(chunk) >= block_records:
+                    write_chunk()
+                    chunk = []
+            if chunk:
+                write_chunk()
+        if count == 0:
+            os.remove(tmp_file)
+            return 0
+        os.replace(tmp_file, join(self.path, f'segment-{segment:06d}.dat'))
+
+        # 新旧索引合并，同一PMID保留最后写入的位置，删除的PMID从索引中去掉
+        all_pmids = np.concatenate([self._pmids, np.asarray(pmids, dtype=np.int64)])
+        all_locations = np.concatenate([self._locations, np.asarray(locations, dtype=_LOCATION_DTYPE)])
+        order = np.argsort(all_pmids, kind='stable')
+        all_pmids = all_pmids[order]
+        all_locations = all_locations[order]
+        latest = np.ones(len(all_pmids), dtype=bool)
+        latest[:-1] = all_pmids[1:] != all_pmids[:-1]
+        latest &= all_locations['block'] >= 0
+
+        self.meta['segments'] = segment + 1
+        source = kwargs.get('source', None)
+        if source is not None:
+            self.meta['files'].append(source)
+        self._write_index(all_pmids[latest], all_locations[latest], np.asarray(blocks, dtype=_BLOCK_DTYPE))
+        self._load_index()
+        return count
+
+    def add_baseline(self, xmlfile: str, *args, **kwargs) -> int:
+        """
+        解析基线文件或更新文件并写入存储，更新文件中的DeleteCitation会删除对应的PMID。
+
+        keywords、kw_filter、impact_factor和journal_table在按PMID去重之后判断：
+        文章的新版本被过滤掉时作为删除写入，存储中不会留下该PMID的旧版本。
+        cache、read_ahead、block_size和mmap传给iter_baseline。
+        """
+        accept = article_filter(**kwargs)
+        parse_options = {key: kwargs[key] for key in _PARSE_OPTIONS if key in kwargs}
+
+        def entries():
+            for entry in iter_baseline(xmlfile, include_deleted=True, **parse_options):
+                if entry.get('delete', False) or accept is None or accept(entry):
+                    yield entry
+                else:
+                    yield {'pmid': entry['pmid'], 'delete': True}
+
+        return self.append(entries(), source=os.path.basename(xmlfile))
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+        self._segments = {}
+        self._cache.clear()
+
+    def _find(self, pmid: int) -> int:
+        i = int(np.searchsorted(self._pmids, pmid))
+        if i < len(self._pmids) and self._pmids[i] == pmid:
+            return i
+        return -1
+
+    def _read_block(self, block: int) -> list:
+        cached = self._cache.get(block)
+        if cached is not None:
+            self._cache.move_to_end(block)
+            return cached
+
+        segment, offset, length = self._blocks[block]
+        segment = int(segment)
+        data = self._segments.get(segment)
+        if data is None:
+            with open(join(self.path, f'segment-{segment:06d}.dat'), 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._segments[segment] = data
+        values = pickle.loads(self._decompress(data[offset:offset + length]))
+
+        self._cache[block] = values
+        if len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return values
+
+    def _write_index(self, pmids, locations, blocks):
+        # 每次写入新一代的索引文件（pmids-000002.npy等），meta.json记录当前的代数，
+        # 替换meta.json是唯一的提交点：中途失败时meta.json仍指向上一代完整的索引
+        previous = self.meta.get('index')
+        generation = (previous or 0) + 1
+        for name, array in [('pmids', pmids), ('locations', locations), ('blocks', blocks)]:
+            with open(join(self.path, _index_file(name, generation)), 'wb') as f:
+                np.save(f, array)
+                f.flush()
+                os.fsync(f.fileno())
+        meta = dict(self.meta, index=generation)
+        with open(join(self.path, 'meta.json.tmp'), 'w') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(join(self.path, 'meta.json.tmp'), join(self.path, 'meta.json'))
+        self.meta = meta
+
+        # 已打开的旧索引仍然映射着旧文件，在Linux上删除后映射继续有效
+        for name in ['pmids', 'locations', 'blocks']:
+            old_file = join(self.path, _index_file(name, previous))
+            if exists(old_file):
+                os.remove(old_file)
+
+    def _load_index(self):
+        self._cache.clear()
+        generation = self.meta.get('index')
+        self._pmids = np.load(join(self.path, _index_file('pmids', generation)), mmap_mode='r')
+        self._locations = np.load(join(self.path, _index_file('locations', generation)), mmap_mode='r')
+        self._blocks = np.load(join(self.path, _index_file('blocks', generation)), mmap_mode='r')
+
+
+def _index_file(name: str, generation) -> str:
+    # generation为None时是没有代数的旧格式文件名
+    if generation is None:
+        return f'{name}.npy'
+    return f'{name}-{generation:06d}.npy'
+
+
+def build_record_store(path: str, files: list, *args, **kwargs) -> RecordStore:
+    """
+    解析一组基线文件和更新文件，按发布顺序写入记录存储，返回RecordStore。
+
+    参数:
+    path (str): 存储目录，已存在时在原有存储上追加。
+    files (list): XML文件路径列表，按file_sequence排序后依次写入，更新文件中较新的版本覆盖旧版本。
+    **kwargs: codec、level、block_records和cache_blocks传给RecordStore，其余参数传给add_baseline。
+    """
+    from .merge import file_sequence
+
+    options = {key: kwargs.pop(key) for key in ['codec', 'level', 'block_records', 'cache_blocks'] if key in kwargs}
+    store = RecordStore(path, **options)
+    for xmlfile in sorted(files, key=file_sequence):
+        store.add_baseline(xmlfile, **kwargs)
+    return store
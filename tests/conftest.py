@@ -0,0 +1,63 @@
+import gzip
+from xml.sax.saxutils import escape
+import pytest
+
+
+def article_xml(pmid, title='', abstract='', journal='Nature', year='2020', authors=(), publication_types=(),
+                doi=None):
+    abstract_xml = f'<Abstract><AbstractText>{escape(abstract)}</AbstractText></Abstract>' if abstract else ''
+    authors_xml = ''.join(f'<Author ValidYN="Y"><LastName>{escape(last)}</LastName><ForeName>{escape(fore)}</ForeName>'
+                          f'<Initials>{escape(fore[:1])}</Initials></Author>' for last, fore in authors)
+    types_xml = ''.join(f'<PublicationType UI="{ui}">{escape(name)}</PublicationType>' for ui, name in publication_types)
+    doi_xml = f'<ELocationID EIdType="doi" ValidYN="Y">{escape(doi)}</ELocationID>' if doi else ''
+    return (f'<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM"><PMID Version="1">{pmid}</PMID>'
+            f'<Article PubModel="Print"><Journal><JournalIssue CitedMedium="Internet"><PubDate><Year>{year}</Year>'
+            f'</PubDate></JournalIssue><Title>{escape(journal)}</Title></Journal>'
+            f'<ArticleTitle>{escape(title)}</ArticleTitle>{doi_xml}{abstract_xml}'
+            f'<AuthorList CompleteYN="Y">{authors_xml}</AuthorList>'
+            f'<PublicationTypeList>{types_xml}</PublicationTypeList></Article>'
+            f'<MedlineJournalInfo><MedlineTA>{escape(journal)}</MedlineTA></MedlineJournalInfo>'
+            f'</MedlineCitation><PubmedData><ArticleIdList><ArticleId IdType="pubmed">{pmid}</ArticleId>'
+            f'</ArticleIdList></PubmedData></PubmedArticle>')
+
+
+def write_baseline(path, articles, deleted=()):
+    """
+    写出一个gzip压缩的基线/更新文件，articles为article_xml的参数字典列表，deleted为DeleteCitation中的PMID。
+    """
+    delete_xml = ''
+    if deleted:
+        delete_xml = '<DeleteCitation>' + ''.join(f'<PMID Version="1">{pmid}</PMID>' for pmid in deleted) + \
+            '</DeleteCitation>'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<PubmedArticleSet>\n')
+        for article in articles:
+            f.write(article_xml(**article) + '\n')
+        f.write(delete_xml + '</PubmedArticleSet>\n')
+    return str(path)
+
+
+@pytest.fixture
+def baseline_file(tmp_path):
+    def write(name, articles, deleted=()):
+        return write_baseline(tmp_path / name, articles, deleted)
+    return write
+
+
+@pytest.fixture
+def corpus_files(baseline_file):
+    """
+    一个基线文件和两个更新文件：PMID 1、2被修订，3被删除，5在同一文件中出现两次。
+    """
+    return [
+        baseline_file('pubmed24n0003.xml.gz', [{'pmid': 1, 'title': 'one v3'}, {'pmid': 5, 'title': 'five a'},
+                                               {'pmid': 5, 'title': 'five b'}]),
+        baseline_file('pubmed24n0001.xml.gz', [{'pmid': pmid, 'title': title} for pmid, title in
+                                               [(1, 'one'), (2, 'two promoter'), (3, 'three'), (4, 'four promoter')]]),
+        baseline_file('pubmed24n0002.xml.gz', [{'pmid': 2, 'title': 'two'}], deleted=[3]),
+    ]
+
+
+# corpus_files合并后每个PMID的最新版本
+MERGED_TITLES = {1: ('one v3', 'pubmed24n0003'), 2: ('two', 'pubmed24n0002'), 4: ('four promoter', 'pubmed24n0001'),
+                 5: ('five b', 'pubmed24n0003')}
@@ -0,0 +1,55 @@
+import pubmed_parser as pp
+import pytest
+from pubmedkit.baseline import iter_baseline, load_baseline
+from pubmedkit.record import PubmedRecord
+
+ARTICLES = [
+    {'pmid': 101, 'title': 'Promoter architecture in Arabidopsis', 'abstract': 'We map cis-regulatory elements.',
+     'journal': 'Nature', 'year': '2019', 'authors': [('Doe', 'John'), ('Roe', 'Jane')],
+     'publication_types': [('D016428', 'Journal Article'), ('D016454', 'Review')], 'doi': '10.1000/abc'},
+    {'pmid': 102, 'title': 'Leaf development', 'abstract': '', 'journal': 'Plant Cell', 'year': '2021',
+     'authors': [('Smith', 'Ann')], 'publication_types': [('D016428', 'Journal Article')]},
+    {'pmid': 103, 'title': 'Enhancer & silencer <review>', 'abstract': 'Enhancers regulate genes.',
+     'journal': 'Cell'},
+]
+FIELDS = ('title', 'abstract', 'journal', 'pubdate', 'publication_types', 'authors', 'doi')
+
+
+@pytest.fixture
+def xmlfile(baseline_file):
+    return baseline_file('pubmed24n0001.xml.gz', ARTICLES, deleted=[999])
+
+
+def test_iter_baseline_matches_pubmed_parser(xmlfile):
+    expected = [dict({field: entry[field] for field in FIELDS}, pmid=int(entry['pmid']), version='pubmed24n0001')
+                for entry in pp.parse_medline_xml(xmlfile)]
+    assert list(iter_baseline(xmlfile)) == expected
+
+
+def test_iter_baseline_compact_records_match_dicts(xmlfile):
+    records = list(iter_baseline(xmlfile, compact=True))
+    assert all(isinstance(record, PubmedRecord) for record in records)
+    assert [record.to_dict() for record in records] == list(iter_baseline(xmlfile))
+
+
+def test_iter_baseline_field_projection_and_deleted(xmlfile):
+    records = list(iter_baseline(xmlfile, fields=['title'], include_deleted=True))
+    assert records[:3] == [{'pmid': article['pmid'], 'title': article['title'], 'version': 'pubmed24n0001'}
+                           for article in ARTICLES]
+    assert records[3] == {'pmid': 999, 'version': 'pubmed24n0001', 'delete': True}
+
+
+@pytest.mark.parametrize('kw_filter, pmids', [('abstract', [101]), ('title', [102]), ('both', [101, 102])])
+def test_iter_baseline_keyword_filter(xmlfile, kw_filter, pmids):
+    records = iter_baseline(xmlfile, keywords=['cis-regulatory', 'leaf'], kw_filter=kw_filter)
+    assert [record['pmid'] for record in records] == pmids
+
+
+def test_load_baseline_output_types(xmlfile):
+    records = load_baseline(xmlfile)
+    assert [record['pmid'] for record in records] == [101, 102, 103]
+    assert sorted(load_baseline(xmlfile, output_type='dict')) == [101, 102, 103]
+    df = load_baseline(xmlfile, output_type='pd')
+    assert df['pmid'].tolist() == [101, 102, 103]
+    with pytest.raises(ValueError):
+        load_baseline(xmlfile, output_type='csv')
@@ -0,0 +1,65 @@
+import os
+import pytest
+from pubmedkit import cache as cache_module
+from pubmedkit.baseline import iter_baseline
+from pubmedkit.cache import ParseCache
+
+ARTICLES = [{'pmid': 1, 'title': 'Promoter', 'abstract': 'cis element'},
+            {'pmid': 2, 'title': 'Leaf', 'abstract': 'enhancer'},
+            {'pmid': 3, 'title': 'Root', 'abstract': 'promoter activity'}]
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    calls = []
+    original = cache_module.iter_medline_articles
+
+    def counting(xmlfile, **kwargs):
+        calls.append(xmlfile)
+        return original(xmlfile, **kwargs)
+    monkeypatch.setattr(cache_module, 'iter_medline_articles', counting)
+    return calls
+
+
+def test_cache_hit_matches_direct_parse(tmp_path, baseline_file, parse_counter):
+    xmlfile = baseline_file('pubmed24n0001.xml.gz', ARTICLES, deleted=[9])
+    cache = ParseCache(tmp_path / 'cache', chunk_size=2)
+    for options in [{}, {'keywords': ['promoter']}, {'include_deleted': True}, {'fields': ['title']}]:
+        assert list(iter_baseline(xmlfile, cache=cache, **options)) == list(iter_baseline(xmlfile, **options))
+    # 只有第一次解析XML，之后都从缓存读取
+    assert parse_counter == [xmlfile]
+    assert cache.size() > 0
+
+
+@pytest.mark.parametrize('checksum', ['stat', 'md5'])
+def test_cache_invalidated_when_file_changes(tmp_path, baseline_file, parse_counter, checksum):
+    xmlfile = baseline_file('pubmed24n0001.xml.gz', ARTICLES)
+    cache = ParseCache(tmp_path / 'cache', checksum=checksum)
+    assert len(list(iter_baseline(xmlfile, cache=cache))) == 3
+    baseline_file('pubmed24n0001.xml.gz', ARTICLES[:1])
+    os.utime(xmlfile, ns=(0, 10 ** 9))
+    assert [record['pmid'] for record in iter_baseline(xmlfile, cache=cache)] == [1]
+    assert len(parse_counter) == 2
+
+
+def test_partial_read_leaves_no_cache_file(tmp_path, baseline_file):
+    xmlfile = baseline_file('pubmed24n0001.xml.gz', ARTICLES)
+    cache = ParseCache(tmp_path / 'cache')
+    records = iter_baseline(xmlfile, cache=cache)
+    next(records)
+    records.close()
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_evict_removes_least_recently_used(tmp_path, baseline_file):
+    files = [baseline_file(f'pubmed24n000{i}.xml.gz', ARTICLES) for i in range(1, 4)]
+    cache = ParseCache(tmp_path / 'cache')
+    for i, xmlfile in enumerate(files):
+        list(iter_baseline(xmlfile, cache=cache))
+        os.utime(cache.path(xmlfile), (i, i))
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert not os.path.exists(cache.path(files[0]))
+    assert all(os.path.exists(cache.path(xmlfile)) for xmlfile in files[1:])
+    cache.clear()
+    assert cache.size() == 0
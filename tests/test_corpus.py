@@ -0,0 +1,30 @@
+import gzip
+import pytest
+from pubmedkit.corpus import format_error, load_baseline_corpus
+
+
+def test_format_error_returns_one_line():
+    try:
+        try:
+            raise ValueError('first line\nsecond line')
+        except ValueError as e:
+            raise RuntimeError('outer\n  detail') from e
+    except RuntimeError as e:
+        message = format_error(e)
+    assert message == 'RuntimeError: outer detail: ValueError: first line second line'
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_corpus_reports_malformed_file(baseline_file, tmp_path, workers):
+    good = baseline_file('pubmed24n0001.xml.gz', [{'pmid': 1, 'title': 'a'}, {'pmid': 2, 'title': 'b'}])
+    bad = str(tmp_path / 'pubmed24n0002.xml.gz')
+    with gzip.open(bad, 'wt') as f:
+        f.write('<?xml version="1.0"?>\n<PubmedArticleSet><PubmedArticle>\n<MedlineCitation>\n</PubmedArticleSet')
+
+    records, report = load_baseline_corpus([good, bad], workers=workers)
+
+    assert sorted(record['pmid'] for record in records) == [1, 2]
+    assert report[good] == {'records': 2, 'error': None}
+    assert report[bad]['records'] == 0
+    assert 'XMLSyntaxError' in report[bad]['error']
+    assert '\n' not in report[bad]['error']
@@ -0,0 +1,76 @@
+from sqlalchemy import event, text
+from pubmedkit.db_utils import (_copy_csv, _latest_rows, bulk_insert_pubmed_data, create_db_engine,
+                                create_pubmed_table, create_pmid_unique_index, upsert_pubmed_data)
+
+
+def test_copy_csv_writes_null_as_unquoted_marker():
+    rows = [{'pmid': 1, 'title': '', 'journal': 'Cell "Press"', 'journal_id': None},
+            {'pmid': 2, 'title': 'a,b', 'journal': None, 'journal_id': 7}]
+    data = _copy_csv(rows, ['pmid', 'title', 'journal', 'journal_id']).encode()
+    assert data == b'1,"","Cell ""Press""",\\N\n2,"a,b",\\N,7\n'
+
+
+def test_copy_csv_quotes_null_marker_text():
+    # 内容恰好是\N的字符串加引号，COPY不会把它当作NULL
+    assert _copy_csv([{'title': '\\N'}], ['title']) == '"\\N"\n'
+
+
+def _record(pmid, version, title):
+    return {'pmid': pmid, 'title': title, 'abstract': '', 'journal': 'Nature', 'pubdate': '2020',
+            'publication_types': '', 'authors': '', 'doi': '', 'version': version, 'journal_id': None}
+
+
+def _pubmed_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pubmed.db'}")
+    create_pubmed_table(engine)
+    create_pmid_unique_index(engine)
+    return engine
+
+
+def _titles(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(text('SELECT pmid, title || "@" || version FROM pubmed_table')).all())
+
+
+def test_latest_rows_keeps_highest_version_per_pmid():
+    rows = [_record(1, 'pubmed24n0002', 'b'), _record(1, 'pubmed24n0003', 'c'), _record(2, 'pubmed24n0001', 'x'),
+            _record(1, 'pubmed24n0001', 'a'), _record(2, 'pubmed24n0001', 'y')]
+    latest = _latest_rows(rows)
+    assert [(row['pmid'], row['title']) for row in latest] == [(1, 'c'), (2, 'x')]
+
+
+def test_upsert_sends_each_pmid_once_per_chunk(tmp_path):
+    engine = _pubmed_engine(tmp_path)
+    executed = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, parameters, context, executemany:
+                 executed.append(len(parameters) if executemany else 1) if 'INSERT' in statement else None)
+    records = [_record(1, 'pubmed24n0002', 'b'), _record(1, 'pubmed24n0003', 'c'),
+               _record(1, 'pubmed24n0001', 'a'), _record(2, 'pubmed24n0001', 'x')]
+    assert upsert_pubmed_data(engine, records) == 4
+    assert sum(executed) == 2
+    assert _titles(engine) == {1: 'c@pubmed24n0003', 2: 'x@pubmed24n0001'}
+
+
+def test_upsert_only_overwrites_with_newer_version(tmp_path):
+    engine = _pubmed_engine(tmp_path)
+    upsert_pubmed_data(engine, [_record(1, 'pubmed24n0002', 'b'), _record(2, 'pubmed24n0002', 'x')])
+    # 较旧和相同的version不覆盖，较新的覆盖
+    upsert_pubmed_data(engine, [_record(1, 'pubmed24n0001', 'a'), _record(2, 'pubmed24n0002', 'y'),
+                                _record(3, 'pubmed24n0001', 'z')])
+    assert _titles(engine) == {1: 'b@pubmed24n0002', 2: 'x@pubmed24n0002', 3: 'z@pubmed24n0001'}
+    upsert_pubmed_data(engine, [_record(2, 'pubmed24n0003', 'w')], chunk_size=1)
+    assert _titles(engine)[2] == 'w@pubmed24n0003'
+
+
+def test_bulk_insert_restores_sqlite_journal_mode(tmp_path):
+    engine = _pubmed_engine(tmp_path)
+    with engine.connect() as conn:
+        before = [conn.exec_driver_sql(f'PRAGMA {name}').scalar() for name in ['journal_mode', 'synchronous']]
+    assert bulk_insert_pubmed_data(engine, [_record(1, 'pubmed24n0001', 'a'), _record(2, 'pubmed24n0001', 'b')]) == 2
+    engine.dispose()
+    with engine.connect() as conn:
+        after = [conn.exec_driver_sql(f'PRAGMA {name}').scalar() for name in ['journal_mode', 'synchronous']]
+    assert after == before == ['delete', 2]
+    assert not (tmp_path / 'pubmed.db-wal').exists()
+    assert _titles(engine) == {1: 'a@pubmed24n0001', 2: 'b@pubmed24n0001'}
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import urllib.parse
+from pubmedkit.eutils import EutilsClient
+
+
+class StubTransport:
+    """
+    代替HTTP请求：esearch返回count和WebEnv，efetch按retstart/retmax返回PMID列表。
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.requests = []
+
+    def __call__(self, url, data):
+        utility = url.rsplit('/', 1)[-1]
+        params = dict(urllib.parse.parse_qsl(data.decode()))
+        self.requests.append((utility, params))
+        if utility == 'esearch.fcgi':
+            return json.dumps({'esearchresult': {'count': str(self.count), 'webenv': 'WEBENV',
+                                                 'querykey': '1', 'idlist': []}}).encode()
+        assert params['rettype'] == 'uilist'
+        assert (params['WebEnv'], params['query_key']) == ('WEBENV', '1')
+        start = int(params['retstart'])
+        end = min(start + int(params['retmax']), self.count)
+        return ''.join(f'{pmid}\n' for pmid in range(start + 1, end + 1)).encode()
+
+
+def _client(transport):
+    client = EutilsClient(rate=1000)
+    client._post = transport
+    return client
+
+
+def test_search_pmids_pages_through_history_server_past_esearch_limit():
+    transport = StubTransport(23456)
+    pmids = asyncio.run(_client(transport).search_pmids('arabidopsis', batch_size=5000))
+
+    assert pmids == [str(pmid) for pmid in range(1, 23457)]
+    esearches = [params for utility, params in transport.requests if utility == 'esearch.fcgi']
+    efetches = [params for utility, params in transport.requests if utility == 'efetch.fcgi']
+    # esearch只调用一次，之后全部通过efetch分页
+    assert len(esearches) == 1 and esearches[0]['usehistory'] == 'y'
+    assert [int(params['retstart']) for params in efetches] == [0, 5000, 10000, 15000, 20000]
+    assert [int(params['retmax']) for params in efetches] == [5000, 5000, 5000, 5000, 3456]
+
+
+def test_search_pmids_respects_retmax():
+    transport = StubTransport(23456)
+    pmids = asyncio.run(_client(transport).search_pmids('arabidopsis', retmax=12000, batch_size=5000))
+
+    assert len(pmids) == 12000
+    efetches = [params for utility, params in transport.requests if utility == 'efetch.fcgi']
+    assert [int(params['retmax']) for params in efetches] == [5000, 5000, 2000]
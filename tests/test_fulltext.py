@@ -0,0 +1,88 @@
+import pytest
+from pubmedkit.db_utils import bulk_insert_pubmed_data, create_db_engine, create_pubmed_table
+from pubmedkit.fulltext import (FULLTEXT_FIELDS, _render_fts5, _render_mysql, _render_tsquery, create_fulltext_index,
+                                fulltext_search, parse_fulltext_query)
+
+
+def test_parse_precedence_fields_and_negation():
+    node = parse_fulltext_query('title:promoter AND (enhancer OR silencer) NOT abstract:review')
+    assert node == ('and', [('term', 'title', ('promoter',), False),
+                            ('or', [('term', None, ('enhancer',), False), ('term', None, ('silencer',), False)]),
+                            ('not', ('term', 'abstract', ('review',), False))])
+    # 相邻的词默认为AND，AND优先于OR
+    assert parse_fulltext_query('a b OR c') == ('or', [('and', [('term', None, ('a',), False),
+                                                                ('term', None, ('b',), False)]),
+                                                       ('term', None, ('c',), False)])
+
+
+def test_parse_phrases_and_prefixes():
+    assert parse_fulltext_query('promot*') == ('term', None, ('promot',), True)
+    assert parse_fulltext_query('"cis regulatory"') == ('term', None, ('cis', 'regulatory'), False)
+    assert parse_fulltext_query('title:"cis regul"*') == ('term', 'title', ('cis', 'regul'), True)
+    assert parse_fulltext_query('cis-regul*') == ('term', None, ('cis', 'regul'), True)
+
+
+@pytest.mark.parametrize('query', ['', '(promoter', 'promoter)', 'author:smith', 'promoter AND', '""'])
+def test_parse_rejects_invalid_queries(query):
+    with pytest.raises(ValueError):
+        parse_fulltext_query(query)
+
+
+def test_render_fts5():
+    node = parse_fulltext_query('title:promoter AND (enhancer OR "cis regul"*) NOT abstract:review')
+    assert _render_fts5(node, FULLTEXT_FIELDS) == \
+        '(({title} : "promoter" AND ("enhancer" OR "cis regul"*)) NOT {abstract} : "review")'
+    assert _render_fts5(parse_fulltext_query('promot*'), ('title', 'abstract')) == '{title abstract} : "promot"*'
+    with pytest.raises(ValueError):
+        _render_fts5(parse_fulltext_query('NOT review'), FULLTEXT_FIELDS)
+
+
+def test_render_tsquery():
+    node = parse_fulltext_query('title:promoter AND (enhancer OR "cis regul"*) NOT abstract:review')
+    assert _render_tsquery(node, FULLTEXT_FIELDS) == \
+        "(('promoter':A) & (('enhancer') | ('cis' <-> 'regul':*)) & !('review':B))"
+    assert _render_tsquery(parse_fulltext_query('promot*'), ('title', 'journal')) == "('promot':*AC)"
+
+
+def test_render_mysql():
+    params, scores = {}, []
+    where = _render_mysql(parse_fulltext_query('title:promot* NOT "cis element"'), FULLTEXT_FIELDS, params, scores)
+    assert where == ('((MATCH(p.title) AGAINST(:q0 IN BOOLEAN MODE) > 0) AND '
+                     'NOT (MATCH(p.title, p.abstract, p.journal) AGAINST(:q1 IN BOOLEAN MODE) > 0))')
+    assert params == {'q0': 'promot*', 'q1': '"cis element"'}
+    # 否定的条件不计入相关度
+    assert scores == ['MATCH(p.title) AGAINST(:q0 IN BOOLEAN MODE)']
+
+    params, scores = {}, []
+    where = _render_mysql(parse_fulltext_query('promoter'), ('title', 'journal'), params, scores)
+    assert where == ('(MATCH(p.title) AGAINST(:q0 IN BOOLEAN MODE) > 0 OR '
+                     'MATCH(p.journal) AGAINST(:q0 IN BOOLEAN MODE) > 0)')
+
+
+@pytest.mark.parametrize('query', ['"cis regul"*', 'cis-regul*'])
+def test_render_mysql_rejects_prefix_phrases(query):
+    with pytest.raises(ValueError):
+        _render_mysql(parse_fulltext_query(query), FULLTEXT_FIELDS, {}, [])
+
+
+def test_sqlite_fulltext_search(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pubmed.db'}")
+    create_pubmed_table(engine)
+    records = [
+        {'pmid': 1, 'title': 'Promoter architecture', 'abstract': 'cis regulatory elements in roots'},
+        {'pmid': 2, 'title': 'Enhancer review', 'abstract': 'A review of enhancers'},
+        {'pmid': 3, 'title': 'Leaf development', 'abstract': 'promoter activity of cis regulation'},
+    ]
+    bulk_insert_pubmed_data(engine, [dict(record, journal='Nature', pubdate='2020', publication_types='',
+                                          authors='', doi='', version='pubmed24n0001', journal_id=None)
+                                     for record in records])
+    create_fulltext_index(engine)
+
+    def pmids(query, **kwargs):
+        return sorted(row.pmid for row in fulltext_search(engine, query, **kwargs))
+
+    assert pmids('promoter') == [1, 3]
+    assert pmids('title:promoter') == [1]
+    assert pmids('"cis regul"*') == [1, 3]
+    assert pmids('enhancer* NOT abstract:review') == []
+    assert pmids('promoter OR enhancer', fields=['title']) == [1, 2]
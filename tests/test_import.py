@@ -0,0 +1,16 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'sqlalchemy', 'pubmed_parser', 'lxml', 'numpy', 'pyarrow')
+
+
+def test_import_pubmedkit_does_not_load_heavy_modules():
+    code = ('import json, sys; import pubmedkit; '
+            f'print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', code], env=env, cwd=ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    assert json.loads(output) == []
@@ -0,0 +1,68 @@
+import random
+import numpy as np
+import pytest
+from pubmedkit.index import InvertedIndex, tokenize
+
+WORDS = ['promoter', 'promotion', 'enhancer', 'silencer', 'root', 'leaf', 'gene', 'cis', 'regulatory']
+JOURNALS = ['Nature', 'Plant Cell', 'Cell']
+
+
+def _records(seed, count):
+    rng = random.Random(seed)
+    return [{'pmid': rng.randint(1, 400), 'title': ' '.join(rng.choices(WORDS, k=3)),
+             'abstract': ' '.join(rng.choices(WORDS, k=8)), 'journal': rng.choice(JOURNALS)} for _ in range(count)]
+
+
+def _brute_force(records, field, predicate):
+    return np.array(sorted({record['pmid'] for record in records
+                            if predicate(tokenize(record[field]))}), dtype=np.int64)
+
+
+@pytest.fixture
+def batches():
+    return [_records(seed, count) for seed, count in enumerate([50, 3, 40, 1, 25, 60, 2, 10])]
+
+
+def test_segments_stay_logarithmic_and_match_brute_force(batches):
+    index = InvertedIndex()
+    seen = []
+    for batch in batches:
+        index.add_records(batch)
+        seen.extend(batch)
+        assert len(index._segments['abstract']) <= 4
+        assert np.array_equal(index.search('abstract:promoter'),
+                              _brute_force(seen, 'abstract', lambda words: 'promoter' in words))
+    assert np.array_equal(index.search('title:promot*'),
+                          _brute_force(seen, 'title', lambda words: any(w.startswith('promot') for w in words)))
+    assert len(index) == len({record['pmid'] for record in seen})
+
+
+def test_compact_and_save_load_preserve_results(tmp_path, batches):
+    index = InvertedIndex()
+    for batch in batches:
+        index.add_records(batch)
+    queries = ['promoter', 'title:leaf AND NOT abstract:root', '(enhancer OR silencer) AND journal:cell',
+               'promot*', '"cis regulatory"', 'NOT gene']
+    expected = {query: index.search(query) for query in queries}
+
+    index.compact()
+    assert all(len(segments) <= 1 for segments in index._segments.values())
+    assert all(np.array_equal(index.search(query), expected[query]) for query in queries)
+
+    index.save(tmp_path / 'index')
+    loaded = InvertedIndex.load(tmp_path / 'index')
+    assert all(np.array_equal(loaded.search(query), expected[query]) for query in queries)
+
+    # 加载后继续添加，与一次性建立的索引一致
+    extra = _records(99, 30)
+    loaded.add_records(extra)
+    fresh = InvertedIndex()
+    for batch in batches + [extra]:
+        fresh.add_records(batch)
+    assert all(np.array_equal(loaded.search(query), fresh.search(query)) for query in queries)
+
+
+def test_unknown_field_raises():
+    index = InvertedIndex(fields=('title',)).add_records([{'pmid': 1, 'title': 'promoter'}])
+    with pytest.raises(ValueError):
+        index.search('abstract:promoter')
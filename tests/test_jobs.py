@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from pubmedkit.db_utils import create_db_engine, create_pubmed_table
+from pubmedkit.jobs import run_ingestion_job
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return {pmid: (title, version) for pmid, title, version in
+                conn.execute(text('SELECT pmid, title, version FROM pubmed_table'))}
+
+
+def test_changed_file_is_reapplied_without_losing_dropped_pmids(tmp_path, baseline_file):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pubmed.db'}")
+    create_pubmed_table(engine)
+    first = baseline_file('pubmed24n0001.xml.gz', [{'pmid': 1, 'title': 'one'}, {'pmid': 2, 'title': 'two'}])
+    second = baseline_file('pubmed24n0002.xml.gz', [{'pmid': 1, 'title': 'one revised'},
+                                                    {'pmid': 3, 'title': 'three'}])
+    results = run_ingestion_job(engine, [first, second], retry_delay=0)
+    assert [result['status'] for result in results] == ['done', 'done']
+
+    # 0002重新发布：PMID 3被修订（版本相同），PMID 1不再出现
+    baseline_file('pubmed24n0002.xml.gz', [{'pmid': 3, 'title': 'three corrected'}])
+    # 0001也被修改，但其中的PMID 1已经被0002的新版本覆盖
+    baseline_file('pubmed24n0001.xml.gz', [{'pmid': 1, 'title': 'one changed'}, {'pmid': 2, 'title': 'two changed'}])
+    results = run_ingestion_job(engine, [first, second], retry_delay=0)
+    assert [(result['status'], result['records']) for result in results] == [('done', 2), ('done', 1)]
+
+    assert _rows(engine) == {
+        1: ('one revised', 'pubmed24n0002'),
+        2: ('two changed', 'pubmed24n0001'),
+        3: ('three corrected', 'pubmed24n0002'),
+    }
+    results = run_ingestion_job(engine, [first, second], retry_delay=0)
+    assert [result['status'] for result in results] == ['skipped', 'skipped']
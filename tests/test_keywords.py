@@ -0,0 +1,36 @@
+import pickle
+import pytest
+from pubmedkit.baseline import KeywordMatcher, keywords_filter
+
+
+def _scan(sentence, keywords):
+    # 原来的逐词扫描：句子按空白切分后，某个词包含任一关键词即命中
+    return any(keyword.lower() in word for word in sentence.lower().split() for keyword in keywords)
+
+
+SENTENCES = ['The PROMOTER region', 'cis-regulatory elements', 'no match here', '', 'promoters and enhancers',
+             'a silencer.', 'tab\tseparated enhancer-like']
+KEYWORD_SETS = [['promoter'], ['Cis-Regulatory', 'silencer'], ['enhancer', 'operator'], ['a b'], ['']]
+
+
+@pytest.mark.parametrize('keywords', KEYWORD_SETS)
+def test_matcher_matches_word_scan(keywords):
+    matcher = KeywordMatcher(keywords)
+    for sentence in SENTENCES:
+        assert matcher(sentence) == _scan(sentence, keywords), sentence
+        assert keywords_filter(sentence, keywords) == _scan(sentence, keywords)
+
+
+def test_matcher_edge_cases():
+    assert KeywordMatcher([]).search('anything') is False
+    assert KeywordMatcher(['a b']).pattern is None
+    assert KeywordMatcher(['promoter']).search(None) is False
+    # 正则特殊字符按字面匹配
+    assert KeywordMatcher(['c++']).search('uses C++ code')
+    assert not KeywordMatcher(['c++']).search('uses cc code')
+
+
+def test_matcher_pickles():
+    matcher = pickle.loads(pickle.dumps(KeywordMatcher(['promoter', 'enhancer'])))
+    assert matcher.search('Enhancer activity')
+    assert matcher.keywords == ('promoter', 'enhancer')
@@ -0,0 +1,86 @@
+import gzip
+from os.path import dirname, join
+import pytest
+from pubmedkit.load_pubmed_file import iter_medline_text, iter_pubmed_file, load_pubmed_file
+
+MEDLINE_TEXT = """PMID- 201
+OWN - NLM
+DP  - 2014 Sep 11
+TI  - Promoter specificity of transcription 
+      factors.
+LID - S0092-8674(14)01036-8 [pii]
+LID - 10.1016/j.cell.2014.08.009 [doi]
+AB  - First line of the abstract 
+      continues here.
+FAU - Weirauch, Matthew T
+AU  - Weirauch MT
+AD  - Center for Autoimmune Genomics, Cincinnati, 
+      OH 45229, USA.
+FAU - Yang, Ally
+AU  - Yang A
+PT  - Journal Article
+PT  - Research Support, N.I.H., Extramural
+JT  - Cell
+
+PMID- 202
+DP  - 2020
+TI  - Leaf development.
+AU  - Smith A
+JT  - Plant Cell
+AID - 10.1000/leaf [doi]
+"""
+
+SAMPLE_FILE = join(dirname(dirname(__file__)), 'data', 'pubmed_Arabidopsis_ChIP.txt')
+
+
+@pytest.fixture(params=['txt', 'txt.gz'])
+def medline_file(tmp_path, request):
+    path = tmp_path / f'pubmed_sample.{request.param}'
+    opener = gzip.open if request.param.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write(MEDLINE_TEXT)
+    return str(path)
+
+
+def test_iter_medline_text_fields(medline_file):
+    first, second = iter_medline_text(medline_file)
+    assert first == {
+        'pmid': 201,
+        'title': 'Promoter specificity of transcription factors.',
+        'abstract': 'First line of the abstract continues here.',
+        'journal': 'Cell',
+        'pubdate': '2014',
+        'publication_types': 'Journal Article; Research Support, N.I.H., Extramural',
+        'authors': 'Weirauch|Matthew T|MT|;Yang|Ally|A|',
+        'doi': '10.1016/j.cell.2014.08.009',
+    }
+    # 没有FAU和AB，最后一条记录后面没有空行
+    assert second['pmid'] == 202 and second['abstract'] == ''
+    assert second['authors'] == 'Smith||A|'
+    assert second['doi'] == '10.1000/leaf'
+
+
+def test_iter_pubmed_file_filters(medline_file):
+    records = list(iter_pubmed_file(medline_file, keywords=['promoter'], kw_filter='title'))
+    assert [record['pmid'] for record in records] == [201]
+    assert records[0]['version'] == 'pubmed_sample'
+
+
+def test_load_pubmed_file_outputs(medline_file):
+    records = load_pubmed_file(medline_file)
+    assert [record['pmid'] for record in records] == [201, 202]
+    assert set(load_pubmed_file(medline_file, output_type='dict')) == {201, 202}
+    assert list(load_pubmed_file(medline_file, output_type='pd')['pmid']) == [201, 202]
+    with pytest.raises(ValueError):
+        load_pubmed_file(medline_file, output_type='csv')
+    with pytest.raises(FileNotFoundError):
+        load_pubmed_file(medline_file + '.missing')
+
+
+def test_sample_data():
+    records = list(iter_medline_text(SAMPLE_FILE))
+    assert len(records) == 207
+    assert records[0]['pmid'] == 25215497
+    assert records[0]['title'] == ('Determination and inference of eukaryotic transcription factor sequence '
+                                   'specificity.')
+    assert records[0]['doi'] == '10.1016/j.cell.2014.08.009'
@@ -0,0 +1,24 @@
+from conftest import MERGED_TITLES
+from pubmedkit.merge import file_sequence, iter_merged_corpus, merge_corpus
+
+
+def test_file_sequence_orders_releases():
+    files = ['pubmed25n0001.xml.gz', 'pubmed24n1220.xml.gz', 'other.xml', 'pubmed24n0002.xml.gz']
+    assert sorted(files, key=file_sequence) == ['other.xml', 'pubmed24n0002.xml.gz', 'pubmed24n1220.xml.gz',
+                                                'pubmed25n0001.xml.gz']
+
+
+def test_merge_keeps_latest_version_and_applies_deletes(corpus_files):
+    records, stats = merge_corpus(corpus_files)
+    assert {record['pmid']: (record['title'], record['version']) for record in records} == MERGED_TITLES
+    assert len(records) == len(MERGED_TITLES)
+    # 被新版本或DeleteCitation覆盖的旧条目：PMID 1、2、3在0001中的条目和0003中的第一个PMID 5
+    assert stats == {'files': 3, 'records': 4, 'duplicates': 4, 'deleted': 1, 'dropped': 0}
+
+
+def test_merge_filters_after_dedup(corpus_files):
+    stats = {}
+    records = list(iter_merged_corpus(corpus_files, keywords=['promoter'], kw_filter='title', stats=stats))
+    # PMID 2的旧版本包含关键词，但最新版本不包含，不会退回到旧版本
+    assert [record['pmid'] for record in records] == [4]
+    assert stats['dropped'] == 3
@@ -0,0 +1,34 @@
+import pickle
+from pubmedkit.record import PubmedRecord, RECORD_FIELDS
+
+ENTRY = {'pmid': 1, 'title': 'Title', 'abstract': 'Abstract', 'journal': 'Nature', 'pubdate': '2020',
+         'publication_types': 'D016428: Journal Article', 'authors': 'Doe, John', 'doi': '10.1/x',
+         'version': 'pubmed24n0001'}
+
+
+def test_record_round_trips_dict_and_pickle():
+    record = PubmedRecord.from_dict(ENTRY)
+    assert record.to_dict() == ENTRY
+    assert dict(record) == ENTRY
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert record['title'] == 'Title' and record.get('missing', 'x') == 'x'
+
+
+def test_record_is_hashable():
+    first = PubmedRecord.from_dict(ENTRY)
+    second = PubmedRecord.from_dict(dict(ENTRY))
+    revised = PubmedRecord.from_dict(dict(ENTRY, version='pubmed24n0002'))
+    assert hash(first) == hash(second)
+    assert {first, second, revised} == {first, revised}
+    assert {first: 'a'}[second] == 'a'
+
+
+def test_projected_record_only_contains_populated_fields():
+    projected = {'pmid': 1, 'title': 'Title', 'version': 'pubmed24n0001'}
+    record = PubmedRecord.from_dict(projected)
+    assert 'title' in record
+    assert 'abstract' not in record and 'journal_id' not in record
+    assert dict(record) == projected
+    assert record.get('abstract', '') == ''
+    assert record['abstract'] is None
+    assert set(RECORD_FIELDS) - set(record.keys()) == set(RECORD_FIELDS) - set(projected)
@@ -0,0 +1,19 @@
+import pytest
+from pubmedkit.scoring import RelevanceScorer
+
+
+RECORDS = [
+    {'pmid': 1, 'title': 'promoter', 'abstract': '', 'journal': 'Nature'},
+    {'pmid': 2, 'title': 'promoter promoter', 'abstract': 'promoter', 'journal': 'Nature'},
+    {'pmid': 3, 'title': 'other', 'abstract': '', 'journal': 'Nature'},
+]
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_top_k_returns_empty_list_for_non_positive_k(k):
+    assert RelevanceScorer(['promoter']).top_k(RECORDS, k) == []
+
+
+def test_top_k_keeps_highest_scores_in_order():
+    ranked = RelevanceScorer(['promoter']).top_k(RECORDS, 2)
+    assert [record['pmid'] for _, record in ranked] == [2, 1]
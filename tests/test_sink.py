@@ -0,0 +1,51 @@
+import time
+import pytest
+from pubmedkit import sink as sink_module
+from pubmedkit.sink import DatabaseSink
+
+
+class FakeEngine:
+    class dialect:
+        name = 'sqlite'
+
+
+@pytest.fixture
+def failing_writer(monkeypatch):
+    def bulk_insert(engine, batch, chunk_size=None, metrics=None):
+        raise ValueError('disk full')
+    monkeypatch.setattr(sink_module, 'bulk_insert_pubmed_data', bulk_insert)
+
+
+def test_close_raises_writer_error(failing_writer):
+    sink = DatabaseSink(FakeEngine())
+    sink.put([{'pmid': 1}])
+    with pytest.raises(RuntimeError) as info:
+        sink.close()
+    assert isinstance(info.value.__cause__, ValueError)
+
+
+def test_exit_does_not_mask_exception_from_with_body(failing_writer):
+    with pytest.raises(KeyError):
+        with DatabaseSink(FakeEngine()) as sink:
+            sink.put([{'pmid': 1}])
+            # 等写入线程失败后再抛出with块中的异常
+            while sink._error is None:
+                time.sleep(0.01)
+            raise KeyError('parse error')
+    assert all(not thread.is_alive() for thread in sink._threads)
+
+
+def test_exit_raises_writer_error_without_body_exception(failing_writer):
+    with pytest.raises(RuntimeError):
+        with DatabaseSink(FakeEngine()) as sink:
+            sink.put([{'pmid': 1}])
+
+
+def test_writes_batches(monkeypatch):
+    batches = []
+    monkeypatch.setattr(sink_module, 'bulk_insert_pubmed_data',
+                        lambda engine, batch, chunk_size=None, metrics=None: batches.append(list(batch)) or len(batch))
+    with DatabaseSink(FakeEngine(), batch_size=2) as sink:
+        assert sink.consume({'pmid': pmid} for pmid in range(5)) == 5
+    assert sink.written == 5
+    assert sorted(record['pmid'] for batch in batches for record in batch) == list(range(5))
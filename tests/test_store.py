@@ -0,0 +1,42 @@
+import json
+import os
+import pytest
+from conftest import MERGED_TITLES
+from pubmedkit.merge import merge_corpus
+from pubmedkit.store import RecordStore, build_record_store
+
+
+def _titles(records):
+    return {record['pmid']: (record['title'], record['version']) for record in records}
+
+
+@pytest.mark.parametrize('block_records', [1, 32])
+def test_store_matches_merged_corpus(tmp_path, corpus_files, block_records):
+    store = build_record_store(str(tmp_path / 'store'), corpus_files, codec='zlib', block_records=block_records)
+    assert len(store) == len(MERGED_TITLES)
+    assert _titles(store) == MERGED_TITLES
+    assert 3 not in store and store.get(3) is None
+    assert [record and record['pmid'] for record in store.get_many([5, 3, 1])] == [5, None, 1]
+    store.close()
+
+    reopened = RecordStore(str(tmp_path / 'store'))
+    assert _titles(reopened) == MERGED_TITLES
+    assert reopened.get(2).to_dict() == next(record for record in merge_corpus(corpus_files)[0]
+                                             if record['pmid'] == 2)
+
+
+def test_store_filters_match_merge(tmp_path, corpus_files):
+    options = {'keywords': ['promoter'], 'kw_filter': 'title'}
+    store = build_record_store(str(tmp_path / 'store'), corpus_files, codec='zlib', **options)
+    assert _titles(store) == _titles(merge_corpus(corpus_files, **options)[0])
+
+
+def test_store_index_generations(tmp_path, corpus_files):
+    path = str(tmp_path / 'store')
+    store = build_record_store(path, corpus_files, codec='zlib')
+    with open(os.path.join(path, 'meta.json')) as f:
+        generation = json.load(f)['index']
+    # 每次更新只保留meta.json指向的一代索引文件
+    index_files = sorted(name for name in os.listdir(path) if name.endswith('.npy'))
+    assert index_files == sorted(f'{name}-{generation:06d}.npy' for name in ['pmids', 'locations', 'blocks'])
+    store.close()